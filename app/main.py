@@ -7,16 +7,25 @@ from app.utils.logger import setup_logger
 
 load_dotenv()
 
-from app.routers import email, users
+from app.routers import email, events, metrics, users
+from app.services.email_job_service import register_email_job_consumer
+from app.utils.database import register_db
 from app.utils.dynamodb_init import register_dynamodb_init
+from app.utils.metrics import register_metrics
 
 app = FastAPI()
 
 setup_logger()
+# Shutdown hooks run in registration order: the consumer must stop before the db closes
+register_email_job_consumer(app)
+register_db(app)
 register_dynamodb_init(app)
+register_metrics(app)
 
 app.include_router(users.router)
 app.include_router(email.router)
+app.include_router(events.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 def root():
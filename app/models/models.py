@@ -43,6 +43,7 @@ class Event(Base):
     end_at = Column(DateTime, nullable=False)
     venue = Column(String, nullable=True)
     max_capacity = Column(Integer, nullable=True)
+    registered_count = Column(Integer, default=0)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     owner = relationship("User", back_populates="events_owned", foreign_keys=[owner_id])
     hosts = relationship(
@@ -1,20 +1,18 @@
 
 from typing import List, Optional
 
-from fastapi import APIRouter, BackgroundTasks, Body, Depends, Query
+from fastapi import APIRouter, Body, Depends, Query
 from sqlalchemy.orm import Session
 
 from app.models import models
-from app.services import user_service
+from app.services import email_job_service, email_log_service, email_stats_service
 from app.utils.database import get_db
-from app.utils.email_utils import send_email
 
 router = APIRouter(prefix="/email", tags=["email"])
 
 
-@router.post("/send-to-filtered-users")
+@router.post("/send-to-filtered-users", status_code=202)
 async def send_email_to_filtered_users(
-    background_tasks: BackgroundTasks,
     subject: str = Body(..., embed=True),
     body: str = Body(..., embed=True),
     company: Optional[str] = None,
@@ -29,41 +27,87 @@ async def send_email_to_filtered_users(
     cursor: Optional[str] = None,
     sort_by: Optional[str] = None,
     sort_order: Optional[str] = "asc",
+    all_users: bool = Query(False, description="Email every matching user instead of one page of `limit`"),
     db = Depends(get_db),
 ):
     """
-    Send emails to users matching filter criteria (same as /users/filter).
+    Queue an email campaign job for users matching filter criteria (same as /users/filter).
+    The job is persisted and sent by the email job consumer; poll /email/jobs/{job_id} for progress.
     """
-    result = await user_service.filter_users(
+    job = await email_job_service.create_job(
         db,
-        company=company,
-        job_title=job_title,
-        city=city,
-        state=state,
-        events_hosted_min=events_hosted_min,
-        events_hosted_max=events_hosted_max,
-        events_attended_min=events_attended_min,
-        events_attended_max=events_attended_max,
+        subject=subject,
+        body=body,
+        filters={
+            "company": company,
+            "job_title": job_title,
+            "city": city,
+            "state": state,
+            "events_hosted_min": events_hosted_min,
+            "events_hosted_max": events_hosted_max,
+            "events_attended_min": events_attended_min,
+            "events_attended_max": events_attended_max,
+        },
         limit=limit,
         cursor=cursor,
         sort_by=sort_by,
         sort_order=sort_order,
+        all_users=all_users,
     )
-    emails = [user.get("email") for user in result["results"] if user.get("email")]
-    if not emails:
-        return {"message": "No users found for the given criteria."}
-    send_email(background_tasks, subject, body, emails, db)
-    return {"message": f"Emails sent to {len(emails)} users."}
+    return {"message": "Email job queued.", "job_id": job["id"], "status": job["status"]}
 
 
+@router.get("/jobs", summary="List email jobs by status")
+async def list_email_jobs(
+    status: str = Query("queued", pattern="^(queued|running|completed|failed)$"),
+    limit: int = Query(50, ge=1, le=200),
+    db = Depends(get_db),
+):
+    jobs = await email_job_service.list_jobs(db, status, limit)
+    return {"jobs": [email_job_service.job_progress(job) for job in jobs]}
+
+
+@router.get("/jobs/{job_id}", summary="Get email job status and progress")
+async def get_email_job(job_id: str, db = Depends(get_db)):
+    job = await email_job_service.get_job(db, job_id)
+    return email_job_service.job_progress(job)
+
+
+@router.get("/stats/campaigns/{campaign_id}", summary="Delivery counters of an email job")
+async def get_campaign_stats(campaign_id: str, db = Depends(get_db)):
+    return await email_stats_service.get_campaign_stats(db, campaign_id)
+
+
+@router.get("/stats/daily/{day}", summary="Delivery counters of one day")
+async def get_daily_stats(day: str, db = Depends(get_db)):
+    return await email_stats_service.get_daily_stats(db, day)
+
 
-@router.get("/logs", summary="Get all email logs")
-async def get_email_logs(db = Depends(get_db)):
+@router.get("/logs", summary="Query email logs")
+async def get_email_logs(
+    recipient: Optional[str] = None,
+    status: Optional[str] = Query(None, pattern="^(pending|sent|failed)$"),
+    created_from: Optional[str] = Query(None, description="Inclusive ISO timestamp lower bound"),
+    created_to: Optional[str] = Query(None, description="Inclusive ISO timestamp upper bound"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. recipient,status"),
+    sort_order: str = Query("asc", pattern="^(asc|desc)$", description="created_at order of time-range reads"),
+    db = Depends(get_db),
+):
     """
-    Retrieve all email logs from the email_logs table.
+    Retrieve one page of email logs. Filtering by recipient (and status) uses the
+    recipient-status-index, a created_from time range uses the hourly created_bucket index.
+    Pass next_cursor back as cursor to read the next page.
     """
-    table = await db.Table("email_logs")
-    response = await table.scan()
-
-    items = response.get("Items", [])
-    return {"logs": items}
\ No newline at end of file
+    return await email_log_service.query_email_logs(
+        db,
+        recipient=recipient,
+        status=status,
+        created_from=created_from,
+        created_to=created_to,
+        limit=limit,
+        cursor=cursor,
+        fields=fields,
+        sort_order=sort_order,
+    )
@@ -0,0 +1,204 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Body, Depends, Query, Response
+from pydantic import BaseModel
+
+from app.schemas import schemas
+from app.services import event_service, registration_service, user_service
+from app.utils.database import get_db
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+class EventListResponse(BaseModel):
+    events: List[schemas.Event]
+    next_cursor: Optional[str]
+    count: int
+
+
+class EventLink(BaseModel):
+    id: int
+    event_id: int
+    user_id: int
+    created_at: Optional[str] = None
+    user: Optional[schemas.User] = None
+
+
+class EventLinkPage(BaseModel):
+    links: List[EventLink]
+    next_cursor: Optional[str]
+    count: int
+
+
+class RegistrationResult(BaseModel):
+    id: int
+    event_id: int
+    user_id: int
+    created_at: str
+    status: Literal["registered", "waitlisted"]
+
+
+def get_user_loader(db = Depends(get_db)) -> user_service.UserLoader:
+    """
+    One UserLoader per request, so user lookups made while building a response are batched.
+    """
+    return user_service.UserLoader(db)
+
+
+@router.get("", response_model=EventListResponse, summary="List events by start date")
+async def list_events(
+    start_from: Optional[str] = Query(None, description="ISO date/time, inclusive (default: now)"),
+    start_to: Optional[str] = Query(None, description="ISO date/time, inclusive (default: one year after start_from)"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    sort_order: Literal["asc", "desc"] = "asc",
+    db = Depends(get_db),
+):
+    """
+    Events ordered by start_at, read from the start_month-start_at index one month
+    partition per Query.
+    """
+    return await event_service.list_events(db, start_from, start_to, limit, cursor, sort_order)
+
+
+@router.get("/by-slug/{slug}", response_model=schemas.Event, summary="Get an event by slug")
+async def get_event_by_slug(slug: str, db = Depends(get_db)):
+    return await event_service.get_event_by_slug(db, slug)
+
+
+@router.get("/by-user/{user_id}", response_model=EventLinkPage, summary="Events of a user")
+async def list_user_events(
+    user_id: int,
+    kind: Literal["registration", "host"] = "registration",
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db = Depends(get_db),
+):
+    """
+    The user's registrations (or host roles with kind=host), ordered by event_id.
+    """
+    return await event_service.list_user_links(db, kind, user_id, limit, cursor)
+
+
+@router.get("/{event_id}/attendees", response_model=EventLinkPage, summary="Attendees of an event")
+async def list_event_attendees(
+    event_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_users: bool = Query(False, description="Attach each user's profile as `user`"),
+    db = Depends(get_db),
+    loader: user_service.UserLoader = Depends(get_user_loader),
+):
+    """
+    The event's registrations ordered by user_id: one Query on the event_id partition of the
+    event_id-user_id index, however large the event. include_users=true adds the profiles,
+    read with one BatchGetItem per 100 attendees.
+    """
+    return await event_service.list_event_links(
+        db, "registration", event_id, limit, cursor, loader=loader if include_users else None
+    )
+
+
+@router.get("/{event_id}/hosts", response_model=EventLinkPage, summary="Hosts of an event")
+async def list_event_hosts(
+    event_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_users: bool = Query(False, description="Attach each user's profile as `user`"),
+    db = Depends(get_db),
+    loader: user_service.UserLoader = Depends(get_user_loader),
+):
+    return await event_service.list_event_links(
+        db, "host", event_id, limit, cursor, loader=loader if include_users else None
+    )
+
+
+@router.post("/registrations/bulk", summary="Register many users for events")
+async def bulk_create_registrations(
+    registrations: List[schemas.EventRegistrationCreate],
+    db = Depends(get_db),
+):
+    """
+    Import registrations in transactions of up to 100 actions. Each user's events_attended is
+    incremented once per transaction by the number of registrations created for them.
+    Existing registrations are skipped; unknown users or events are reported as failed.
+    """
+    return await registration_service.bulk_create_links(
+        db, "registration", [(r.event_id, r.user_id) for r in registrations]
+    )
+
+
+@router.post("/hosts/bulk", summary="Add many event hosts")
+async def bulk_create_hosts(hosts: List[schemas.EventHostCreate], db = Depends(get_db)):
+    """
+    Import event hosts; same semantics as /events/registrations/bulk for events_hosted.
+    """
+    return await registration_service.bulk_create_links(db, "host", [(h.event_id, h.user_id) for h in hosts])
+
+
+@router.post("/{event_id}/registrations", status_code=201, response_model=RegistrationResult)
+async def create_registration(
+    event_id: int,
+    response: Response,
+    user_id: int = Body(..., embed=True),
+    waitlist: bool = Query(True, description="Join the waitlist if the event is full (otherwise 409)"),
+    db = Depends(get_db),
+):
+    """
+    Register a user for an event: one transaction creates the registration, increments their
+    events_attended and takes a seat, conditional on the event's registered_count being below
+    max_capacity. If the event is full, or anyone is already waiting, the user joins the
+    waitlist instead (202).
+    """
+    result = await registration_service.register(db, event_id, user_id, waitlist=waitlist)
+    if result["status"] == "waitlisted":
+        response.status_code = 202
+    return result
+
+
+@router.delete("/{event_id}/registrations/{user_id}", status_code=204)
+async def delete_registration(event_id: int, user_id: int, db = Depends(get_db)):
+    """
+    Cancel a registration and decrement the user's events_attended. In the same transaction the
+    seat goes to the first user on the waitlist, or is freed if nobody is waiting.
+    """
+    await registration_service.delete_link(db, "registration", event_id, user_id)
+
+
+@router.get("/{event_id}/waitlist", response_model=EventLinkPage, summary="Waitlist of an event")
+async def list_event_waitlist(
+    event_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_users: bool = Query(False, description="Attach each user's profile as `user`"),
+    db = Depends(get_db),
+    loader: user_service.UserLoader = Depends(get_user_loader),
+):
+    """
+    Users waiting for a seat, in the order they will be offered one.
+    """
+    return await event_service.list_waitlist(db, event_id, limit, cursor, loader=loader if include_users else None)
+
+
+@router.delete("/{event_id}/waitlist/{user_id}", status_code=204)
+async def leave_event_waitlist(event_id: int, user_id: int, db = Depends(get_db)):
+    """
+    Take a user off an event's waitlist.
+    """
+    await registration_service.leave_waitlist(db, event_id, user_id)
+
+
+@router.post("/{event_id}/hosts", status_code=201, response_model=schemas.EventHost)
+async def create_host(event_id: int, user_id: int = Body(..., embed=True), db = Depends(get_db)):
+    """
+    Add a user as an event host and increment their events_hosted in one transaction.
+    """
+    return await registration_service.create_link(db, "host", event_id, user_id)
+
+
+@router.delete("/{event_id}/hosts/{user_id}", status_code=204)
+async def delete_host(event_id: int, user_id: int, db = Depends(get_db)):
+    """
+    Remove an event host and decrement the user's events_hosted in one transaction.
+    """
+    await registration_service.delete_link(db, "host", event_id, user_id)
@@ -1,10 +1,11 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 
 from app.schemas import schemas
-from app.services import user_service
+from app.services import user_export_service, user_import_service, user_service
 from app.utils.database import get_db
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -17,7 +18,25 @@ class UserFilterResponse(BaseModel):
     count: int
 
 
-@router.get("/filter", response_model=UserFilterResponse)
+USER_RESPONSE_FIELDS = tuple(schemas.User.model_fields)
+
+
+def user_filter_response(result, fields: Optional[List[str]] = None) -> ORJSONResponse:
+    """
+    Build the UserFilterResponse body without per-item validation. Items come from our own
+    table with numbers already converted by user_service, so they are trusted: each is cut down
+    to the schemas.User fields (missing ones as null), or to `fields` if given, and serialized
+    by orjson.
+    """
+    fields = fields or USER_RESPONSE_FIELDS
+    return ORJSONResponse({
+        "results": [{field: user.get(field) for field in fields} for user in result["results"]],
+        "next_cursor": result["next_cursor"],
+        "count": result["count"],
+    })
+
+
+@router.get("/filter", response_model=UserFilterResponse, response_class=ORJSONResponse)
 async def filter_users(
     company: Optional[str] = None,
     job_title: Optional[str] = None,
@@ -29,21 +48,27 @@ async def filter_users(
     events_attended_max: Optional[int] = None,
     limit: int = Query(100, ge=1, le=200, description="Max results per page (1-200)"),
     cursor: Optional[str] = Query(
-        None, description="Pagination cursor (user id, company, or job_title depending on sort/filter)"
+        None, description="Opaque pagination cursor returned as next_cursor by the previous page"
     ),
     sort_by: Optional[str] = Query(
         None,
         description="Sort by 'company' or 'job_title' for fast server-side sort, or other fields for slower in-memory sort.",
     ),
     sort_order: Optional[str] = Query("asc", description="Sort order: 'asc' or 'desc'"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. id,email (read with a ProjectionExpression)"
+    ),
     db = Depends(get_db),
 ):
     """
     Filter and paginate users. For best performance, use:
     - sort_by='job_title' with company filter (server-side sort)
     - sort_by='company' with job_title filter (server-side sort)
-    Other sorts/filters are supported but may be slower (in-memory sort).
+    Other sorts/filters are supported but may be slower (in-memory sort): every matching user
+    is read to produce a page in global order, while only `limit` users are kept in memory.
+    With `fields`, each result holds only those fields.
     """
+    field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
     result = await user_service.filter_users(
         db,
         company=company,
@@ -58,5 +83,62 @@ async def filter_users(
         cursor=cursor,
         sort_by=sort_by,
         sort_order=sort_order,
+        fields=field_list,
+    )
+    return user_filter_response(result, field_list)
+
+
+@router.post("/import", summary="Bulk import users from CSV or NDJSON")
+async def import_users(
+    request: Request,
+    format: Optional[str] = Query(
+        None, pattern="^(csv|ndjson)$", description="Upload format; defaults to the request Content-Type"
+    ),
+    db = Depends(get_db),
+):
+    """
+    Stream a CSV (with a header row) or NDJSON request body into the users table. Each row is
+    validated as a UserImport (id, email, first_name, last_name, role and optional profile fields)
+    and rows are written in BatchWriteItem requests while the upload is still being read.
+    Invalid or unwritten rows are reported by row number; valid rows are imported regardless.
+    """
+    upload_format = user_import_service.import_format(request.headers.get("content-type"), format)
+    return await user_import_service.import_users(db, request.stream(), upload_format)
+
+
+@router.get("/export", summary="Stream filtered users as NDJSON or CSV")
+async def export_users(
+    company: Optional[str] = None,
+    job_title: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    events_hosted_min: Optional[int] = None,
+    events_hosted_max: Optional[int] = None,
+    events_attended_min: Optional[int] = None,
+    events_attended_max: Optional[int] = None,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    segments: Optional[int] = Query(None, ge=1, le=64, description="Parallel scan segments for unindexed filters"),
+    db = Depends(get_db),
+):
+    """
+    Export every user matching the /users/filter filters in one streamed response.
+    Rows are written as DynamoDB pages arrive, in storage order (no sort_by).
+    """
+    stream = user_export_service.export_users(
+        db,
+        format=format,
+        segments=segments,
+        company=company,
+        job_title=job_title,
+        city=city,
+        state=state,
+        events_hosted_min=events_hosted_min,
+        events_hosted_max=events_hosted_max,
+        events_attended_min=events_attended_min,
+        events_attended_max=events_attended_max,
+    )
+    return StreamingResponse(
+        stream,
+        media_type=user_export_service.EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
     )
-    return result
@@ -11,15 +11,21 @@ class UserRole(str, enum.Enum):
     host = "host"
 
 class EventBase(BaseModel):
-    name: str
-    date: datetime
+    slug: str
+    title: str
+    description: Optional[str] = None
+    start_at: datetime
+    end_at: datetime
+    venue: Optional[str] = None
+    max_capacity: Optional[int] = None
+    owner_id: int
 
 class EventCreate(EventBase):
     pass
 
 class Event(EventBase):
     id: int
-    host_id: int
+    registered_count: int = 0
     class Config:
         orm_mode = True
 
@@ -35,7 +41,21 @@ class UserBase(BaseModel):
         return f"{self.first_name} {self.last_name}"
 
 class UserCreate(UserBase):
-    pass
+    company: Optional[str] = None
+    job_title: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    phone_number: Optional[str] = None
+    avatar: Optional[str] = None
+    gender: Optional[str] = None
+    events_hosted: int = 0
+    events_attended: int = 0
+
+class UserImport(UserCreate):
+    id: int
+    # Only applied to new users; existing users keep the counters their registrations maintain
+    events_hosted: Optional[int] = None
+    events_attended: Optional[int] = None
 
 class User(UserBase):
     id: int
@@ -62,3 +82,16 @@ class EventRegistration(EventRegistrationBase):
     id: int
     class Config:
         orm_mode = True
+
+
+class EventHostBase(BaseModel):
+    user_id: int
+    event_id: int
+
+class EventHostCreate(EventHostBase):
+    pass
+
+class EventHost(EventHostBase):
+    id: int
+    class Config:
+        orm_mode = True
@@ -0,0 +1,331 @@
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+from fastapi import FastAPI, HTTPException
+
+from app.services import user_service
+from app.utils.database import init_db
+from app.utils.dynamodb_query import plain_numbers
+from app.utils.email_utils import EmailDispatcher
+from app.utils.logger import logger
+
+EMAIL_JOBS_TABLE = "email_jobs"
+EMAIL_JOBS_STATUS_INDEX = "status-created_at-index"
+# Running jobs ordered by lease expiry (KEYS_ONLY)
+EMAIL_JOBS_LEASE_INDEX = "status-lease_expires_at-index"
+
+# Consumer tuning
+EMAIL_JOB_CONSUMER_ENABLED = os.getenv("EMAIL_JOB_CONSUMER_ENABLED", "true").lower() == "true"
+EMAIL_JOB_CONCURRENCY = int(os.getenv("EMAIL_JOB_CONCURRENCY", "2"))
+EMAIL_JOB_POLL_INTERVAL = float(os.getenv("EMAIL_JOB_POLL_INTERVAL", "1"))
+EMAIL_JOB_LEASE_SECONDS = int(os.getenv("EMAIL_JOB_LEASE_SECONDS", "60"))
+EMAIL_JOB_CHUNK_SIZE = int(os.getenv("EMAIL_JOB_CHUNK_SIZE", "100"))
+# Back-pressure: new jobs are rejected with 429 while this many are queued
+EMAIL_JOB_MAX_QUEUED = int(os.getenv("EMAIL_JOB_MAX_QUEUED", "100"))
+
+# User attributes read for a send
+EMAIL_JOB_USER_FIELDS = ("id", "email")
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+def _now() -> datetime:
+    return datetime.now()
+
+
+def _is_conditional_failure(error: ClientError) -> bool:
+    return error.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException"
+
+
+async def count_queued_jobs(db) -> int:
+    table = await db.Table(EMAIL_JOBS_TABLE)
+    response = await table.query(
+        IndexName=EMAIL_JOBS_STATUS_INDEX,
+        KeyConditionExpression=Key("status").eq(JOB_QUEUED),
+        Select="COUNT",
+    )
+    return int(response.get("Count", 0))
+
+
+async def create_job(
+    db,
+    subject: str,
+    body: str,
+    filters: Dict[str, Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    sort_order: str = "asc",
+    all_users: bool = False,
+) -> Dict[str, Any]:
+    """
+    Persist an email campaign job for the consumer loop. With `all_users` the job emails every
+    matching user instead of one page of `limit`. Raises HTTPException(400) for invalid filters
+    and HTTPException(429) when too many jobs are already queued.
+    """
+    user_service.validate_filter_users_inputs(limit, sort_by, sort_order, cursor)
+    if await count_queued_jobs(db) >= EMAIL_JOB_MAX_QUEUED:
+        raise HTTPException(status_code=429, detail="Too many queued email jobs, retry later.")
+    now = _now().isoformat()
+    job = {
+        "id": str(uuid.uuid4()),
+        "status": JOB_QUEUED,
+        "subject": subject,
+        "body": body,
+        "filters": {k: v for k, v in filters.items() if v is not None},
+        "limit": limit,
+        "sort_order": sort_order,
+        "processed": 0,
+        "sent": 0,
+        "failed": 0,
+        "created_at": now,
+        "updated_at": now,
+    }
+    if sort_by:
+        job["sort_by"] = sort_by
+    if all_users:
+        job["all_users"] = True
+    if cursor:
+        job["cursor"] = cursor
+    table = await db.Table(EMAIL_JOBS_TABLE)
+    await table.put_item(Item=job, ConditionExpression=Attr("id").not_exists())
+    logger.info(f"Queued email job {job['id']}")
+    return job
+
+
+async def get_job(db, job_id: str) -> Dict[str, Any]:
+    table = await db.Table(EMAIL_JOBS_TABLE)
+    response = await table.get_item(Key={"id": job_id})
+    job = response.get("Item")
+    if not job:
+        raise HTTPException(status_code=404, detail="Email job not found.")
+    return plain_numbers(job)
+
+
+async def list_jobs(db, status: str, limit: int = 50) -> list:
+    table = await db.Table(EMAIL_JOBS_TABLE)
+    response = await table.query(
+        IndexName=EMAIL_JOBS_STATUS_INDEX,
+        KeyConditionExpression=Key("status").eq(status),
+        ScanIndexForward=False,
+        Limit=limit,
+    )
+    return [plain_numbers(job) for job in response.get("Items", [])]
+
+
+def job_progress(job: Dict[str, Any]) -> Dict[str, Any]:
+    fields = (
+        "id", "status", "processed", "sent", "failed", "limit", "all_users",
+        "created_at", "updated_at", "started_at", "completed_at", "error_message",
+    )
+    return {field: job.get(field) for field in fields}
+
+
+async def claim_job(db, job_id: str, worker_id: str = WORKER_ID) -> Optional[Dict[str, Any]]:
+    """
+    Take the lease on a queued job, or on a running job whose lease expired (crashed consumer).
+    Returns the claimed job, or None if another consumer owns it.
+    """
+    table = await db.Table(EMAIL_JOBS_TABLE)
+    now = _now()
+    try:
+        response = await table.update_item(
+            Key={"id": job_id},
+            UpdateExpression=(
+                "SET #s = :running, lease_owner = :owner, lease_expires_at = :lease, "
+                "started_at = if_not_exists(started_at, :now), updated_at = :now"
+            ),
+            ConditionExpression=Attr("status").eq(JOB_QUEUED) | (
+                Attr("status").eq(JOB_RUNNING) & Attr("lease_expires_at").lt(now.isoformat())
+            ),
+            ExpressionAttributeNames={"#s": "status"},
+            ExpressionAttributeValues={
+                ":running": JOB_RUNNING,
+                ":owner": worker_id,
+                ":lease": (now + timedelta(seconds=EMAIL_JOB_LEASE_SECONDS)).isoformat(),
+                ":now": now.isoformat(),
+            },
+            ReturnValues="ALL_NEW",
+        )
+    except ClientError as e:
+        if _is_conditional_failure(e):
+            return None
+        raise
+    return plain_numbers(response["Attributes"])
+
+
+async def _checkpoint(db, job_id: str, worker_id: str, cursor: Optional[str], processed: int, sent: int, failed: int, status: str = JOB_RUNNING):
+    """
+    Record progress and renew the lease. Raises ClientError if the lease was lost.
+    """
+    table = await db.Table(EMAIL_JOBS_TABLE)
+    now = _now()
+    # processed, sent and failed are not usable as bare names: PROCESSED is a reserved word
+    update = (
+        "SET #s = :status, #processed = #processed + :processed, #sent = #sent + :sent, "
+        "#failed = #failed + :failed, lease_expires_at = :lease, updated_at = :now"
+    )
+    names = {"#s": "status", "#processed": "processed", "#sent": "sent", "#failed": "failed"}
+    values = {
+        ":status": status,
+        ":processed": processed,
+        ":sent": sent,
+        ":failed": failed,
+        ":lease": (now + timedelta(seconds=EMAIL_JOB_LEASE_SECONDS)).isoformat(),
+        ":now": now.isoformat(),
+    }
+    if cursor:
+        update += ", #c = :cursor"
+        names["#c"] = "cursor"
+        values[":cursor"] = cursor
+    if status == JOB_COMPLETED:
+        update += ", completed_at = :now"
+    await table.update_item(
+        Key={"id": job_id},
+        UpdateExpression=update,
+        ConditionExpression=Attr("lease_owner").eq(worker_id),
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues=values,
+    )
+
+
+async def _fail_job(db, job_id: str, worker_id: str, error: str):
+    table = await db.Table(EMAIL_JOBS_TABLE)
+    now = _now().isoformat()
+    try:
+        await table.update_item(
+            Key={"id": job_id},
+            UpdateExpression="SET #s = :failed, error_message = :error, updated_at = :now, completed_at = :now",
+            ConditionExpression=Attr("lease_owner").eq(worker_id),
+            ExpressionAttributeNames={"#s": "status"},
+            ExpressionAttributeValues={":failed": JOB_FAILED, ":error": error, ":now": now},
+        )
+    except ClientError as e:
+        if not _is_conditional_failure(e):
+            raise
+
+
+async def process_job(db, job: Dict[str, Any], worker_id: str = WORKER_ID):
+    """
+    Send a claimed job page by page (EMAIL_JOB_CHUNK_SIZE recipients per page), streaming pages
+    from user_service.iter_filter_users so memory stays flat however large the audience is.
+    Jobs with `all_users` walk every matching page; others stop after `limit` recipients.
+    After each page the next cursor and counters are checkpointed, so a job resumed after a
+    crash re-sends at most one page.
+    """
+    job_id = job["id"]
+    processed = job.get("processed", 0)
+    remaining = None if job.get("all_users") else job["limit"] - processed
+    try:
+        if remaining is not None and remaining <= 0:
+            await _checkpoint(db, job_id, worker_id, None, 0, 0, 0, status=JOB_COMPLETED)
+        pages = user_service.iter_filter_users(
+            db,
+            page_size=EMAIL_JOB_CHUNK_SIZE,
+            cursor=job.get("cursor"),
+            max_results=remaining,
+            sort_by=job.get("sort_by"),
+            sort_order=job.get("sort_order", "asc"),
+            # Sending only needs addresses, so read nothing else
+            fields=EMAIL_JOB_USER_FIELDS,
+            **job.get("filters", {}),
+        )
+        async for page in pages:
+            emails = (user["email"] for user in page["results"] if user.get("email"))
+            result = await EmailDispatcher(db, job["subject"], job["body"], campaign_id=job_id).dispatch(emails)
+            processed += page["count"]
+            if remaining is not None:
+                remaining -= page["count"]
+            done = not page["next_cursor"] or (remaining is not None and remaining <= 0)
+            await _checkpoint(
+                db, job_id, worker_id, page["next_cursor"], page["count"], result["sent"], result["failed"],
+                status=JOB_COMPLETED if done else JOB_RUNNING,
+            )
+        logger.info(f"Email job {job_id} completed: {processed} recipients")
+    except ClientError as e:
+        if _is_conditional_failure(e):
+            logger.warning(f"Lost lease on email job {job_id}; another consumer took over")
+            return
+        logger.error(f"Email job {job_id} failed: {str(e)}")
+        await _fail_job(db, job_id, worker_id, str(e))
+    except Exception as e:
+        logger.error(f"Email job {job_id} failed: {str(e)}")
+        await _fail_job(db, job_id, worker_id, str(e))
+
+
+async def _claimable_job_ids(db, limit: int) -> list:
+    table = await db.Table(EMAIL_JOBS_TABLE)
+    queued = await table.query(
+        IndexName=EMAIL_JOBS_STATUS_INDEX,
+        KeyConditionExpression=Key("status").eq(JOB_QUEUED),
+        Limit=limit,
+    )
+    expired = await table.query(
+        IndexName=EMAIL_JOBS_LEASE_INDEX,
+        KeyConditionExpression=Key("status").eq(JOB_RUNNING) & Key("lease_expires_at").lt(_now().isoformat()),
+        Limit=limit,
+    )
+    return [job["id"] for job in expired.get("Items", []) + queued.get("Items", [])]
+
+
+async def run_consumer(db, stop: asyncio.Event, worker_id: str = WORKER_ID):
+    """
+    Poll for queued (or abandoned) jobs and process up to EMAIL_JOB_CONCURRENCY at a time.
+    """
+    running = set()
+    logger.info(f"Email job consumer {worker_id} started")
+    while not stop.is_set():
+        try:
+            free = EMAIL_JOB_CONCURRENCY - len(running)
+            if free > 0:
+                for job_id in await _claimable_job_ids(db, free):
+                    if len(running) >= EMAIL_JOB_CONCURRENCY:
+                        break
+                    job = await claim_job(db, job_id, worker_id)
+                    if job:
+                        task = asyncio.create_task(process_job(db, job, worker_id))
+                        running.add(task)
+                        task.add_done_callback(running.discard)
+        except Exception as e:
+            logger.error(f"Email job consumer error: {str(e)}")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=EMAIL_JOB_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+    for task in list(running):
+        task.cancel()
+    # Let cancelled jobs unwind before the caller closes the db; their leases expire and
+    # another consumer resumes them from the last checkpoint
+    await asyncio.gather(*running, return_exceptions=True)
+    logger.info(f"Email job consumer {worker_id} stopped")
+
+
+# FastAPI event hook
+
+def register_email_job_consumer(app: FastAPI):
+    state = {}
+
+    @app.on_event("startup")
+    async def start_consumer():
+        if not EMAIL_JOB_CONSUMER_ENABLED:
+            return
+        db = await init_db()
+        state["stop"] = asyncio.Event()
+        state["task"] = asyncio.create_task(run_consumer(db, state["stop"]))
+
+    @app.on_event("shutdown")
+    async def stop_consumer():
+        if "task" in state:
+            state["stop"].set()
+            await state["task"]
@@ -0,0 +1,259 @@
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from boto3.dynamodb.conditions import Attr, Key
+from fastapi import HTTPException
+
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.dynamodb_query import (
+    SEGMENT_DONE,
+    SEGMENT_START,
+    ReadBudget,
+    projection_kwargs,
+    query_buckets,
+    query_until_full,
+    segmented_scan,
+    valid_scan_positions,
+    valid_start_key,
+)
+from app.utils.email_utils import EMAIL_LOGS_TABLE, EMAIL_LOGS_TIME_INDEX, created_bucket
+
+EMAIL_LOGS_RECIPIENT_INDEX = "recipient-status-index"
+EMAIL_LOGS_TABLE_KEY = ("id",)
+EMAIL_LOGS_TIME_KEY = ("created_bucket", "created_at") + EMAIL_LOGS_TABLE_KEY
+EMAIL_LOG_STATUSES = ("pending", "sent", "failed")
+EMAIL_LOG_FIELDS = (
+    "id", "recipient", "subject", "body", "status", "created_at",
+    "sent_at", "failed_at", "error_message", "error_code", "attempts",
+)
+
+# Unindexed reads (no recipient) fall back to a parallel scan
+EMAIL_LOG_SCAN_SEGMENTS = int(os.getenv("EMAIL_LOG_SCAN_SEGMENTS", "4"))
+EMAIL_LOG_PAGE_SIZE = int(os.getenv("EMAIL_LOG_PAGE_SIZE", "500"))
+# Work budget for one page of logs, as for /users/filter
+EMAIL_LOG_MAX_RCU = float(os.getenv("EMAIL_LOG_MAX_RCU", "500"))
+EMAIL_LOG_MAX_SECONDS = float(os.getenv("EMAIL_LOG_MAX_SECONDS", "2"))
+# Hour buckets queried in parallel by a time-range read
+EMAIL_LOG_BUCKET_FANOUT = int(os.getenv("EMAIL_LOG_BUCKET_FANOUT", "8"))
+# Widest time range (in hour buckets) one bucketed read may cover
+EMAIL_LOG_MAX_RANGE_HOURS = int(os.getenv("EMAIL_LOG_MAX_RANGE_HOURS", str(31 * 24)))
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    invalid = [field for field in requested if field not in EMAIL_LOG_FIELDS]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid fields: {', '.join(invalid)}")
+    return requested
+
+
+def _time_range_condition(created_from: Optional[str], created_to: Optional[str]):
+    if created_from and created_to:
+        return Attr("created_at").between(created_from, created_to)
+    if created_from:
+        return Attr("created_at").gte(created_from)
+    if created_to:
+        return Attr("created_at").lte(created_to)
+    return None
+
+
+def _hour_buckets(created_from: str, created_to: str) -> List[str]:
+    try:
+        start = datetime.fromisoformat(created_bucket(created_from))
+        end = datetime.fromisoformat(created_bucket(created_to))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="created_from and created_to must be ISO timestamps.")
+    if (end - start) // timedelta(hours=1) + 1 > EMAIL_LOG_MAX_RANGE_HOURS:
+        raise HTTPException(
+            status_code=400, detail=f"Time range may span at most {EMAIL_LOG_MAX_RANGE_HOURS} hours."
+        )
+    buckets = []
+    while start <= end:
+        buckets.append(start.strftime("%Y-%m-%dT%H"))
+        start += timedelta(hours=1)
+    return buckets
+
+
+def _and(*conditions):
+    result = None
+    for condition in conditions:
+        if condition is not None:
+            result = condition if result is None else result & condition
+    return result
+
+
+async def query_email_logs(
+    db,
+    recipient: Optional[str] = None,
+    status: Optional[str] = None,
+    created_from: Optional[str] = None,
+    created_to: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    sort_order: str = "asc",
+) -> Dict[str, Any]:
+    """
+    Read one page of email logs.
+
+    A recipient (optionally with a status) is served by a Query on recipient-status-index.
+    A time range without a recipient is served by the hourly created_bucket index, in
+    `sort_order` of created_at (an open upper bound means now). Anything else falls back to a
+    budgeted parallel scan. The time range is inclusive and compares ISO timestamps.
+    `fields` is a comma-separated projection.
+    Raises HTTPException for invalid input.
+    """
+    if limit < 1 or limit > 200:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 200.")
+    if sort_order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="sort_order must be 'asc' or 'desc'.")
+    if status and status not in EMAIL_LOG_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+    if created_from and created_to and created_from > created_to:
+        raise HTTPException(status_code=400, detail="created_from must not be after created_to.")
+    requested_fields = _parse_fields(fields)
+    try:
+        cursor_state = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor value.")
+
+    table = await db.Table(EMAIL_LOGS_TABLE)
+    budget = ReadBudget(EMAIL_LOG_MAX_RCU, EMAIL_LOG_MAX_SECONDS)
+    time_condition = _time_range_condition(created_from, created_to)
+
+    next_state = None
+    if recipient:
+        key_attrs = ("recipient", "status") + EMAIL_LOGS_TABLE_KEY
+        key_condition = Key("recipient").eq(recipient)
+        if status:
+            key_condition = key_condition & Key("status").eq(status)
+        query_kwargs = {"IndexName": EMAIL_LOGS_RECIPIENT_INDEX, "KeyConditionExpression": key_condition}
+        if time_condition is not None:
+            query_kwargs["FilterExpression"] = time_condition
+        if requested_fields:
+            query_kwargs.update(projection_kwargs(requested_fields, key_attrs))
+        partition = {"recipient": recipient, **({"status": status} if status else {})}
+        if cursor_state and (
+            cursor_state.get("m") != "query" or not valid_start_key(cursor_state.get("k"), key_attrs, fixed=partition)
+        ):
+            raise HTTPException(status_code=400, detail="Cursor does not match the requested filters.")
+        try:
+            items, last_key = await query_until_full(
+                table,
+                query_kwargs,
+                limit,
+                key_attrs,
+                start_key=cursor_state["k"] if cursor_state else None,
+                page_size=EMAIL_LOG_PAGE_SIZE if time_condition is not None else None,
+                budget=budget,
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"DynamoDB query error: {str(e)}")
+        if last_key:
+            next_state = {"m": "query", "k": last_key}
+    elif created_from:
+        if cursor_state and (
+            cursor_state.get("m") != "time"
+            or not isinstance(cursor_state.get("b"), str)
+            or not (
+                cursor_state.get("k") is None
+                or valid_start_key(cursor_state["k"], EMAIL_LOGS_TIME_KEY, fixed={"created_bucket": cursor_state["b"]})
+            )
+        ):
+            raise HTTPException(status_code=400, detail="Cursor does not match the requested filters.")
+        created_to = created_to or datetime.now().isoformat()
+        items, next_state = await _query_time_buckets(
+            table,
+            created_from,
+            created_to,
+            status,
+            sort_order,
+            limit,
+            cursor_state,
+            projection_kwargs(requested_fields, EMAIL_LOGS_TIME_KEY) if requested_fields else {},
+            budget,
+        )
+    else:
+        filter_expression = _and(Attr("status").eq(status) if status else None, time_condition)
+        scan_kwargs = {}
+        if filter_expression is not None:
+            scan_kwargs["FilterExpression"] = filter_expression
+        if requested_fields:
+            scan_kwargs.update(projection_kwargs(requested_fields, EMAIL_LOGS_TABLE_KEY))
+        if cursor_state and (
+            cursor_state.get("m") != "scan"
+            or not valid_scan_positions(cursor_state.get("s"), EMAIL_LOG_SCAN_SEGMENTS, EMAIL_LOGS_TABLE_KEY)
+        ):
+            raise HTTPException(status_code=400, detail="Cursor does not match the requested filters.")
+        positions = cursor_state["s"] if cursor_state else [SEGMENT_START] * EMAIL_LOG_SCAN_SEGMENTS
+        try:
+            items, positions = await segmented_scan(
+                table,
+                scan_kwargs,
+                limit,
+                positions,
+                key_attrs=EMAIL_LOGS_TABLE_KEY,
+                page_size=EMAIL_LOG_PAGE_SIZE if filter_expression is not None else None,
+                budget=budget,
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"DynamoDB scan error: {str(e)}")
+        if any(pos != SEGMENT_DONE for pos in positions):
+            next_state = {"m": "scan", "s": positions}
+
+    if requested_fields:
+        items = [{field: item[field] for field in requested_fields if field in item} for item in items]
+    return {
+        "logs": items,
+        "next_cursor": encode_cursor(next_state) if next_state else None,
+        "count": len(items),
+    }
+
+
+async def _query_time_buckets(table, created_from, created_to, status, sort_order, limit, cursor_state, extra_kwargs, budget):
+    """
+    Fan out Queries over the hour buckets between `created_from` and `created_to`,
+    EMAIL_LOG_BUCKET_FANOUT buckets at a time (see query_buckets).
+    Returns (items, next cursor state or None).
+    """
+    buckets = _hour_buckets(created_from, created_to)
+    if sort_order == "desc":
+        buckets.reverse()
+    position, start_key = 0, None
+    if cursor_state:
+        if cursor_state["b"] not in buckets:
+            raise HTTPException(status_code=400, detail="Cursor does not match the requested filters.")
+        position, start_key = buckets.index(cursor_state["b"]), cursor_state.get("k")
+
+    def bucket_kwargs(bucket):
+        kwargs = {
+            "IndexName": EMAIL_LOGS_TIME_INDEX,
+            "KeyConditionExpression": Key("created_bucket").eq(bucket) & Key("created_at").between(created_from, created_to),
+            "ScanIndexForward": sort_order == "asc",
+            **extra_kwargs,
+        }
+        if status:
+            kwargs["FilterExpression"] = Attr("status").eq(status)
+        return kwargs
+
+    try:
+        items, resume = await query_buckets(
+            table,
+            buckets,
+            bucket_kwargs,
+            limit,
+            EMAIL_LOGS_TIME_KEY,
+            position=position,
+            start_key=start_key,
+            fanout=EMAIL_LOG_BUCKET_FANOUT,
+            page_size=EMAIL_LOG_PAGE_SIZE if status else None,
+            budget=budget,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DynamoDB query error: {str(e)}")
+    if resume is None:
+        return items, None
+    return items, {"m": "time", "b": resume[0], "k": resume[1]}
@@ -0,0 +1,54 @@
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict
+
+from fastapi import HTTPException
+
+from app.utils.email_utils import (
+    EMAIL_STATS_ERROR_PREFIX,
+    EMAIL_STATS_TABLE,
+    campaign_stats_id,
+    daily_stats_id,
+)
+
+
+def _stats_response(stats_id: str, item: Dict[str, Any], counters) -> Dict[str, Any]:
+    errors = {
+        attr[len(EMAIL_STATS_ERROR_PREFIX):]: int(count)
+        for attr, count in item.items()
+        if attr.startswith(EMAIL_STATS_ERROR_PREFIX) and count
+    }
+    response = {"id": stats_id}
+    response.update({counter: int(item.get(counter, Decimal(0))) for counter in counters})
+    response["errors"] = errors
+    response["updated_at"] = item.get("updated_at")
+    return response
+
+
+async def _get_stats(db, stats_id: str) -> Dict[str, Any]:
+    table = await db.Table(EMAIL_STATS_TABLE)
+    try:
+        response = await table.get_item(Key={"id": stats_id})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DynamoDB read error: {str(e)}")
+    return response.get("Item") or {}
+
+
+async def get_campaign_stats(db, campaign_id: str) -> Dict[str, Any]:
+    """
+    Delivery counters of one campaign (email job). A campaign that has not sent yet reads as zeros.
+    """
+    item = await _get_stats(db, campaign_stats_id(campaign_id))
+    return _stats_response(campaign_id, item, ("pending", "sent", "failed"))
+
+
+async def get_daily_stats(db, day: str) -> Dict[str, Any]:
+    """
+    Delivery counters of sends finished on `day` (YYYY-MM-DD).
+    """
+    try:
+        date.fromisoformat(day)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="day must be an ISO date (YYYY-MM-DD).")
+    item = await _get_stats(db, daily_stats_id(day))
+    return _stats_response(day, item, ("sent", "failed"))
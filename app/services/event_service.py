@@ -0,0 +1,246 @@
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from boto3.dynamodb.conditions import Key
+from fastapi import HTTPException
+
+from app.services.registration_service import LINK_KINDS, WAITLIST_INDEX, WAITLIST_TABLE
+from app.services.user_service import UserLoader
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.dynamodb_query import ReadBudget, plain_numbers, query_buckets, query_until_full, valid_start_key
+from app.utils.event_utils import EVENTS_TABLE
+
+EVENTS_SLUG_INDEX = "slug-index"
+# Events partitioned by start month ("YYYY-MM"), ordered by start_at within a month
+EVENTS_START_INDEX = "start_month-start_at-index"
+EVENTS_START_KEY = ("start_month", "start_at", "id")
+# Registration/host links by event (attendee lists) and by user (a user's events)
+EVENT_LINKS_BY_EVENT_INDEX = "event_id-user_id-index"
+EVENT_LINKS_BY_USER_INDEX = "user_id-event_id-index"
+WAITLIST_KEY = ("event_id", "created_at", "id")
+
+# Widest start date range one /events listing may cover
+EVENT_LIST_MAX_MONTHS = int(os.getenv("EVENT_LIST_MAX_MONTHS", "36"))
+# Month buckets queried in parallel by an /events listing
+EVENT_LIST_BUCKET_FANOUT = int(os.getenv("EVENT_LIST_BUCKET_FANOUT", "4"))
+EVENT_LIST_MAX_RCU = float(os.getenv("EVENT_LIST_MAX_RCU", "500"))
+EVENT_LIST_MAX_SECONDS = float(os.getenv("EVENT_LIST_MAX_SECONDS", "2"))
+
+
+def _parse_bound(value: str, name: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be an ISO date.")
+
+
+def _month_buckets(start: datetime, end: datetime) -> List[str]:
+    """
+    The start_month partitions from `start` to `end` inclusive, at most EVENT_LIST_MAX_MONTHS.
+    """
+    first, last = start.year * 12 + start.month - 1, end.year * 12 + end.month - 1
+    if last - first + 1 > EVENT_LIST_MAX_MONTHS:
+        raise HTTPException(status_code=400, detail=f"Date range may span at most {EVENT_LIST_MAX_MONTHS} months.")
+    return [f"{month // 12:04d}-{month % 12 + 1:02d}" for month in range(first, last + 1)]
+
+
+def _decode(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    try:
+        return decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor value.")
+
+
+async def list_events(
+    db,
+    start_from: Optional[str] = None,
+    start_to: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    sort_order: str = "asc",
+) -> Dict[str, Any]:
+    """
+    List events starting between `start_from` and `start_to` (inclusive ISO timestamps or
+    dates; default: from now for one year), ordered by start_at. Served by Queries on the
+    start_month index, EVENT_LIST_BUCKET_FANOUT months at a time.
+    Raises HTTPException for invalid input.
+    """
+    if limit < 1 or limit > 200:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 200.")
+    if sort_order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="sort_order must be 'asc' or 'desc'.")
+    start_from = start_from or datetime.now().isoformat(timespec="seconds")
+    start = _parse_bound(start_from, "start_from")
+    if not start_to:
+        start_to = (start + timedelta(days=365)).isoformat(timespec="seconds")
+    elif len(start_to) == 10:
+        # A bare end date includes events on that day
+        start_to += "T23:59:59"
+    end = _parse_bound(start_to, "start_to")
+    if start_from > start_to:
+        raise HTTPException(status_code=400, detail="start_from must not be after start_to.")
+    buckets = _month_buckets(start, end)
+    if sort_order == "desc":
+        buckets.reverse()
+
+    cursor_state = _decode(cursor)
+    position, start_key = 0, None
+    if cursor_state:
+        if cursor_state.get("b") not in buckets or not (
+            cursor_state.get("k") is None
+            or valid_start_key(cursor_state["k"], EVENTS_START_KEY, ("id",), {"start_month": cursor_state["b"]})
+        ):
+            raise HTTPException(status_code=400, detail="Cursor does not match the requested filters.")
+        position, start_key = buckets.index(cursor_state["b"]), cursor_state["k"]
+
+    def bucket_kwargs(bucket):
+        return {
+            "IndexName": EVENTS_START_INDEX,
+            "KeyConditionExpression": Key("start_month").eq(bucket) & Key("start_at").between(start_from, start_to),
+            "ScanIndexForward": sort_order == "asc",
+        }
+
+    table = await db.Table(EVENTS_TABLE)
+    try:
+        items, resume = await query_buckets(
+            table,
+            buckets,
+            bucket_kwargs,
+            limit,
+            EVENTS_START_KEY,
+            position=position,
+            start_key=start_key,
+            fanout=EVENT_LIST_BUCKET_FANOUT,
+            budget=ReadBudget(EVENT_LIST_MAX_RCU, EVENT_LIST_MAX_SECONDS),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DynamoDB query error: {str(e)}")
+    events = [plain_numbers(item) for item in items]
+    return {
+        "events": events,
+        "next_cursor": encode_cursor({"b": resume[0], "k": resume[1]}) if resume else None,
+        "count": len(events),
+    }
+
+
+async def get_event_by_slug(db, slug: str) -> Dict[str, Any]:
+    """
+    Look an event up by slug on the slug index. Raises HTTPException 404 if there is none.
+    """
+    table = await db.Table(EVENTS_TABLE)
+    try:
+        response = await table.query(
+            IndexName=EVENTS_SLUG_INDEX,
+            KeyConditionExpression=Key("slug").eq(slug),
+            Limit=1,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DynamoDB query error: {str(e)}")
+    if not response.get("Items"):
+        raise HTTPException(status_code=404, detail="Event not found.")
+    return plain_numbers(response["Items"][0])
+
+
+async def _attach_users(links: List[Dict[str, Any]], loader: Optional[UserLoader]):
+    if loader is None:
+        return
+    try:
+        users = await loader.load_many([link["user_id"] for link in links])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DynamoDB read error: {str(e)}")
+    for link, user in zip(links, users):
+        link["user"] = user
+
+
+async def _query_links(db, kind, index_name, key_attr, key_value, limit, cursor, loader=None) -> Dict[str, Any]:
+    if kind not in LINK_KINDS:
+        raise HTTPException(status_code=400, detail=f"Invalid kind: {kind}")
+    if limit < 1 or limit > 1000:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 1000.")
+    other_attr = "user_id" if key_attr == "event_id" else "event_id"
+    key_attrs = (key_attr, other_attr, "id")
+    cursor_state = _decode(cursor)
+    if cursor_state is not None and not valid_start_key(cursor_state, key_attrs, key_attrs, {key_attr: key_value}):
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested filters.")
+    table = await db.Table(LINK_KINDS[kind]["table"])
+    try:
+        items, last_key = await query_until_full(
+            table,
+            {"IndexName": index_name, "KeyConditionExpression": Key(key_attr).eq(key_value)},
+            limit,
+            key_attrs,
+            start_key=cursor_state,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DynamoDB query error: {str(e)}")
+    links = [plain_numbers(item) for item in items]
+    await _attach_users(links, loader)
+    return {
+        "links": links,
+        "next_cursor": encode_cursor(last_key) if last_key else None,
+        "count": len(links),
+    }
+
+
+async def list_event_links(
+    db,
+    kind: str,
+    event_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    loader: Optional[UserLoader] = None,
+) -> Dict[str, Any]:
+    """
+    One page of an event's registrations or hosts, ordered by user_id: a single-partition
+    Query on the link table's event_id index. With a `loader`, each link gets its "user"
+    profile (None if deleted), fetched in BatchGetItem batches rather than one read per link.
+    Raises HTTPException for invalid input.
+    """
+    return await _query_links(db, kind, EVENT_LINKS_BY_EVENT_INDEX, "event_id", event_id, limit, cursor, loader)
+
+
+async def list_user_links(db, kind: str, user_id: int, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    One page of a user's registrations or host roles, ordered by event_id, from the link
+    table's user_id index. Raises HTTPException for invalid input.
+    """
+    return await _query_links(db, kind, EVENT_LINKS_BY_USER_INDEX, "user_id", user_id, limit, cursor)
+
+
+async def list_waitlist(
+    db,
+    event_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    loader: Optional[UserLoader] = None,
+) -> Dict[str, Any]:
+    """
+    One page of an event's waitlist in arrival order (the order seats are offered in), from
+    the waitlist table's event_id-created_at index. Raises HTTPException for invalid input.
+    """
+    if limit < 1 or limit > 1000:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 1000.")
+    cursor_state = _decode(cursor)
+    if cursor_state is not None and not valid_start_key(
+        cursor_state, WAITLIST_KEY, ("event_id", "id"), {"event_id": event_id}
+    ):
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested filters.")
+    table = await db.Table(WAITLIST_TABLE)
+    try:
+        items, last_key = await query_until_full(
+            table,
+            {"IndexName": WAITLIST_INDEX, "KeyConditionExpression": Key("event_id").eq(event_id)},
+            limit,
+            WAITLIST_KEY,
+            start_key=cursor_state,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DynamoDB query error: {str(e)}")
+    entries = [plain_numbers(item) for item in items]
+    await _attach_users(entries, loader)
+    return {
+        "links": entries,
+        "next_cursor": encode_cursor(last_key) if last_key else None,
+        "count": len(entries),
+    }
@@ -0,0 +1,693 @@
+import asyncio
+import os
+import random
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import Attr, Key
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+
+from app.services import user_service
+from app.utils.dynamodb_batch import batch_get_items
+from app.utils.dynamodb_query import plain_numbers, projection_kwargs
+from app.utils.logger import logger
+
+EVENTS_TABLE = "events"
+USERS_TABLE = "users"
+# Users waiting for a seat at a full event, in arrival order per event
+WAITLIST_TABLE = "event_waitlist"
+WAITLIST_INDEX = "event_id-created_at-index"
+
+# A user/event link (registration or host) and the user counter it maintains
+LINK_KINDS = {
+    "registration": {"table": "event_registrations", "counter": "events_attended"},
+    "host": {"table": "event_hosts", "counter": "events_hosted"},
+}
+
+# DynamoDB accepts at most 100 actions per TransactWriteItems call
+TRANSACT_MAX_ITEMS = 100
+REGISTRATION_BULK_CONCURRENCY = int(os.getenv("REGISTRATION_BULK_CONCURRENCY", "4"))
+REGISTRATION_BULK_MAX_RETRIES = int(os.getenv("REGISTRATION_BULK_MAX_RETRIES", "5"))
+REGISTRATION_BULK_BASE_DELAY = float(os.getenv("REGISTRATION_BULK_BASE_DELAY", "0.05"))
+# Retries of a single registration whose transaction lost a conflict on the event's counter
+REGISTRATION_MAX_RETRIES = int(os.getenv("REGISTRATION_MAX_RETRIES", "3"))
+# Waitlist entries read per promotion attempt when a seat frees up
+WAITLIST_PROMOTION_BATCH = int(os.getenv("WAITLIST_PROMOTION_BATCH", "10"))
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def _serialize(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: _serializer.serialize(v) for k, v in values.items()}
+
+
+def _deserialize(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    return plain_numbers({k: _deserializer.deserialize(v) for k, v in attributes.items()})
+
+
+def link_id(event_id: int, user_id: int) -> int:
+    """
+    Deterministic link id, so creating the same link twice hits the same item.
+    """
+    return event_id * 10**12 + user_id
+
+
+def _spec(kind: str) -> Dict[str, str]:
+    if kind not in LINK_KINDS:
+        raise ValueError(f"Unknown link kind: {kind}")
+    return LINK_KINDS[kind]
+
+
+def _put_link(spec, event_id: int, user_id: int, created_at: str) -> Dict[str, Any]:
+    return {
+        "Put": {
+            "TableName": spec["table"],
+            "Item": _serialize({
+                "id": link_id(event_id, user_id),
+                "event_id": event_id,
+                "user_id": user_id,
+                "created_at": created_at,
+            }),
+            "ConditionExpression": "attribute_not_exists(id)",
+        }
+    }
+
+
+def _add_to_counter(spec, user_id: int, amount: int) -> Dict[str, Any]:
+    return {
+        "Update": {
+            "TableName": USERS_TABLE,
+            "Key": _serialize({"id": user_id}),
+            "UpdateExpression": "ADD #counter :amount",
+            "ConditionExpression": "attribute_exists(id)",
+            "ExpressionAttributeNames": {"#counter": spec["counter"]},
+            "ExpressionAttributeValues": _serialize({":amount": amount}),
+        }
+    }
+
+
+def _event_exists(event_id: int) -> Dict[str, Any]:
+    return {
+        "ConditionCheck": {
+            "TableName": EVENTS_TABLE,
+            "Key": _serialize({"id": event_id}),
+            "ConditionExpression": "attribute_exists(id)",
+        }
+    }
+
+
+def _claim_seat(event_id: int) -> Dict[str, Any]:
+    """
+    Take one seat: increment the event's registered_count unless it has reached max_capacity.
+    The condition compares the two attributes server-side, so concurrent registrations cannot
+    oversell and need no prior read. Events without max_capacity are unlimited.
+    """
+    return {
+        "Update": {
+            "TableName": EVENTS_TABLE,
+            "Key": _serialize({"id": event_id}),
+            "UpdateExpression": "ADD registered_count :one",
+            "ConditionExpression": (
+                "attribute_exists(id) AND (attribute_not_exists(max_capacity)"
+                " OR registered_count < max_capacity"
+                " OR (attribute_not_exists(registered_count) AND max_capacity > :zero))"
+            ),
+            "ExpressionAttributeValues": _serialize({":one": 1, ":zero": 0}),
+            # A failed check returns the event, which tells a full event from a missing one
+            "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+        }
+    }
+
+
+def _claim_seats(event_id: int, count: int, capacity: Optional[int]) -> Dict[str, Any]:
+    """
+    Take `count` seats given the max_capacity read beforehand (None: unlimited). Conditions
+    cannot do arithmetic, so the room needed is computed here and the condition pins
+    max_capacity to the value it was computed from. `count` must not exceed the room left.
+    """
+    values = {":count": count}
+    if capacity is None:
+        condition = "attribute_exists(id) AND attribute_not_exists(max_capacity)"
+    else:
+        condition = (
+            "max_capacity = :capacity"
+            " AND (attribute_not_exists(registered_count) OR registered_count <= :room)"
+        )
+        values.update({":capacity": capacity, ":room": capacity - count})
+    return {
+        "Update": {
+            "TableName": EVENTS_TABLE,
+            "Key": _serialize({"id": event_id}),
+            "UpdateExpression": "ADD registered_count :count",
+            "ConditionExpression": condition,
+            "ExpressionAttributeValues": _serialize(values),
+            "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+        }
+    }
+
+
+def _release_seat(event_id: int) -> Dict[str, Any]:
+    return {
+        "Update": {
+            "TableName": EVENTS_TABLE,
+            "Key": _serialize({"id": event_id}),
+            "UpdateExpression": "ADD registered_count :amount",
+            "ConditionExpression": "attribute_exists(id)",
+            "ExpressionAttributeValues": _serialize({":amount": -1}),
+        }
+    }
+
+
+def _link_actions(kind: str, event_id: int, user_id: int, created_at: str) -> List[Dict[str, Any]]:
+    """
+    Put the link, bump the user's counter and, for registrations, take a seat at the event
+    (hosts only need the event to exist).
+    """
+    spec = _spec(kind)
+    return [
+        _put_link(spec, event_id, user_id, created_at),
+        _add_to_counter(spec, user_id, 1),
+        _claim_seat(event_id) if kind == "registration" else _event_exists(event_id),
+    ]
+
+
+def _dequeue(entry_id: int) -> Dict[str, Any]:
+    return {
+        "Delete": {
+            "TableName": WAITLIST_TABLE,
+            "Key": _serialize({"id": entry_id}),
+            "ConditionExpression": "attribute_exists(id)",
+        }
+    }
+
+
+def _hand_over_seat(event_id: int, entry: Dict[str, Any], created_at: str) -> List[Dict[str, Any]]:
+    """
+    Give a cancelled registration's seat to a waitlist entry: register its user and remove the
+    entry. registered_count is left alone, since the seat changes hands without being freed.
+    """
+    spec = _spec("registration")
+    return [
+        _put_link(spec, event_id, entry["user_id"], created_at),
+        _add_to_counter(spec, entry["user_id"], 1),
+        _dequeue(entry["id"]),
+    ]
+
+
+def _cancellation_codes(error: ClientError) -> List[str]:
+    return [reason.get("Code", "None") for reason in error.response.get("CancellationReasons", [])]
+
+
+def _is_cancelled(error: ClientError) -> bool:
+    return error.response.get("Error", {}).get("Code") == "TransactionCanceledException"
+
+
+async def _write_link(db, kind: str, event_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Create a link and update the counters in one transaction, retrying transaction conflicts
+    (concurrent registrations all update the event's registered_count). Returns the link, or
+    None if the event is full. Raises HTTPException 404 for an unknown user or event and 409
+    if the link exists.
+    """
+    attempt = 0
+    while True:
+        created_at = datetime.now().isoformat()
+        try:
+            await db.meta.client.transact_write_items(TransactItems=_link_actions(kind, event_id, user_id, created_at))
+            return {"id": link_id(event_id, user_id), "event_id": event_id, "user_id": user_id, "created_at": created_at}
+        except ClientError as e:
+            if not _is_cancelled(e):
+                raise HTTPException(status_code=500, detail=f"DynamoDB transaction error: {str(e)}")
+            reasons = e.response.get("CancellationReasons", [])
+            codes = _cancellation_codes(e)
+        if codes[1:2] == ["ConditionalCheckFailed"]:
+            raise HTTPException(status_code=404, detail="User not found.")
+        if codes[2:3] == ["ConditionalCheckFailed"] and "Item" not in reasons[2]:
+            raise HTTPException(status_code=404, detail="Event not found.")
+        if codes[:1] == ["ConditionalCheckFailed"]:
+            raise HTTPException(status_code=409, detail=f"User {user_id} already has a {kind} for event {event_id}.")
+        if codes[2:3] == ["ConditionalCheckFailed"]:
+            return None
+        if attempt >= REGISTRATION_MAX_RETRIES:
+            raise HTTPException(status_code=503, detail=f"Transaction cancelled: {', '.join(codes)}")
+        await asyncio.sleep(random.uniform(0, REGISTRATION_BULK_BASE_DELAY * (2 ** attempt)))
+        attempt += 1
+
+
+async def create_link(db, kind: str, event_id: int, user_id: int) -> Dict[str, Any]:
+    """
+    Create a registration/host link and increment the user's counter in one transaction;
+    a registration also takes a seat (registered_count) at the event.
+    Raises HTTPException 404 for an unknown user or event and 409 if the link exists or
+    the event is full.
+    """
+    _spec(kind)
+    link = await _write_link(db, kind, event_id, user_id)
+    if link is None:
+        raise HTTPException(status_code=409, detail=f"Event {event_id} is full.")
+    user_service.invalidate_user_cache()
+    return link
+
+
+async def register(db, event_id: int, user_id: int, waitlist: bool = True) -> Dict[str, Any]:
+    """
+    Register a user for an event, or put them on the event's waitlist if it is full or anyone
+    is waiting already, so newcomers cannot take a seat ahead of the queue (with `waitlist` off
+    that raises HTTPException 409 instead). Returns the registration or waitlist entry with
+    "status" set to "registered" or "waitlisted".
+    """
+    if await _waitlist_head(db, event_id) is None:
+        link = await _write_link(db, "registration", event_id, user_id)
+        if link is not None:
+            user_service.invalidate_user_cache()
+            return dict(link, status="registered")
+    if not waitlist:
+        raise HTTPException(status_code=409, detail=f"Event {event_id} is full.")
+    entry = await join_waitlist(db, event_id, user_id)
+    # A seat freed while this user was joining (or a raised max_capacity) goes to the queue in order
+    if await _has_free_seat(db, event_id):
+        for link in await _fill_free_seats(db, event_id):
+            if link["user_id"] == user_id:
+                return dict(link, status="registered")
+    return dict(entry, status="waitlisted")
+
+
+async def join_waitlist(db, event_id: int, user_id: int) -> Dict[str, Any]:
+    """
+    Add a user to an event's waitlist. Raises HTTPException 404 for an unknown user or event
+    and 409 if they are already on the waitlist or registered.
+    """
+    entry = {
+        "id": link_id(event_id, user_id),
+        "event_id": event_id,
+        "user_id": user_id,
+        "created_at": datetime.now().isoformat(),
+    }
+    spec = _spec("registration")
+    actions = [
+        {
+            "Put": {
+                "TableName": WAITLIST_TABLE,
+                "Item": _serialize(entry),
+                "ConditionExpression": "attribute_not_exists(id)",
+            }
+        },
+        {
+            "ConditionCheck": {
+                "TableName": spec["table"],
+                "Key": _serialize({"id": link_id(event_id, user_id)}),
+                "ConditionExpression": "attribute_not_exists(id)",
+            }
+        },
+        {
+            "ConditionCheck": {
+                "TableName": USERS_TABLE,
+                "Key": _serialize({"id": user_id}),
+                "ConditionExpression": "attribute_exists(id)",
+            }
+        },
+        _event_exists(event_id),
+    ]
+    try:
+        await db.meta.client.transact_write_items(TransactItems=actions)
+    except ClientError as e:
+        if not _is_cancelled(e):
+            raise HTTPException(status_code=500, detail=f"DynamoDB transaction error: {str(e)}")
+        codes = _cancellation_codes(e)
+        if codes[:1] == ["ConditionalCheckFailed"]:
+            raise HTTPException(status_code=409, detail=f"User {user_id} is already on the waitlist for event {event_id}.")
+        if codes[1:2] == ["ConditionalCheckFailed"]:
+            raise HTTPException(status_code=409, detail=f"User {user_id} already has a registration for event {event_id}.")
+        if codes[2:3] == ["ConditionalCheckFailed"]:
+            raise HTTPException(status_code=404, detail="User not found.")
+        if codes[3:4] == ["ConditionalCheckFailed"]:
+            raise HTTPException(status_code=404, detail="Event not found.")
+        raise HTTPException(status_code=503, detail=f"Transaction cancelled: {', '.join(codes)}")
+    return entry
+
+
+async def _waitlist_head(db, event_id: int) -> Optional[Dict[str, Any]]:
+    """
+    The longest-waiting entry of an event's waitlist, or None if nobody is waiting.
+    """
+    table = await db.Table(WAITLIST_TABLE)
+    response = await table.query(
+        IndexName=WAITLIST_INDEX, KeyConditionExpression=Key("event_id").eq(event_id), Limit=1
+    )
+    items = response.get("Items", [])
+    return plain_numbers(items[0]) if items else None
+
+
+async def _confirmed_waitlist_head(db, event_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Like _waitlist_head, but each candidate from the (eventually consistent) index is confirmed
+    with a consistent read of the base table, so entries already removed are skipped.
+    """
+    table = await db.Table(WAITLIST_TABLE)
+    query_kwargs = {
+        "IndexName": WAITLIST_INDEX,
+        "KeyConditionExpression": Key("event_id").eq(event_id),
+        "Limit": WAITLIST_PROMOTION_BATCH,
+    }
+    while True:
+        response = await table.query(**query_kwargs)
+        for entry in response.get("Items", []):
+            current = await table.get_item(Key={"id": entry["id"]}, ConsistentRead=True)
+            if "Item" in current:
+                return plain_numbers(current["Item"])
+        if not response.get("LastEvaluatedKey"):
+            return None
+        query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+async def _has_free_seat(db, event_id: int) -> bool:
+    table = await db.Table(EVENTS_TABLE)
+    response = await table.get_item(
+        Key={"id": event_id},
+        ConsistentRead=True,
+        ProjectionExpression="max_capacity, registered_count",
+    )
+    state = _capacity_state(plain_numbers(response.get("Item", {})))
+    return state["capacity"] is None or state["registered"] < state["capacity"]
+
+
+async def _drop_waitlist_entry(db, entry: Dict[str, Any]):
+    table = await db.Table(WAITLIST_TABLE)
+    await table.delete_item(Key={"id": entry["id"]})
+
+
+async def _fill_free_seats(db, event_id: int) -> List[Dict[str, Any]]:
+    """
+    Promote waitlisted users, in order, until the event is full or nobody is waiting.
+    """
+    promoted = []
+    while True:
+        try:
+            link = await promote_waitlist(db, event_id)
+        except ClientError as e:
+            logger.error(f"Waitlist promotion for event {event_id} failed: {str(e)}")
+            return promoted
+        if link is None:
+            return promoted
+        promoted.append(link)
+
+
+async def leave_waitlist(db, event_id: int, user_id: int):
+    """
+    Remove a user from an event's waitlist. Raises HTTPException 404 if they are not on it.
+    """
+    table = await db.Table(WAITLIST_TABLE)
+    try:
+        await table.delete_item(
+            Key={"id": link_id(event_id, user_id)}, ConditionExpression=Attr("id").exists()
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            raise HTTPException(status_code=404, detail=f"User {user_id} is not on the waitlist for event {event_id}.")
+        raise HTTPException(status_code=500, detail=f"DynamoDB write error: {str(e)}")
+
+
+async def promote_waitlist(db, event_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Register the longest-waiting user for a freed seat: the registration and the removal of
+    their waitlist entry are one transaction, so concurrent promotions cannot both take the
+    same entry. Entries of users who are registered already or no longer exist are dropped.
+    Returns the new registration, or None if the event is full or nobody is waiting.
+    """
+    table = await db.Table(WAITLIST_TABLE)
+    query_kwargs = {
+        "IndexName": WAITLIST_INDEX,
+        "KeyConditionExpression": Key("event_id").eq(event_id),
+        "Limit": WAITLIST_PROMOTION_BATCH,
+    }
+    while True:
+        response = await table.query(**query_kwargs)
+        for entry in map(plain_numbers, response.get("Items", [])):
+            user_id, created_at = entry["user_id"], datetime.now().isoformat()
+            try:
+                await db.meta.client.transact_write_items(
+                    TransactItems=_link_actions("registration", event_id, user_id, created_at) + [_dequeue(entry["id"])]
+                )
+            except ClientError as e:
+                if not _is_cancelled(e):
+                    raise
+                codes = _cancellation_codes(e)
+                if codes[2:3] == ["ConditionalCheckFailed"]:
+                    return None
+                if codes[3:4] == ["ConditionalCheckFailed"]:
+                    # Promoted (or withdrawn) concurrently; try the next in line
+                    continue
+                if "ConditionalCheckFailed" in codes[:2]:
+                    await _drop_waitlist_entry(db, entry)
+                    continue
+                logger.warning(f"Waitlist promotion for event {event_id} cancelled: {', '.join(codes)}")
+                return None
+            user_service.invalidate_user_cache()
+            return {"id": link_id(event_id, user_id), "event_id": event_id, "user_id": user_id, "created_at": created_at}
+        if not response.get("LastEvaluatedKey"):
+            return None
+        query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+async def delete_link(db, kind: str, event_id: int, user_id: int):
+    """
+    Delete a registration/host link and decrement the user's counter in one transaction.
+    Cancelling a registration hands its seat to the head of the waitlist in that same
+    transaction (registered_count is unchanged), or frees the seat if nobody is waiting.
+    Raises HTTPException 404 if the link does not exist.
+    """
+    spec = _spec(kind)
+    cancel = [
+        {
+            "Delete": {
+                "TableName": spec["table"],
+                "Key": _serialize({"id": link_id(event_id, user_id)}),
+                "ConditionExpression": "attribute_exists(id)",
+            }
+        },
+        _add_to_counter(spec, user_id, -1),
+    ]
+    attempt = 0
+    while True:
+        # Read consistently: a head the index still lists after its removal would fail every retry
+        head = await _confirmed_waitlist_head(db, event_id) if kind == "registration" else None
+        if head is not None and head["user_id"] == user_id:
+            await _drop_waitlist_entry(db, head)
+            continue
+        if head is not None:
+            actions = cancel + _hand_over_seat(event_id, head, datetime.now().isoformat())
+        elif kind == "registration":
+            actions = cancel + [_release_seat(event_id)]
+        else:
+            actions = cancel
+        try:
+            await db.meta.client.transact_write_items(TransactItems=actions)
+            break
+        except ClientError as e:
+            if not _is_cancelled(e):
+                raise HTTPException(status_code=500, detail=f"DynamoDB transaction error: {str(e)}")
+            codes = _cancellation_codes(e)
+        if "ConditionalCheckFailed" in codes[:2]:
+            raise HTTPException(status_code=404, detail=f"No {kind} of user {user_id} for event {event_id}.")
+        if head is not None and "ConditionalCheckFailed" in codes[2:4]:
+            # The head is registered already or no longer exists: drop it, try the next in line
+            await _drop_waitlist_entry(db, head)
+            continue
+        if codes[4:5] == ["ConditionalCheckFailed"]:
+            # Handed to a concurrent cancellation; each of these removes an entry, so they are
+            # not counted as attempts, but back off before competing for the next head
+            await asyncio.sleep(random.uniform(0, REGISTRATION_BULK_BASE_DELAY))
+            continue
+        if attempt >= REGISTRATION_MAX_RETRIES:
+            raise HTTPException(status_code=503, detail=f"Transaction cancelled: {', '.join(codes)}")
+        await asyncio.sleep(random.uniform(0, REGISTRATION_BULK_BASE_DELAY * (2 ** attempt)))
+        attempt += 1
+    user_service.invalidate_user_cache()
+
+
+def _pack_transactions(pairs: List[Tuple[int, int]]) -> List[List[Tuple[int, int]]]:
+    """
+    Group (event_id, user_id) pairs so each transaction has at most TRANSACT_MAX_ITEMS actions:
+    one Put per link, one counter update per distinct user and one check per distinct event.
+    """
+    batches, batch, users, events = [], [], set(), set()
+    for event_id, user_id in pairs:
+        actions = len(batch) + 1 + len(users | {user_id}) + len(events | {event_id})
+        if batch and actions > TRANSACT_MAX_ITEMS:
+            batches.append(batch)
+            batch, users, events = [], set(), set()
+        batch.append((event_id, user_id))
+        users.add(user_id)
+        events.add(event_id)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _capacity_state(event: Dict[str, Any], version: int = 0) -> Dict[str, Any]:
+    """
+    Local view of an event's seats. `version` counts refreshes from the table, so a batch can
+    tell whether the state it planned against has been replaced since.
+    """
+    return {"capacity": event.get("max_capacity"), "registered": event.get("registered_count", 0), "version": version}
+
+
+async def _event_capacities(db, event_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Capacity state ({"capacity", "registered"}) of the events that exist, read with BatchGetItem.
+    """
+    events = await batch_get_items(
+        db,
+        EVENTS_TABLE,
+        [{"id": event_id} for event_id in event_ids],
+        projection_kwargs(("max_capacity", "registered_count"), ("id",)),
+    )
+    return {event["id"]: _capacity_state(event) for event in map(plain_numbers, events)}
+
+
+def _fit_capacity(pairs: List[Tuple[int, int]], events: Dict[int, Dict[str, Any]], failed: List[Dict[str, Any]]):
+    """
+    Keep the links that fit in each event's room left, in order; the rest fail as full.
+    """
+    room, kept = {}, []
+    for event_id, user_id in pairs:
+        state = events[event_id]
+        if state["capacity"] is not None:
+            room.setdefault(event_id, state["capacity"] - state["registered"])
+            if room[event_id] <= 0:
+                failed.append({"event_id": event_id, "user_id": user_id, "error": "Event is full."})
+                continue
+            room[event_id] -= 1
+        kept.append((event_id, user_id))
+    return kept
+
+
+async def _write_link_batch(db, spec, pairs: List[Tuple[int, int]], events: Dict[int, Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Write one batch as a transaction. Links that already exist, or whose user or event is
+    missing, are dropped from the batch and the rest retried; conflicts are retried with backoff.
+    For registrations `events` holds the capacity state of each event, shared by the concurrent
+    batches: each batch takes its seats with one counter update per event, links beyond the
+    room left fail as "Event is full.", and a rejected seat claim replaces the state with the
+    event the claim returned. A successful batch only adds its seats to a state that has not
+    been replaced since it planned, since a replacement may already include them.
+    """
+    skipped, failed = [], []
+    attempt = 0
+    while pairs:
+        if events is not None:
+            pairs = _fit_capacity(pairs, events, failed)
+            if not pairs:
+                break
+        created_at = datetime.now().isoformat()
+        users, seats = {}, {}
+        for event_id, user_id in pairs:
+            users[user_id] = users.get(user_id, 0) + 1
+            seats[event_id] = seats.get(event_id, 0) + 1
+        versions = {event_id: events[event_id]["version"] for event_id in seats} if events is not None else {}
+        actions = (
+            [_put_link(spec, event_id, user_id, created_at) for event_id, user_id in pairs]
+            + [_add_to_counter(spec, user_id, count) for user_id, count in users.items()]
+            + [
+                _event_exists(event_id) if events is None else _claim_seats(event_id, count, events[event_id]["capacity"])
+                for event_id, count in seats.items()
+            ]
+        )
+        try:
+            await db.meta.client.transact_write_items(TransactItems=actions)
+            if events is not None:
+                for event_id, count in seats.items():
+                    if events[event_id]["version"] == versions[event_id]:
+                        events[event_id]["registered"] += count
+            return {"created": len(pairs), "skipped": skipped, "failed": failed}
+        except ClientError as e:
+            if not _is_cancelled(e):
+                raise
+            reasons = e.response.get("CancellationReasons", [])
+            codes = _cancellation_codes(e)
+        rejected = {i for i, code in enumerate(codes) if code == "ConditionalCheckFailed"}
+        if rejected:
+            missing_users = {u for i, u in enumerate(users, len(pairs)) if i in rejected}
+            missing_events = set()
+            for i, event_id in enumerate(seats, len(pairs) + len(users)):
+                if i not in rejected:
+                    continue
+                if events is not None and "Item" in reasons[i]:
+                    # Full, or its capacity changed: retry against the current state
+                    events[event_id] = _capacity_state(
+                        _deserialize(reasons[i]["Item"]), events[event_id]["version"] + 1
+                    )
+                else:
+                    missing_events.add(event_id)
+            remaining = []
+            for i, (event_id, user_id) in enumerate(pairs):
+                if user_id in missing_users:
+                    failed.append({"event_id": event_id, "user_id": user_id, "error": "User not found."})
+                elif event_id in missing_events:
+                    failed.append({"event_id": event_id, "user_id": user_id, "error": "Event not found."})
+                elif i in rejected:
+                    skipped.append({"event_id": event_id, "user_id": user_id})
+                else:
+                    remaining.append((event_id, user_id))
+            pairs = remaining
+            continue
+        # TransactionConflict or throttling: another writer touched one of the items
+        if attempt >= REGISTRATION_BULK_MAX_RETRIES:
+            failed.extend({"event_id": ev, "user_id": u, "error": ", ".join(codes)} for ev, u in pairs)
+            break
+        await asyncio.sleep(random.uniform(0, REGISTRATION_BULK_BASE_DELAY * (2 ** attempt)))
+        attempt += 1
+    return {"created": 0, "skipped": skipped, "failed": failed}
+
+
+async def bulk_create_links(
+    db,
+    kind: str,
+    links: Iterable[Tuple[int, int]],
+    concurrency: int = None,
+) -> Dict[str, Any]:
+    """
+    Create many (event_id, user_id) links. Links are packed into transactions of up to 100
+    actions that increment each user's counter once by the number of links created for them.
+    Registrations also take seats; those that do not fit an event's max_capacity fail as
+    "Event is full." (bulk imports do not waitlist).
+    Returns counts of created links plus the skipped (already existing) and failed ones.
+    """
+    spec = _spec(kind)
+    pairs = list(dict.fromkeys((int(event_id), int(user_id)) for event_id, user_id in links))
+    semaphore = asyncio.Semaphore(max(1, concurrency or REGISTRATION_BULK_CONCURRENCY))
+    events, unknown = None, []
+    if kind == "registration" and pairs:
+        try:
+            events = await _event_capacities(db, {event_id for event_id, _ in pairs})
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"DynamoDB read error: {str(e)}")
+        unknown = [
+            {"event_id": event_id, "user_id": user_id, "error": "Event not found."}
+            for event_id, user_id in pairs if event_id not in events
+        ]
+        pairs = [(event_id, user_id) for event_id, user_id in pairs if event_id in events]
+
+    async def write(batch):
+        async with semaphore:
+            try:
+                return await _write_link_batch(db, spec, batch, events)
+            except ClientError as e:
+                logger.error(f"Bulk {kind} transaction failed: {str(e)}")
+                return {
+                    "created": 0,
+                    "skipped": [],
+                    "failed": [{"event_id": ev, "user_id": u, "error": str(e)} for ev, u in batch],
+                }
+
+    results = await asyncio.gather(*[write(batch) for batch in _pack_transactions(pairs)])
+    if any(result["created"] for result in results):
+        user_service.invalidate_user_cache()
+    return {
+        "created": sum(result["created"] for result in results),
+        "skipped": [link for result in results for link in result["skipped"]],
+        "failed": unknown + [link for result in results for link in result["failed"]],
+    }
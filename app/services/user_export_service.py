@@ -0,0 +1,40 @@
+import csv
+import io
+from typing import Any, AsyncIterator, Dict, List
+
+import orjson
+
+from app.schemas import schemas
+from app.services import user_service
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+# CSV columns, in schemas.User field order
+EXPORT_CSV_FIELDS = ["id"] + [field for field in schemas.User.model_fields if field != "id"]
+
+
+def _ndjson_chunk(users: List[Dict[str, Any]]) -> bytes:
+    return b"".join(orjson.dumps(user) + b"\n" for user in users)
+
+
+def _csv_chunk(users: List[Dict[str, Any]], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_FIELDS, extrasaction="ignore")
+    if header:
+        writer.writeheader()
+    writer.writerows(users)
+    return buffer.getvalue().encode()
+
+
+async def export_users(db, format: str = "ndjson", segments: int = None, **filter_kwargs) -> AsyncIterator[bytes]:
+    """
+    Stream every user matching the filter_users filters as NDJSON or CSV, one chunk per round of
+    DynamoDB pages from user_service.iter_user_pages, so memory stays constant for any export size.
+    """
+    if format == "csv":
+        # Send the header before the first read so the response starts immediately
+        yield _csv_chunk([], header=True)
+    async for page in user_service.iter_user_pages(db, segments=segments, **filter_kwargs):
+        yield _csv_chunk(page) if format == "csv" else _ndjson_chunk(page)
@@ -0,0 +1,250 @@
+import asyncio
+import codecs
+import csv
+import json
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.schemas import schemas
+from app.services import user_service
+from app.utils.dynamodb_batch import BATCH_WRITE_MAX_ITEMS, batch_write_items
+
+USERS_TABLE = "users"
+# Maintained by registration_service; an import never overwrites them on an existing user
+USER_COUNTERS = ("events_hosted", "events_attended")
+
+# BatchWriteItem requests in flight while the upload is still being parsed
+USER_IMPORT_CONCURRENCY = int(os.getenv("USER_IMPORT_CONCURRENCY", "8"))
+# Row errors returned in the report; further errors are only counted
+USER_IMPORT_MAX_ERRORS = int(os.getenv("USER_IMPORT_MAX_ERRORS", "1000"))
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+def import_format(content_type: Optional[str], format: Optional[str] = None) -> str:
+    """
+    Pick the upload format from an explicit `format` or the request Content-Type.
+    """
+    if format:
+        if format not in IMPORT_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Invalid format: {format}")
+        return format
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in ("text/csv", "application/csv"):
+        return "csv"
+    if media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"):
+        return "ndjson"
+    raise HTTPException(status_code=415, detail="Upload text/csv or application/x-ndjson, or pass format=csv|ndjson.")
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a byte stream into text lines without holding more than one chunk in memory.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def _iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield (row number, dict) per CSV record; the first record is the header. A record whose
+    quotes are unbalanced continues on the next line (quoted newlines).
+    """
+    header = None
+    record, row_number = "", 0
+    async for line in lines:
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        record, text = "", record.rstrip("\r")
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        # Empty cells are missing values, not empty strings
+        yield row_number, {name: value for name, value in zip(header, values) if value != ""}
+    if record:
+        yield row_number + 1, ValueError("Unterminated quoted field")
+
+
+async def _iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Any]]:
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield row_number, ValueError(f"Invalid JSON: {str(e)}")
+            continue
+        yield row_number, row if isinstance(row, dict) else ValueError("Expected a JSON object")
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}" for detail in error.errors()
+    )
+
+
+class _ImportReport:
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def error(self, row: int, message: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "error": message})
+
+    def result(self) -> Dict[str, Any]:
+        self.errors.sort(key=lambda error: error["row"])
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def _profile_update(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    UpdateItem arguments that replace an existing user's profile with `item` like a put
+    would (profile fields missing from the row are removed) but leave USER_COUNTERS alone.
+    """
+    fields = [field for field in item if field != "id" and field not in USER_COUNTERS]
+    removed = [
+        field for field in schemas.UserImport.model_fields
+        if field not in item and field != "id" and field not in USER_COUNTERS
+    ]
+    names = {f"#f{i}": field for i, field in enumerate(fields + removed)}
+    expression = "SET " + ", ".join(f"#f{i} = :f{i}" for i in range(len(fields)))
+    if removed:
+        expression += " REMOVE " + ", ".join(f"#f{i}" for i in range(len(fields), len(fields) + len(removed)))
+    return {
+        "Key": {"id": item["id"]},
+        "UpdateExpression": expression,
+        # A user deleted since the existence check is written as a new user instead
+        "ConditionExpression": Attr("id").exists(),
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": {f":f{i}": item[field] for i, field in enumerate(fields)},
+    }
+
+
+async def _write_users(db, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Write one batch of validated users; returns the items that could not be written.
+
+    New ids are put with BatchWriteItem. Ids that already exist are updated one UpdateItem
+    each so a re-import does not reset the counters their registrations maintain.
+    """
+    existing = await user_service.batch_get_users(db, [item["id"] for item in items], ["id"])
+    new_items = [dict({counter: 0 for counter in USER_COUNTERS}, **item) for item in items if item["id"] not in existing]
+    table = await db.Table(USERS_TABLE)
+
+    async def update(item):
+        try:
+            await table.update_item(**_profile_update(item))
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            return [dict({counter: 0 for counter in USER_COUNTERS}, **item)]
+        return []
+
+    retries = await asyncio.gather(*[update(item) for item in items if item["id"] in existing])
+    new_items += [item for retry in retries for item in retry]
+    return await batch_write_items(db, USERS_TABLE, new_items) if new_items else []
+
+
+async def import_users(
+    db,
+    chunks: AsyncIterator[bytes],
+    format: str,
+    concurrency: int = None,
+    max_errors: int = None,
+) -> Dict[str, Any]:
+    """
+    Stream an uploaded CSV/NDJSON body into the users table.
+
+    Rows are validated one by one with schemas.UserImport and written in batches of 25, up to
+    `concurrency` batches in flight while parsing continues, so only the batches in flight are
+    held in memory. New users go through BatchWriteItem (unprocessed items are retried by
+    batch_write_items); existing users are updated in place, keeping their event counters. Returns counts and per-row errors (1-based data row numbers).
+    """
+    concurrency = max(1, concurrency or USER_IMPORT_CONCURRENCY)
+    report = _ImportReport(USER_IMPORT_MAX_ERRORS if max_errors is None else max_errors)
+    parse = _iter_csv_rows if format == "csv" else _iter_ndjson_rows
+    in_flight = set()
+
+    async def write(batch: List[Tuple[int, Dict[str, Any]]]):
+        rows_by_id = {item["id"]: row for row, item in batch}
+        try:
+            failed = await _write_users(db, [item for _, item in batch])
+        except Exception as e:
+            failed = [item for _, item in batch]
+            message = f"DynamoDB write error: {str(e)}"
+        else:
+            message = "Write still unprocessed after retries"
+        for item in failed:
+            report.error(rows_by_id[item["id"]], message)
+        report.imported += len(batch) - len(failed)
+
+    async def submit(batch):
+        if len(in_flight) >= concurrency:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            in_flight.difference_update(done)
+        in_flight.add(asyncio.create_task(write(batch)))
+
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+    batch_ids = set()
+    try:
+        async for row_number, row in parse(_iter_lines(chunks)):
+            if isinstance(row, Exception):
+                report.error(row_number, str(row))
+                continue
+            try:
+                user = schemas.UserImport.model_validate(row)
+            except ValidationError as e:
+                report.error(row_number, _validation_message(e))
+                continue
+            item = user.model_dump(mode="json", exclude_none=True)
+            # BatchWriteItem rejects two puts of the same key in one request
+            if item["id"] in batch_ids:
+                await submit(batch)
+                batch, batch_ids = [], set()
+            batch.append((row_number, item))
+            batch_ids.add(item["id"])
+            if len(batch) == BATCH_WRITE_MAX_ITEMS:
+                await submit(batch)
+                batch, batch_ids = [], set()
+        if batch:
+            await submit(batch)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+    finally:
+        for task in in_flight:
+            task.cancel()
+        if report.imported:
+            user_service.invalidate_user_cache()
+    return report.result()
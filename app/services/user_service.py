@@ -1,7 +1,68 @@
-from typing import Optional, List, Dict, Any
+import asyncio
+import heapq
+import itertools
+import os
+from decimal import Decimal
+from typing import Optional, List, Dict, Any, AsyncIterator, Sequence
 from fastapi import HTTPException
 from boto3.dynamodb.conditions import Attr, Key
 
+from app.utils.cache import TTLCache
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.dynamodb_batch import batch_get_items
+from app.utils.dynamodb_query import (
+    SEGMENT_DONE,
+    SEGMENT_START,
+    ReadBudget,
+    plain_numbers,
+    projection_kwargs,
+    query_until_full,
+    segmented_scan,
+    valid_scan_positions,
+)
+from app.utils.metrics import CallbackMetric, Counter
+
+# Parallel scan tuning
+USER_SCAN_SEGMENTS = int(os.getenv("USER_SCAN_SEGMENTS", "4"))
+USER_SCAN_PAGE_SIZE = int(os.getenv("USER_SCAN_PAGE_SIZE", "500"))
+
+# Work budget for one filter_users page: sparse FilterExpression pages are read internally
+# until the page is full or this much read capacity / wall time has been spent.
+USER_FILTER_MAX_RCU = float(os.getenv("USER_FILTER_MAX_RCU", "500"))
+USER_FILTER_MAX_SECONDS = float(os.getenv("USER_FILTER_MAX_SECONDS", "2"))
+
+# Read-through cache for filter_users pages (set either value to 0 to disable)
+USER_FILTER_CACHE_SIZE = int(os.getenv("USER_FILTER_CACHE_SIZE", "1024"))
+USER_FILTER_CACHE_TTL = float(os.getenv("USER_FILTER_CACHE_TTL", "30"))
+
+USERS_TABLE_KEY = ("id",)
+
+# Users GSIs the query planner can route to: (index name, hash key, range key)
+USER_QUERY_INDEXES = [
+    ("company-job_title-index", "company", "job_title"),
+    ("job_title-company-index", "job_title", "company"),
+    ("state-city-index", "state", "city"),
+    ("state-events_attended-index", "state", "events_attended"),
+    ("state-events_hosted-index", "state", "events_hosted"),
+]
+
+# Fields written on every user (default 0), so GSIs ranged on them are not sparse
+USER_DEFAULTED_FIELDS = {"events_hosted", "events_attended"}
+
+_filter_cache = TTLCache(maxsize=USER_FILTER_CACHE_SIZE, ttl=USER_FILTER_CACHE_TTL)
+
+# Which branch served each uncached filter_users page; with dynamodb_items_scanned_total vs
+# dynamodb_items_returned_total per index this shows which filters need a new GSI
+USER_FILTER_PLANS = Counter(
+    "user_filter_plans_total",
+    "filter_users pages read from DynamoDB by plan (gsi, scan, parallel_scan, *_sort) and index.",
+    ("plan", "index"),
+)
+CallbackMetric("user_filter_cache_hits_total", "filter_users pages served from cache.", "counter",
+               lambda: _filter_cache.stats()["hits"])
+CallbackMetric("user_filter_cache_misses_total", "filter_users pages read from DynamoDB.", "counter",
+               lambda: _filter_cache.stats()["misses"])
+
 # Allowed fields for sorting and filtering
 USER_SORTABLE_FIELDS = {
     "id",
@@ -16,8 +77,23 @@ USER_SORTABLE_FIELDS = {
     "events_attended",
 }
 
+# Fields that can be requested with `fields`
+USER_PROJECTABLE_FIELDS = USER_SORTABLE_FIELDS | {"role", "phone_number", "avatar", "gender"}
+
 
-def _validate_filter_users_inputs(limit: int, sort_by: Optional[str], sort_order: str, cursor: Optional[str]):
+def validate_filter_users_inputs(
+    limit: int,
+    sort_by: Optional[str],
+    sort_order: str,
+    cursor: Optional[str],
+    fields: Optional[Sequence[str]] = None,
+):
+    """
+    Validate filter inputs and return the decoded cursor state (None for the first page).
+    """
+    invalid_fields = sorted(set(fields or ()) - USER_PROJECTABLE_FIELDS)
+    if invalid_fields:
+        raise HTTPException(status_code=400, detail=f"Invalid fields: {', '.join(invalid_fields)}")
     if limit < 1 or limit > 200:
         raise HTTPException(status_code=400, detail="Limit must be between 1 and 200.")
     if sort_by and sort_by not in USER_SORTABLE_FIELDS:
@@ -26,13 +102,24 @@ def _validate_filter_users_inputs(limit: int, sort_by: Optional[str], sort_order
         raise HTTPException(
             status_code=400, detail="sort_order must be 'asc' or 'desc'."
         )
+    if cursor is None:
+        return None
     try:
-        if cursor is not None:
-            cursor_val = int(cursor)
-            if cursor_val < 0:
-                raise ValueError
-    except (ValueError, TypeError):
+        state = decode_cursor(cursor)
+    except ValueError:
         raise HTTPException(status_code=400, detail="Invalid cursor value.")
+    return state
+
+
+def _cursor_state(state: Optional[Dict[str, Any]], mode: str, field: str, field_type) -> Optional[Dict[str, Any]]:
+    """
+    Check that a decoded cursor belongs to the execution path (`mode`) chosen for this request.
+    """
+    if state is None:
+        return None
+    if state.get("m") != mode or not isinstance(state.get(field), field_type) or not state[field]:
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested filters.")
+    return state
 
 
 def _build_filter_expression(filters: Dict[str, Any]):
@@ -53,54 +140,165 @@ def _build_filter_expression(filters: Dict[str, Any]):
     return reduce(lambda a, b: a & b, conditions)
 
 
-def _get_gsi_query_kwargs(company, job_title, sort_by, sort_order, limit, cursor):
-    if company and sort_by == "job_title":
-        kwargs = {
-            "IndexName": "company-job_title-index",
-            "KeyConditionExpression": Key("company").eq(company),
-            "ScanIndexForward": (sort_order == "asc"),
-            "Limit": limit + 1,
-        }
-        if cursor:
-            kwargs["ExclusiveStartKey"] = {"company": company, "job_title": cursor}
-        return kwargs, "job_title"
-    elif job_title and sort_by == "company":
-        kwargs = {
-            "IndexName": "job_title-company-index",
-            "KeyConditionExpression": Key("job_title").eq(job_title),
-            "ScanIndexForward": (sort_order == "asc"),
-            "Limit": limit + 1,
-        }
-        if cursor:
-            kwargs["ExclusiveStartKey"] = {"job_title": job_title, "company": cursor}
-        return kwargs, "company"
-    return None, None
-
-
-async def _parallel_scan(table, scan_kwargs, total_segments=4):
-    """
-    Perform a parallel scan on a DynamoDB table using multiple segments for large datasets.
-    """
-    import asyncio
-    from copy import deepcopy
-
-    async def scan_segment(segment):
-        segment_kwargs = deepcopy(scan_kwargs)
-        segment_kwargs["Segment"] = segment
-        segment_kwargs["TotalSegments"] = total_segments
-        return await table.scan(**segment_kwargs)
-
-    results = await asyncio.gather(
-        *[scan_segment(segment) for segment in range(total_segments)]
-    )
-    items = []
-    last_evaluated_keys = []
-    for result in results:
-        items.extend(result.get("Items", []))
-        lek = result.get("LastEvaluatedKey")
-        if lek:
-            last_evaluated_keys.append(lek)
-    return items, last_evaluated_keys
+def _plan_user_query(filters: Dict[str, Any], sort_by: Optional[str], sort_order: str):
+    """
+    Pick the most selective users GSI for the supplied filters.
+
+    An index is eligible when its hash key has an equality filter and every user that can match
+    is present in it (GSIs are sparse: items lacking the range key are left out). That holds when
+    the range key is filtered on, always written (USER_DEFAULTED_FIELDS), or is the sort_by field
+    (users without the sort field are left out, as with the original GSI sort path).
+    Ranking: equality on the range key, then a range condition on it, then serving sort_by.
+    Returns None when no index applies (full scan), else a dict with the query kwargs, the index
+    key attributes, the residual filters and whether the index order serves sort_by.
+    """
+    best, best_score = None, None
+    for position, (index_name, hash_attr, range_attr) in enumerate(USER_QUERY_INDEXES):
+        hash_value = filters.get(hash_attr)
+        if hash_value is None or isinstance(hash_value, tuple):
+            continue
+        range_value = filters.get(range_attr)
+        if isinstance(range_value, tuple) and range_value == (None, None):
+            range_value = None
+        serves_sort = sort_by == range_attr
+        if range_value is None and not serves_sort and range_attr not in USER_DEFAULTED_FIELDS:
+            continue
+        if range_value is None:
+            range_score = 0
+        elif isinstance(range_value, tuple):
+            range_score = 1
+        else:
+            range_score = 2
+        score = (range_score, serves_sort, -position)
+        if best_score is None or score > best_score:
+            best, best_score = (index_name, hash_attr, range_attr, range_value, serves_sort), score
+    if best is None:
+        return None
+
+    index_name, hash_attr, range_attr, range_value, serves_sort = best
+    key_condition = Key(hash_attr).eq(filters[hash_attr])
+    if isinstance(range_value, tuple):
+        min_val, max_val = range_value
+        if min_val is not None and max_val is not None:
+            key_condition = key_condition & Key(range_attr).between(min_val, max_val)
+        elif min_val is not None:
+            key_condition = key_condition & Key(range_attr).gte(min_val)
+        else:
+            key_condition = key_condition & Key(range_attr).lte(max_val)
+    elif range_value is not None:
+        key_condition = key_condition & Key(range_attr).eq(range_value)
+    return {
+        "index_name": index_name,
+        "index_keys": (hash_attr, range_attr),
+        "query_kwargs": {
+            "IndexName": index_name,
+            "KeyConditionExpression": key_condition,
+            "ScanIndexForward": (sort_order == "asc") if serves_sort else True,
+        },
+        "residual_filters": {k: v for k, v in filters.items() if k not in (hash_attr, range_attr)},
+        "serves_sort": serves_sort,
+    }
+
+
+async def _scan_all_pages(table, scan_kwargs, total_segments, page_size):
+    """
+    Async generator draining every scan segment in parallel, yielding one list of items per round.
+    """
+    positions = [SEGMENT_START] * total_segments
+    while True:
+        active = sum(pos != SEGMENT_DONE for pos in positions)
+        if not active:
+            return
+        # Finished segments stay in `positions` so TotalSegments never changes between rounds
+        items, positions = await segmented_scan(
+            table,
+            scan_kwargs,
+            page_size * active,
+            positions,
+            key_attrs=USERS_TABLE_KEY,
+            page_size=page_size,
+        )
+        yield items
+
+
+async def _query_all_pages(table, query_kwargs, page_size):
+    """
+    Async generator yielding every page of a query.
+    """
+    kwargs = dict(query_kwargs)
+    kwargs["Limit"] = page_size
+    while True:
+        response = await table.query(**kwargs)
+        yield response.get("Items", [])
+        if not response.get("LastEvaluatedKey"):
+            return
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def _sort_key(item: Dict[str, Any], sort_by: str, descending: bool):
+    """
+    Total ordering key for in-memory sorts: (type rank, value, id).
+    Mixed types never compare directly and missing values sort last in either direction.
+    """
+    value = item.get(sort_by)
+    if value is None:
+        rank, value = (-1 if descending else 9), 0
+    elif isinstance(value, bool):
+        rank, value = 1, int(value)
+    elif isinstance(value, (int, float, Decimal)):
+        rank = 1
+    elif isinstance(value, str):
+        rank = 2
+    else:
+        rank, value = 3, str(value)
+    return rank, value, item.get("id")
+
+
+async def _top_k_sorted(pages, sort_by, sort_order, limit, after_key=None):
+    """
+    Stream every matching item from the `pages` async iterator through a bounded top-K selection
+    and return the first `limit` items after `after_key` in global sort order, plus whether more
+    items follow.
+    Memory stays O(limit + one scan round) however large the table is.
+    """
+    descending = sort_order == "desc"
+    select = heapq.nlargest if descending else heapq.nsmallest
+
+    def key(item):
+        return _sort_key(item, sort_by, descending)
+
+    def is_after(item):
+        if after_key is None:
+            return True
+        return key(item) < after_key if descending else key(item) > after_key
+
+    best = []
+    matched = 0
+    async for page in pages:
+        candidates = [item for item in page if is_after(item)]
+        matched += len(candidates)
+        best = select(limit, itertools.chain(best, candidates), key=key)
+    return best, matched > len(best)
+
+
+def _user_filters(
+    company=None,
+    job_title=None,
+    city=None,
+    state=None,
+    events_hosted_min=None,
+    events_hosted_max=None,
+    events_attended_min=None,
+    events_attended_max=None,
+) -> Dict[str, Any]:
+    return {
+        "company": company,
+        "job_title": job_title,
+        "city": city,
+        "state": state,
+        "events_hosted": (events_hosted_min, events_hosted_max),
+        "events_attended": (events_attended_min, events_attended_max),
+    }
 
 
 async def filter_users(
@@ -117,74 +315,309 @@ async def filter_users(
     cursor: Optional[str] = None,
     sort_by: Optional[str] = None,
     sort_order: str = "asc",
+    fields: Optional[Sequence[str]] = None,
 ) -> Dict[str, Any]:
     """
     Filter users from DynamoDB with async scan or query, in-memory sort if needed, and pagination.
-    Uses GSIs for efficient company/job_title sorting.
-    For large scans, uses parallel scan for better performance.
+    A small query planner routes equality/range filters to the most selective GSI
+    (see _plan_user_query) and applies the remaining filters as a residual FilterExpression.
+    For large scans, uses a segmented parallel scan; its cursor resumes every segment exactly.
+    Sparse FilterExpression pages are read internally until the page is full or the ReadBudget
+    is spent, so a short page with a next_cursor only happens when the budget runs out.
+    In-memory sorts are global: every match is streamed through a bounded top-K selection and
+    the cursor is a keyset (last sort value + id), so pages continue without overlap.
+    `fields` limits each result to those attributes and is sent as a ProjectionExpression, which
+    also reads the keys needed for the cursor and sort.
+    Pages are served from an in-process LRU/TTL cache keyed on the normalized request;
+    call invalidate_user_cache() after writing users.
     Raises HTTPException for invalid input.
     """
-    _validate_filter_users_inputs(limit, sort_by, sort_order, cursor)
+    cursor_state = validate_filter_users_inputs(limit, sort_by, sort_order, cursor, fields)
+    fields = tuple(dict.fromkeys(fields)) if fields else None
+    filters = _user_filters(
+        company, job_title, city, state, events_hosted_min, events_hosted_max, events_attended_min, events_attended_max
+    )
+    cache_key = (
+        tuple(sorted(filters.items())),
+        limit,
+        cursor,
+        sort_by,
+        sort_order if sort_by else None,
+        fields,
+    )
+    result = await _filter_cache.get_or_load(
+        cache_key,
+        lambda: _run_filter_users(db, filters, limit, cursor, cursor_state, sort_by, sort_order, fields),
+    )
+    # Shallow copy so callers cannot mutate the cached page
+    return dict(result, results=list(result["results"]))
+
+
+async def iter_filter_users(
+    db,
+    page_size: int = 200,
+    cursor: Optional[str] = None,
+    max_results: Optional[int] = None,
+    **filter_kwargs,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Async generator over every filter_users page for the given filters (same keyword arguments),
+    starting at `cursor` and stopping after `max_results` users if set. The next page is fetched
+    while the caller processes the current one; only one page is ever held besides that prefetch.
+    Pages bypass the filter_users cache: a bulk walk would only evict the interactive pages.
+    """
+    sort_by = filter_kwargs.pop("sort_by", None)
+    sort_order = filter_kwargs.pop("sort_order", "asc")
+    fields = filter_kwargs.pop("fields", None)
+    fields = tuple(dict.fromkeys(fields)) if fields else None
+    filters = _user_filters(**filter_kwargs)
+
+    def fetch(page_cursor, remaining):
+        limit = page_size if remaining is None else min(page_size, remaining)
+        cursor_state = validate_filter_users_inputs(limit, sort_by, sort_order, page_cursor, fields)
+        return asyncio.ensure_future(
+            _run_filter_users(db, filters, limit, page_cursor, cursor_state, sort_by, sort_order, fields)
+        )
+
+    remaining = max_results
+    next_fetch = fetch(cursor, remaining) if remaining is None or remaining > 0 else None
+    try:
+        while next_fetch is not None:
+            page = await next_fetch
+            next_fetch = None
+            if remaining is not None:
+                remaining -= page["count"]
+            if page["next_cursor"] and (remaining is None or remaining > 0):
+                next_fetch = fetch(page["next_cursor"], remaining)
+            yield page
+    finally:
+        if next_fetch is not None:
+            next_fetch.cancel()
+
+
+async def iter_user_pages(
+    db,
+    company: Optional[str] = None,
+    job_title: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    events_hosted_min: Optional[int] = None,
+    events_hosted_max: Optional[int] = None,
+    events_attended_min: Optional[int] = None,
+    events_attended_max: Optional[int] = None,
+    segments: Optional[int] = None,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Async generator over every user matching the filter_users filters, in storage order,
+    yielding each round of DynamoDB pages as soon as it arrives. Unlike iter_filter_users,
+    pages are not filled up to a limit or cached, so the first users are available after one
+    round trip and memory holds one round. Unindexed filters use a parallel scan of
+    `segments` (default USER_SCAN_SEGMENTS).
+    """
+    filters = _user_filters(
+        company, job_title, city, state, events_hosted_min, events_hosted_max, events_attended_min, events_attended_max
+    )
     table = await db.Table("users")
+    plan = _plan_user_query(filters, None, "asc")
+    if plan:
+        query_kwargs = dict(plan["query_kwargs"])
+        residual_expression = _build_filter_expression(plan["residual_filters"])
+        if residual_expression is not None:
+            query_kwargs["FilterExpression"] = residual_expression
+        pages = _query_all_pages(table, query_kwargs, USER_SCAN_PAGE_SIZE)
+    else:
+        scan_kwargs = {}
+        filter_expression = _build_filter_expression(filters)
+        if filter_expression is not None:
+            scan_kwargs["FilterExpression"] = filter_expression
+        pages = _scan_all_pages(table, scan_kwargs, max(1, segments or USER_SCAN_SEGMENTS), USER_SCAN_PAGE_SIZE)
+    async for page in pages:
+        if page:
+            yield [plain_numbers(item) for item in page]
+
+
+async def batch_get_users(db, user_ids: Sequence[int], fields: Optional[Sequence[str]] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    Fetch users by id with BatchGetItem (100 keys per request, all requests in parallel,
+    UnprocessedKeys retried). Returns {id: user} for the users that exist.
+    """
+    projection = projection_kwargs(fields, USERS_TABLE_KEY) if fields else None
+    items = await batch_get_items(db, "users", [{"id": user_id} for user_id in user_ids], projection)
+    users = {}
+    for item in items:
+        user = plain_numbers(item)
+        users[user["id"]] = {field: user[field] for field in fields if field in user} if fields else user
+    return users
+
 
-    # Try GSI query if possible
-    gsi_kwargs, gsi_cursor_field = _get_gsi_query_kwargs(company, job_title, sort_by, sort_order, limit, cursor)
-    if gsi_kwargs:
+class UserLoader:
+    """
+    Per-request batch loader (DataLoader-style): every load() issued in the same event loop
+    tick is coalesced into one batch_get_users call, ids are deduplicated, and results are
+    memoized for the loader's lifetime, so hydrating a list of N users costs
+    ceil(N / 100) parallel BatchGetItem requests instead of N GetItem round trips.
+    Create one per request; it never sees later writes.
+    """
+
+    def __init__(self, db, fields: Optional[Sequence[str]] = None):
+        self.db = db
+        self.fields = tuple(fields) if fields else None
+        self._futures: Dict[int, asyncio.Future] = {}
+        self._queue: List[int] = []
+        self.batches = 0
+
+    def load(self, user_id: int) -> "asyncio.Future[Optional[Dict[str, Any]]]":
+        """
+        Awaitable for the user (None if it does not exist).
+        """
+        future = self._futures.get(user_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[user_id] = loop.create_future()
+            if not self._queue:
+                # Dispatch once the tasks already scheduled in this tick have queued their ids
+                loop.call_soon(self._dispatch)
+            self._queue.append(user_id)
+        return future
+
+    async def load_many(self, user_ids: Sequence[int]) -> List[Optional[Dict[str, Any]]]:
+        return list(await asyncio.gather(*[self.load(user_id) for user_id in user_ids]))
+
+    def _dispatch(self):
+        user_ids, self._queue = self._queue, []
+        self.batches += 1
+        asyncio.ensure_future(self._fetch(user_ids))
+
+    async def _fetch(self, user_ids: List[int]):
         try:
-            response = await table.query(**gsi_kwargs)
+            users = await batch_get_users(self.db, user_ids, self.fields)
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"DynamoDB query error: {str(e)}")
-        items = response.get("Items", [])
-        last_evaluated_key = response.get("LastEvaluatedKey")
+            for user_id in user_ids:
+                # Failed loads are not memoized, so a later load() retries
+                future = self._futures.pop(user_id)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for user_id in user_ids:
+            future = self._futures[user_id]
+            if not future.done():
+                future.set_result(users.get(user_id))
+
+
+def invalidate_user_cache():
+    """
+    Invalidation hook for user writes: drops every cached filter_users page.
+    """
+    _filter_cache.invalidate()
+
+
+def user_cache_stats() -> Dict[str, int]:
+    return _filter_cache.stats()
+
+
+async def _run_filter_users(db, filters, limit, cursor, cursor_state, sort_by, sort_order, fields=None) -> Dict[str, Any]:
+    table = await db.Table("users")
+    budget = ReadBudget(USER_FILTER_MAX_RCU, USER_FILTER_MAX_SECONDS)
+
+    next_state = None
+    plan = _plan_user_query(filters, sort_by, sort_order)
+    # Attributes the cursor and sort read, on top of the requested fields
+    required = USERS_TABLE_KEY + ((sort_by,) if sort_by else ()) + (plan["index_keys"] if plan else ())
+    if plan:
+        query_kwargs = dict(plan["query_kwargs"])
+        residual_expression = _build_filter_expression(plan["residual_filters"])
+        if residual_expression is not None:
+            query_kwargs["FilterExpression"] = residual_expression
+        if fields:
+            query_kwargs.update(projection_kwargs(fields, required))
     else:
-        # Build filter expression
-        filters = {
-            "company": company,
-            "job_title": job_title,
-            "city": city,
-            "state": state,
-            "events_hosted": (events_hosted_min, events_hosted_max),
-            "events_attended": (events_attended_min, events_attended_max),
-        }
         filter_expression = _build_filter_expression(filters)
-        scan_kwargs = {"Limit": limit + 1}
+        scan_kwargs = {}
         if filter_expression is not None:
             scan_kwargs["FilterExpression"] = filter_expression
-        if cursor:
-            scan_kwargs["ExclusiveStartKey"] = {"id": int(cursor)}
+        if fields:
+            scan_kwargs.update(projection_kwargs(fields, required))
 
+    in_memory_sort = bool(sort_by) and not (plan and plan["serves_sort"])
+    if plan:
+        plan_name = "gsi"
+    else:
         # Heuristic: Use parallel scan if no filters or only non-indexed filters (likely large scan)
-        use_parallel_scan = filter_expression is None or (
-            not company and not job_title and not city and not state
+        use_parallel_scan = filter_expression is None or not any(
+            filters[field] for field in ("company", "job_title", "city", "state")
         )
-        if use_parallel_scan:
-            try:
-                items, last_evaluated_keys = await _parallel_scan(table, scan_kwargs, total_segments=4)
-                last_evaluated_key = last_evaluated_keys[0] if last_evaluated_keys else None
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"DynamoDB parallel scan error: {str(e)}")
+        plan_name = "parallel_scan" if use_parallel_scan or in_memory_sort else "scan"
+    USER_FILTER_PLANS.inc(
+        plan_name + ("_sort" if in_memory_sort else ""), plan["index_name"] if plan else "-"
+    )
+
+    if in_memory_sort:
+        # Global in-memory sort: read every match, keep only the top `limit` after the cursor
+        sort_state = _cursor_state(cursor_state, "sort", "k", list)
+        if sort_state and (sort_state.get("f") != sort_by or sort_state.get("o") != sort_order):
+            raise HTTPException(status_code=400, detail="Cursor does not match the requested sort.")
+        if plan:
+            pages = _query_all_pages(table, query_kwargs, USER_SCAN_PAGE_SIZE)
         else:
-            response = await table.scan(**scan_kwargs)
-            items = response.get("Items", [])
-            last_evaluated_key = response.get("LastEvaluatedKey")
-        # In-memory sort if requested
-        if sort_by:
-            try:
-                items = sorted(
-                    items, key=lambda x: x.get(sort_by), reverse=(sort_order == "desc")
-                )
-            except Exception:
-                raise HTTPException(status_code=500, detail="Error sorting results.")
+            pages = _scan_all_pages(table, scan_kwargs, USER_SCAN_SEGMENTS, USER_SCAN_PAGE_SIZE)
+        try:
+            items, has_more = await _top_k_sorted(
+                pages,
+                sort_by,
+                sort_order,
+                limit,
+                after_key=tuple(sort_state["k"]) if sort_state else None,
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"DynamoDB read error: {str(e)}")
+        if has_more:
+            last_key = _sort_key(items[-1], sort_by, sort_order == "desc")
+            next_state = {"m": "sort", "f": sort_by, "o": sort_order, "k": list(last_key)}
+    elif plan:
+        query_state = _cursor_state(cursor_state, "query", "k", dict)
+        if query_state and query_state.get("i") != plan["index_name"]:
+            raise HTTPException(status_code=400, detail="Cursor does not match the requested filters.")
+        try:
+            items, last_key = await query_until_full(
+                table,
+                query_kwargs,
+                limit,
+                plan["index_keys"] + USERS_TABLE_KEY,
+                start_key=query_state["k"] if query_state else None,
+                page_size=USER_SCAN_PAGE_SIZE if residual_expression is not None else None,
+                budget=budget,
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"DynamoDB query error: {str(e)}")
+        if last_key:
+            next_state = {"m": "query", "i": plan["index_name"], "k": last_key}
+    else:
+        scan_state = _cursor_state(cursor_state, "scan", "s", list)
+        total_segments = USER_SCAN_SEGMENTS if use_parallel_scan else 1
+        if scan_state and not valid_scan_positions(scan_state["s"], total_segments, USERS_TABLE_KEY):
+            raise HTTPException(status_code=400, detail="Cursor does not match the requested filters.")
+        positions = scan_state["s"] if scan_state else [SEGMENT_START] * total_segments
+        try:
+            items, positions = await segmented_scan(
+                table,
+                scan_kwargs,
+                limit,
+                positions,
+                key_attrs=USERS_TABLE_KEY,
+                page_size=USER_SCAN_PAGE_SIZE if filter_expression is not None else None,
+                budget=budget,
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"DynamoDB scan error: {str(e)}")
+        if any(pos != SEGMENT_DONE for pos in positions):
+            next_state = {"m": "scan", "s": positions}
 
     # Pagination
-    next_cursor = None
-    if last_evaluated_key:
-        if gsi_cursor_field and last_evaluated_key.get(gsi_cursor_field):
-            next_cursor = last_evaluated_key[gsi_cursor_field]
-        elif last_evaluated_key.get("id"):
-            next_cursor = str(last_evaluated_key["id"])
-
-    results = items[:limit]
+    next_cursor = encode_cursor(next_state) if next_state else None
+    # Numbers are converted once here, so cached pages and every caller get plain ints
+    results = [plain_numbers(item) for item in items[:limit]]
+    if fields:
+        results = [{field: item[field] for field in fields if field in item} for item in results]
     return {
         "limit": limit,
         "cursor": cursor,
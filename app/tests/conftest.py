@@ -10,4 +10,12 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 def event_loop():
     loop = asyncio.get_event_loop_policy().new_event_loop()
     yield loop
-    loop.close() 
\ No newline at end of file
+    loop.close()
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    from app.services import user_service
+    user_service.invalidate_user_cache()
+    yield
+    user_service.invalidate_user_cache()
@@ -0,0 +1,611 @@
+# In-memory stand-in for the aioboto3 DynamoDB resource used by the tests
+import asyncio
+import re
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+
+
+def to_dynamo(value):
+    """
+    Convert python numbers to Decimal the way DynamoDB returns them.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: to_dynamo(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_dynamo(v) for v in value]
+    return value
+
+
+def _compare(op: str, left, right) -> bool:
+    if left is None or right is None:
+        return False
+    try:
+        if op == "=":
+            return left == right
+        if op == "<>":
+            return left != right
+        if op == "<":
+            return left < right
+        if op == "<=":
+            return left <= right
+        if op == ">":
+            return left > right
+        if op == ">=":
+            return left >= right
+    except TypeError:
+        return False
+    raise NotImplementedError(op)
+
+
+def evaluate_condition(condition, item: Dict[str, Any]) -> bool:
+    """
+    Evaluate a boto3.dynamodb.conditions object against an item.
+    """
+    op = condition.expression_operator
+    values = condition._values
+    if op == "AND":
+        return all(evaluate_condition(v, item) for v in values)
+    if op == "OR":
+        return any(evaluate_condition(v, item) for v in values)
+    if op == "NOT":
+        return not evaluate_condition(values[0], item)
+    name = values[0].name
+    actual = item.get(name)
+    args = [to_dynamo(v) for v in values[1:]]
+    if op == "BETWEEN":
+        return _compare(">=", actual, args[0]) and _compare("<=", actual, args[1])
+    if op == "begins_with":
+        return isinstance(actual, str) and actual.startswith(args[0])
+    if op == "attribute_exists":
+        return name in item
+    if op == "attribute_not_exists":
+        return name not in item
+    if op == "IN":
+        return actual in args[0]
+    return _compare(op, actual, args[0])
+
+
+_FUNCTION_RE = re.compile(r"^(attribute_exists|attribute_not_exists)\(\s*([#\w]+)\s*\)$")
+_COMPARISON_RE = re.compile(r"^([#:\w]+)\s*(=|<>|<=|>=|<|>)\s*([#:\w]+)$")
+
+
+def _split_top_level(expression: str, operator: str) -> List[str]:
+    """
+    Split `expression` on `operator` (AND/OR) outside parentheses.
+    """
+    parts, depth, start = [], 0, 0
+    pattern = re.compile(r"\(|\)|\s+" + operator + r"\s+", flags=re.IGNORECASE)
+    for match in pattern.finditer(expression):
+        token = match.group(0)
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif depth == 0:
+            parts.append(expression[start:match.start()])
+            start = match.end()
+    parts.append(expression[start:])
+    return parts
+
+
+def _strip_parentheses(expression: str) -> str:
+    expression = expression.strip()
+    while expression.startswith("(") and expression.endswith(")"):
+        depth = 0
+        for i, char in enumerate(expression):
+            depth += {"(": 1, ")": -1}.get(char, 0)
+            if depth == 0 and i < len(expression) - 1:
+                return expression
+        expression = expression[1:-1].strip()
+    return expression
+
+
+def evaluate_expression(expression: str, item: Dict[str, Any], names=None, values=None) -> bool:
+    """
+    Evaluate a low-level ConditionExpression string made of attribute_exists(a),
+    attribute_not_exists(a) and `a <op> b` comparisons (of attributes or :values),
+    combined with AND, OR, NOT and parentheses.
+    """
+    names, values = names or {}, values or {}
+    expression = _strip_parentheses(expression)
+    for operator, combine in (("OR", any), ("AND", all)):
+        parts = _split_top_level(expression, operator)
+        if len(parts) > 1:
+            return combine(evaluate_expression(part, item, names, values) for part in parts)
+    if re.match(r"^NOT\s+", expression, flags=re.IGNORECASE):
+        return not evaluate_expression(expression[3:], item, names, values)
+    match = _FUNCTION_RE.match(expression)
+    if match:
+        exists = _resolve_name(match.group(2), names) in item
+        return exists == (match.group(1) == "attribute_exists")
+    match = _COMPARISON_RE.match(expression)
+    if not match:
+        raise NotImplementedError(expression)
+    left = _resolve_operand(match.group(1), item, names, values)
+    right = _resolve_operand(match.group(3), item, names, values)
+    return _compare(match.group(2), left, right)
+
+
+def conditional_check_failed(operation: str = "UpdateItem") -> ClientError:
+    return ClientError(
+        {"Error": {"Code": "ConditionalCheckFailedException", "Message": "The conditional request failed"}},
+        operation,
+    )
+
+
+_SET_ADD_RE = re.compile(r"^\s*(?P<path>[#\w]+)\s*=\s*(?P<expr>.+?)\s*$")
+
+
+def _resolve_name(token: str, names: Dict[str, str]) -> str:
+    return names.get(token, token) if token.startswith("#") else token
+
+
+def _resolve_operand(token: str, item: Dict[str, Any], names, values):
+    token = token.strip()
+    match = re.match(r"^if_not_exists\(\s*([#\w]+)\s*,\s*(:\w+)\s*\)$", token)
+    if match:
+        name = _resolve_name(match.group(1), names)
+        return item[name] if name in item else to_dynamo(values[match.group(2)])
+    if token.startswith(":"):
+        return to_dynamo(values[token])
+    return item.get(_resolve_name(token, names))
+
+
+def apply_update_expression(item: Dict[str, Any], expression: str, names=None, values=None):
+    """
+    Apply an UpdateExpression made of SET (`a = :v`, `a = b + :v`, `a = if_not_exists(a, :z) + :v`),
+    ADD (`a :v`) and REMOVE clauses to `item` in place.
+    """
+    names, values = names or {}, values or {}
+    clauses = re.split(r"\b(SET|ADD|REMOVE)\b", expression, flags=re.IGNORECASE)
+    for action, body in zip(clauses[1::2], clauses[2::2]):
+        for part in [p.strip() for p in re.split(r",(?![^(]*\))", body) if p.strip()]:
+            action_upper = action.upper()
+            if action_upper == "SET":
+                match = _SET_ADD_RE.match(part)
+                name = _resolve_name(match.group("path"), names)
+                expr = match.group("expr")
+                operands = re.split(r"\s*([+-])\s*(?![^(]*\))", expr)
+                result = _resolve_operand(operands[0], item, names, values)
+                for op, operand in zip(operands[1::2], operands[2::2]):
+                    value = _resolve_operand(operand, item, names, values)
+                    result = result + value if op == "+" else result - value
+                item[name] = result
+            elif action_upper == "ADD":
+                path, placeholder = part.split()
+                name = _resolve_name(path, names)
+                item[name] = item.get(name, Decimal(0)) + to_dynamo(values[placeholder])
+            else:
+                item.pop(_resolve_name(part, names), None)
+
+
+def _key_tuple(item: Dict[str, Any], attrs: Sequence[str]):
+    return tuple(item.get(a) for a in attrs)
+
+
+class FakeTable:
+    """
+    Minimal DynamoDB table supporting the scan/query paging semantics the services rely on:
+    Limit is applied before FilterExpression, pages resume from ExclusiveStartKey and
+    parallel scans split items into Segment/TotalSegments buckets.
+    """
+
+    def __init__(self, name: str, hash_key: str = "id", range_key: Optional[str] = None, indexes=None):
+        self.name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        # index name -> (hash attr, range attr or None)
+        self.indexes = dict(indexes or {})
+        self.items: Dict[tuple, Dict[str, Any]] = {}
+        self.calls: List[tuple] = []
+
+    @property
+    def key_attrs(self):
+        return (self.hash_key,) + ((self.range_key,) if self.range_key else ())
+
+    def _key(self, item):
+        return _key_tuple(item, self.key_attrs)
+
+    def put(self, *items):
+        for item in items:
+            stored = to_dynamo(dict(item))
+            self.items[self._key(stored)] = stored
+
+    def _ordered(self):
+        return [self.items[k] for k in sorted(self.items)]
+
+    @staticmethod
+    def _page(candidates, sort_attrs, kwargs, filter_expression):
+        start_key = kwargs.get("ExclusiveStartKey")
+        if start_key is not None:
+            start = _key_tuple(to_dynamo(start_key), sort_attrs)
+            candidates = [c for c in candidates if _key_tuple(c, sort_attrs) > start]
+        limit = kwargs.get("Limit")
+        evaluated = candidates[:limit] if limit else candidates
+        more = limit is not None and len(candidates) > limit
+        if filter_expression is not None:
+            matched = [c for c in evaluated if evaluate_condition(filter_expression, c)]
+        else:
+            matched = list(evaluated)
+        if kwargs.get("ProjectionExpression"):
+            names = kwargs.get("ExpressionAttributeNames") or {}
+            attrs = [names.get(a.strip(), a.strip()) for a in kwargs["ProjectionExpression"].split(",")]
+            matched = [{a: m[a] for a in attrs if a in m} for m in matched]
+        response = {"Items": [dict(m) for m in matched], "Count": len(matched), "ScannedCount": len(evaluated)}
+        if more and evaluated:
+            response["LastEvaluatedKey"] = {a: evaluated[-1][a] for a in sort_attrs if a in evaluated[-1]}
+        return response
+
+    async def scan(self, **kwargs):
+        self.calls.append(("scan", kwargs))
+        items = self._ordered()
+        total = kwargs.get("TotalSegments")
+        if total:
+            segment = kwargs["Segment"]
+            items = [i for i in items if hash(self._key(i)) % total == segment]
+        return self._page(items, self.key_attrs, kwargs, kwargs.get("FilterExpression"))
+
+    async def query(self, **kwargs):
+        self.calls.append(("query", kwargs))
+        index = kwargs.get("IndexName")
+        if index:
+            hash_attr, range_attr = self.indexes[index]
+        else:
+            hash_attr, range_attr = self.hash_key, self.range_key
+        key_condition = kwargs["KeyConditionExpression"]
+        candidates = [
+            i for i in self.items.values()
+            if hash_attr in i and (range_attr is None or range_attr in i) and evaluate_condition(key_condition, i)
+        ]
+        sort_attrs = tuple(a for a in (hash_attr, range_attr) if a) + tuple(
+            a for a in self.key_attrs if a not in (hash_attr, range_attr)
+        )
+        candidates.sort(key=lambda i: _key_tuple(i, sort_attrs), reverse=not kwargs.get("ScanIndexForward", True))
+        if not kwargs.get("ScanIndexForward", True) and kwargs.get("ExclusiveStartKey") is not None:
+            start = _key_tuple(to_dynamo(kwargs["ExclusiveStartKey"]), sort_attrs)
+            candidates = [c for c in candidates if _key_tuple(c, sort_attrs) < start]
+            kwargs = {k: v for k, v in kwargs.items() if k != "ExclusiveStartKey"}
+        return self._page(candidates, sort_attrs, kwargs, kwargs.get("FilterExpression"))
+
+    async def get_item(self, Key, **kwargs):
+        self.calls.append(("get_item", Key))
+        item = self.items.get(self._key(to_dynamo(Key)))
+        return {"Item": dict(item)} if item else {}
+
+    async def put_item(self, Item, ConditionExpression=None, **kwargs):
+        self.calls.append(("put_item", Item))
+        existing = self.items.get(self._key(to_dynamo(Item)), {})
+        if ConditionExpression is not None and not evaluate_condition(ConditionExpression, existing):
+            raise conditional_check_failed("PutItem")
+        self.put(Item)
+        return {}
+
+    async def update_item(
+        self,
+        Key,
+        UpdateExpression,
+        ConditionExpression=None,
+        ExpressionAttributeNames=None,
+        ExpressionAttributeValues=None,
+        ReturnValues="NONE",
+        **kwargs,
+    ):
+        self.calls.append(("update_item", Key))
+        key = self._key(to_dynamo(Key))
+        existing = self.items.get(key)
+        current = dict(existing) if existing else to_dynamo(dict(Key))
+        if ConditionExpression is not None and not evaluate_condition(ConditionExpression, existing or {}):
+            raise conditional_check_failed()
+        apply_update_expression(current, UpdateExpression, ExpressionAttributeNames, ExpressionAttributeValues)
+        self.items[key] = current
+        return {"Attributes": dict(current)} if ReturnValues == "ALL_NEW" else {}
+
+    async def delete_item(self, Key, ConditionExpression=None, **kwargs):
+        self.calls.append(("delete_item", Key))
+        key = self._key(to_dynamo(Key))
+        if ConditionExpression is not None and not evaluate_condition(ConditionExpression, self.items.get(key, {})):
+            raise conditional_check_failed("DeleteItem")
+        self.items.pop(key, None)
+        return {}
+
+
+class FakeClient:
+    """
+    Low-level client exposed as `db.meta.client`, for the calls that only exist there.
+    """
+
+    def __init__(self, db: "FakeDynamoDB"):
+        self.db = db
+        self.transact_calls: List[List[Dict[str, Any]]] = []
+        # Number of upcoming transact_write_items calls cancelled with TransactionConflict
+        self.conflicting_transactions = 0
+        self.created_tables: List[Dict[str, Any]] = []
+        self.waited_tables: List[str] = []
+        self.update_calls: List[Dict[str, Any]] = []
+        # Page size of list_tables, to exercise pagination
+        self.list_tables_page_size = 100
+
+    async def list_tables(self, ExclusiveStartTableName=None, **kwargs):
+        names = sorted(self.db.tables)
+        if ExclusiveStartTableName is not None:
+            names = [n for n in names if n > ExclusiveStartTableName]
+        page = names[:self.list_tables_page_size]
+        response = {"TableNames": page}
+        if len(names) > len(page):
+            response["LastEvaluatedTableName"] = page[-1]
+        return response
+
+    async def describe_table(self, TableName):
+        if TableName not in self.db.tables:
+            raise ClientError(
+                {"Error": {"Code": "ResourceNotFoundException", "Message": f"Table {TableName} not found"}},
+                "DescribeTable",
+            )
+        table = self.db.tables[TableName]
+
+        def key_schema(hash_attr, range_attr):
+            return [{"AttributeName": hash_attr, "KeyType": "HASH"}] + (
+                [{"AttributeName": range_attr, "KeyType": "RANGE"}] if range_attr else []
+            )
+
+        description = {
+            "TableName": TableName,
+            "TableStatus": "ACTIVE",
+            "KeySchema": key_schema(table.hash_key, table.range_key),
+        }
+        if table.indexes:
+            description["GlobalSecondaryIndexes"] = [
+                {
+                    "IndexName": name,
+                    "KeySchema": key_schema(*keys),
+                    "Projection": {"ProjectionType": "ALL"},
+                    "IndexStatus": "ACTIVE",
+                }
+                for name, keys in table.indexes.items()
+            ]
+        return {"Table": description}
+
+    async def update_table(self, TableName, GlobalSecondaryIndexUpdates=(), **kwargs):
+        self.update_calls.append(dict(kwargs, TableName=TableName, GlobalSecondaryIndexUpdates=list(GlobalSecondaryIndexUpdates)))
+        creates = [u for u in GlobalSecondaryIndexUpdates if "Create" in u or "Delete" in u]
+        assert len(creates) <= 1, "UpdateTable creates or deletes at most one GSI per call"
+        table = self.db.tables[TableName]
+        for update in GlobalSecondaryIndexUpdates:
+            if "Create" in update:
+                by_type = {k["KeyType"]: k["AttributeName"] for k in update["Create"]["KeySchema"]}
+                table.indexes[update["Create"]["IndexName"]] = (by_type["HASH"], by_type.get("RANGE"))
+            elif "Delete" in update:
+                del table.indexes[update["Delete"]["IndexName"]]
+        return {"TableDescription": {"TableName": TableName, "TableStatus": "UPDATING"}}
+
+    async def create_table(self, TableName, KeySchema, **kwargs):
+        if TableName in self.db.tables:
+            raise ClientError(
+                {"Error": {"Code": "ResourceInUseException", "Message": f"Table already exists: {TableName}"}},
+                "CreateTable",
+            )
+
+        def keys(schema):
+            by_type = {k["KeyType"]: k["AttributeName"] for k in schema}
+            return by_type["HASH"], by_type.get("RANGE")
+
+        hash_key, range_key = keys(KeySchema)
+        indexes = {i["IndexName"]: keys(i["KeySchema"]) for i in kwargs.get("GlobalSecondaryIndexes", [])}
+        self.db.tables[TableName] = FakeTable(TableName, hash_key, range_key, indexes)
+        self.created_tables.append(dict(kwargs, TableName=TableName, KeySchema=KeySchema))
+        return {"TableDescription": {"TableName": TableName, "TableStatus": "CREATING"}}
+
+    def get_waiter(self, name):
+        client = self
+
+        class Waiter:
+            async def wait(self, TableName, **kwargs):
+                client.waited_tables.append(TableName)
+
+        return Waiter()
+
+    @staticmethod
+    def _plain(attributes):
+        deserializer = TypeDeserializer()
+        return {k: deserializer.deserialize(v) for k, v in (attributes or {}).items()}
+
+    @staticmethod
+    def _cancelled(codes: List[str], items: Sequence[Optional[Dict[str, Any]]] = ()) -> ClientError:
+        reasons = [{"Code": code} for code in codes]
+        for reason, item in zip(reasons, items):
+            if item is not None:
+                reason["Item"] = {k: TypeSerializer().serialize(v) for k, v in item.items()}
+        return ClientError(
+            {
+                "Error": {"Code": "TransactionCanceledException", "Message": "Transaction cancelled"},
+                "CancellationReasons": reasons,
+            },
+            "TransactWriteItems",
+        )
+
+    async def transact_write_items(self, TransactItems, **kwargs):
+        # Let concurrent callers interleave like requests in flight; the transaction itself
+        # is evaluated and applied atomically below, as DynamoDB does
+        await asyncio.sleep(0)
+        self.transact_calls.append(TransactItems)
+        assert len(TransactItems) <= 100, "TransactWriteItems accepts at most 100 actions"
+        actions = []
+        for entry in TransactItems:
+            (action, request), = entry.items()
+            table = self.db.tables[request["TableName"]]
+            key_source = request["Item"] if action == "Put" else request["Key"]
+            key = table._key(to_dynamo(self._plain(key_source)))
+            actions.append((action, request, table, key))
+        targets = [(table.name, key) for _, _, table, key in actions]
+        if len(set(targets)) != len(targets):
+            raise ClientError(
+                {"Error": {"Code": "ValidationException", "Message": "Transaction has multiple operations on one item"}},
+                "TransactWriteItems",
+            )
+        if self.conflicting_transactions > 0:
+            self.conflicting_transactions -= 1
+            raise self._cancelled(["TransactionConflict"] + ["None"] * (len(actions) - 1))
+        codes, failed_items = [], []
+        for action, request, table, key in actions:
+            condition = request.get("ConditionExpression")
+            ok = condition is None or evaluate_expression(
+                condition,
+                table.items.get(key, {}),
+                request.get("ExpressionAttributeNames"),
+                self._plain(request.get("ExpressionAttributeValues")),
+            )
+            codes.append("None" if ok else "ConditionalCheckFailed")
+            return_old = not ok and request.get("ReturnValuesOnConditionCheckFailure") == "ALL_OLD"
+            failed_items.append(table.items.get(key) if return_old else None)
+        if any(code != "None" for code in codes):
+            raise self._cancelled(codes, failed_items)
+        for action, request, table, key in actions:
+            if action == "Put":
+                table.put(self._plain(request["Item"]))
+            elif action == "Delete":
+                table.items.pop(key, None)
+            elif action == "Update":
+                current = table.items.get(key) or to_dynamo(self._plain(request["Key"]))
+                apply_update_expression(
+                    current,
+                    request["UpdateExpression"],
+                    request.get("ExpressionAttributeNames"),
+                    self._plain(request.get("ExpressionAttributeValues")),
+                )
+                table.items[key] = current
+        return {}
+
+
+class FakeDynamoDB:
+    """
+    Stand-in for the aioboto3 service resource: `await db.Table(name)`.
+    """
+
+    def __init__(self, *tables: FakeTable):
+        self.tables = {t.name: t for t in tables}
+        self.batch_write_calls: List[Dict[str, Any]] = []
+        # Number of upcoming batch_write_item calls that leave their last request unprocessed
+        self.throttled_batch_writes = 0
+        self.batch_get_calls: List[Dict[str, Any]] = []
+        # Number of upcoming batch_get_item calls that leave their last key unprocessed
+        self.throttled_batch_gets = 0
+        self.meta = SimpleNamespace(client=FakeClient(self))
+
+    async def Table(self, name):
+        return self.tables[name]
+
+    async def batch_write_item(self, RequestItems, **kwargs):
+        self.batch_write_calls.append(RequestItems)
+        unprocessed = {}
+        for table_name, requests in RequestItems.items():
+            assert len(requests) <= 25, "BatchWriteItem accepts at most 25 requests"
+            keys = [self.tables[table_name]._key(to_dynamo(r.get("PutRequest", {}).get("Item") or r["DeleteRequest"]["Key"])) for r in requests]
+            assert len(set(keys)) == len(keys), "BatchWriteItem rejects duplicate keys in one request"
+            if self.throttled_batch_writes > 0:
+                self.throttled_batch_writes -= 1
+                requests, unprocessed[table_name] = requests[:-1], requests[-1:]
+            table = self.tables[table_name]
+            for request in requests:
+                if "PutRequest" in request:
+                    table.put(request["PutRequest"]["Item"])
+                else:
+                    table.items.pop(table._key(to_dynamo(request["DeleteRequest"]["Key"])), None)
+        return {"UnprocessedItems": unprocessed}
+
+    async def batch_get_item(self, RequestItems, **kwargs):
+        self.batch_get_calls.append(RequestItems)
+        responses, unprocessed = {}, {}
+        for table_name, request in RequestItems.items():
+            keys = request["Keys"]
+            assert len(keys) <= 100, "BatchGetItem accepts at most 100 keys"
+            table = self.tables[table_name]
+            key_tuples = [table._key(to_dynamo(key)) for key in keys]
+            assert len(set(key_tuples)) == len(key_tuples), "BatchGetItem rejects duplicate keys in one request"
+            if self.throttled_batch_gets > 0 and keys:
+                self.throttled_batch_gets -= 1
+                key_tuples = key_tuples[:-1]
+                unprocessed[table_name] = dict(request, Keys=keys[-1:])
+            found = [dict(table.items[k]) for k in key_tuples if k in table.items]
+            if request.get("ProjectionExpression"):
+                names = request.get("ExpressionAttributeNames") or {}
+                attrs = [names.get(a.strip(), a.strip()) for a in request["ProjectionExpression"].split(",")]
+                found = [{a: item[a] for a in attrs if a in item} for item in found]
+            # DynamoDB returns batch results in no particular order
+            responses[table_name] = list(reversed(found))
+        return {"Responses": responses, "UnprocessedKeys": unprocessed}
+
+
+def email_jobs_table() -> FakeTable:
+    return FakeTable(
+        "email_jobs",
+        indexes={
+            "status-created_at-index": ("status", "created_at"),
+            "status-lease_expires_at-index": ("status", "lease_expires_at"),
+        },
+    )
+
+
+EVENT_LINK_INDEXES = {
+    "event_id-user_id-index": ("event_id", "user_id"),
+    "user_id-event_id-index": ("user_id", "event_id"),
+}
+
+
+def events_table(event_ids=(), events=()) -> FakeTable:
+    table = FakeTable(
+        "events",
+        indexes={"slug-index": ("slug", None), "start_month-start_at-index": ("start_month", "start_at")},
+    )
+    for event_id in event_ids:
+        table.put({"id": event_id, "title": f"Event {event_id}"})
+    table.put(*events)
+    return table
+
+
+def event_registrations_table() -> FakeTable:
+    return FakeTable("event_registrations", indexes=EVENT_LINK_INDEXES)
+
+
+def event_hosts_table() -> FakeTable:
+    return FakeTable("event_hosts", indexes=EVENT_LINK_INDEXES)
+
+
+def event_waitlist_table() -> FakeTable:
+    return FakeTable("event_waitlist", indexes={"event_id-created_at-index": ("event_id", "created_at")})
+
+
+def email_stats_table() -> FakeTable:
+    return FakeTable("email_stats")
+
+
+def email_logs_table() -> FakeTable:
+    return FakeTable(
+        "email_logs",
+        indexes={
+            "recipient-status-index": ("recipient", "status"),
+            "created_bucket-created_at-index": ("created_bucket", "created_at"),
+        },
+    )
+
+
+def users_table(users=()) -> FakeTable:
+    table = FakeTable(
+        "users",
+        indexes={
+            "company-job_title-index": ("company", "job_title"),
+            "job_title-company-index": ("job_title", "company"),
+            "state-city-index": ("state", "city"),
+            "state-events_attended-index": ("state", "events_attended"),
+            "state-events_hosted-index": ("state", "events_hosted"),
+        },
+    )
+    table.put(*users)
+    return table
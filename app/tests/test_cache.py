@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_caches_and_counts():
+    cache = TTLCache(maxsize=2, ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return "value"
+
+    assert await cache.get_or_load("k", loader) == "value"
+    assert await cache.get_or_load("k", loader) == "value"
+    assert len(calls) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=5)
+    cache.set("a", 1)
+    now[0] += 4
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    cache = TTLCache(maxsize=4, ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*[cache.get_or_load("k", loader) for _ in range(5)])
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_during_load_skips_caching():
+    cache = TTLCache(maxsize=4, ttl=60)
+
+    async def loader():
+        cache.invalidate()
+        return "stale"
+
+    assert await cache.get_or_load("k", loader) == "stale"
+    assert cache.get("k") is None
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_loads():
+    cache = TTLCache(maxsize=0, ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return "value"
+
+    await cache.get_or_load("k", loader)
+    await cache.get_or_load("k", loader)
+    assert len(calls) == 2
@@ -0,0 +1,46 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.utils import database
+
+
+@pytest.fixture
+def fake_session(monkeypatch):
+    resource = MagicMock()
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=resource)
+    context.__aexit__ = AsyncMock(return_value=None)
+    session = MagicMock()
+    session.resource = MagicMock(return_value=context)
+    session_factory = MagicMock(return_value=session)
+    monkeypatch.setattr(database.aioboto3, "Session", session_factory)
+    yield session_factory, session, context, resource
+
+
+@pytest.mark.asyncio
+async def test_get_db_reuses_shared_resource(fake_session):
+    session_factory, session, context, resource = fake_session
+    await database.close_db()
+
+    first = [r async for r in database.get_db()]
+    second = [r async for r in database.get_db()]
+
+    assert first == [resource]
+    assert second == [resource]
+    session_factory.assert_called_once()
+    session.resource.assert_called_once()
+    config = session.resource.call_args.kwargs["config"]
+    assert config.max_pool_connections == database.DYNAMODB_MAX_POOL_CONNECTIONS
+    assert config.retries["mode"] == database.DYNAMODB_RETRY_MODE
+
+    await database.close_db()
+    context.__aexit__.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_close_db_without_init_is_noop(fake_session):
+    await database.close_db()
+    await database.close_db()
+    _, _, context, _ = fake_session
+    context.__aexit__.assert_not_awaited()
@@ -0,0 +1,61 @@
+import pytest
+
+from app.tests.fake_dynamodb import FakeDynamoDB, FakeTable
+from app.utils import dynamodb_batch
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(dynamodb_batch, "BATCH_WRITE_BASE_DELAY", 0)
+
+
+@pytest.mark.asyncio
+async def test_batch_write_items_chunks_by_25():
+    db = FakeDynamoDB(FakeTable("things"))
+    failed = await dynamodb_batch.batch_write_items(db, "things", [{"id": i} for i in range(60)], concurrency=3)
+    assert failed == []
+    assert [len(call["things"]) for call in db.batch_write_calls] == [25, 25, 10]
+    assert len(db.tables["things"].items) == 60
+
+
+@pytest.mark.asyncio
+async def test_batch_write_items_retries_unprocessed_items():
+    db = FakeDynamoDB(FakeTable("things"))
+    db.throttled_batch_writes = 2
+    failed = await dynamodb_batch.batch_write_items(db, "things", [{"id": i} for i in range(5)])
+    assert failed == []
+    assert len(db.batch_write_calls) == 3
+    assert len(db.tables["things"].items) == 5
+
+
+@pytest.mark.asyncio
+async def test_batch_write_items_returns_items_left_after_retries():
+    db = FakeDynamoDB(FakeTable("things"))
+    db.throttled_batch_writes = 10
+    failed = await dynamodb_batch.batch_write_items(db, "things", [{"id": 1}, {"id": 2}], max_retries=1)
+    assert failed == [{"id": 2}]
+    assert len(db.batch_write_calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_get_items_dedupes_chunks_by_100_and_retries_unprocessed_keys():
+    things = FakeTable("things")
+    things.put(*[{"id": i, "name": f"n{i}"} for i in range(250)])
+    db = FakeDynamoDB(things)
+    db.throttled_batch_gets = 1
+    keys = [{"id": i} for i in range(260)] + [{"id": 0}, {"id": 1}]
+
+    items = await dynamodb_batch.batch_get_items(db, "things", keys)
+
+    assert sorted(item["id"] for item in items) == list(range(250))
+    assert sorted(len(call["things"]["Keys"]) for call in db.batch_get_calls) == [1, 60, 100, 100]
+
+
+@pytest.mark.asyncio
+async def test_batch_get_items_raises_when_keys_stay_unprocessed():
+    things = FakeTable("things")
+    things.put({"id": 1})
+    db = FakeDynamoDB(things)
+    db.throttled_batch_gets = 10
+    with pytest.raises(RuntimeError):
+        await dynamodb_batch.batch_get_items(db, "things", [{"id": 1}], max_retries=1)
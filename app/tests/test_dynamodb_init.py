@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.tests.fake_dynamodb import FakeDynamoDB, FakeTable, event_registrations_table, events_table, users_table
+from app.utils import dynamodb_init
+
+
+@pytest.mark.asyncio
+async def test_init_creates_only_missing_tables():
+    db = FakeDynamoDB(users_table())
+    db.meta.client.list_tables_page_size = 1
+
+    created = await dynamodb_init.init_dynamodb(db)
+
+    expected = set(dynamodb_init.TABLES)
+    assert set(created) == expected - {"users"}
+    assert set(db.tables) == expected
+    assert set(db.meta.client.waited_tables) == expected - {"users"}
+    assert db.batch_write_calls == []
+
+    # A second run (another worker, a reload) finds everything and creates nothing
+    db.meta.client.waited_tables.clear()
+    assert await dynamodb_init.init_dynamodb(db) == []
+    assert db.meta.client.waited_tables == []
+    assert len(db.meta.client.created_tables) == len(expected) - 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_workers_tolerate_creation_races():
+    db = FakeDynamoDB()
+
+    results = await asyncio.gather(dynamodb_init.init_dynamodb(db), dynamodb_init.init_dynamodb(db))
+
+    # Both workers listed an empty account; the loser's create_table hits ResourceInUseException
+    assert sorted(results[0] + results[1]) == sorted(dynamodb_init.TABLES)
+    assert len(db.meta.client.created_tables) == len(dynamodb_init.TABLES)
+
+
+@pytest.mark.asyncio
+async def test_seed_uses_batch_writes():
+    db = FakeDynamoDB()
+
+    await dynamodb_init.init_dynamodb(db, seed=True)
+
+    assert len(db.tables["users"].items) == len(dynamodb_init.SEED_USERS)
+    assert len(db.tables["events"].items) == len(dynamodb_init.SEED_EVENTS)
+    assert len(db.batch_write_calls) == len(dynamodb_init.SEED_DATA)
+    assert db.tables["users"].indexes["state-city-index"] == ("state", "city")
+
+
+@pytest.mark.asyncio
+async def test_startup_reports_but_does_not_migrate_existing_tables():
+    users = FakeTable("users", indexes={"state-city-index": ("state", "city")})
+    db = FakeDynamoDB(users)
+
+    await dynamodb_init.init_dynamodb(db)
+
+    assert db.meta.client.update_calls == []
+    assert list(users.indexes) == ["state-city-index"]
+
+
+@pytest.mark.asyncio
+async def test_backfill_start_month_fixes_missing_and_stale_months():
+    events = FakeTable("events")
+    events.put(
+        {"id": 1, "start_at": "2025-07-21T10:00:00"},
+        {"id": 2, "start_at": "2025-08-01T09:00:00", "start_month": "2025-07"},
+        {"id": 3, "start_at": "2025-09-02T10:00:00", "start_month": "2025-09"},
+        {"id": 4, "title": "No date yet"},
+    )
+    db = FakeDynamoDB(events)
+
+    assert await dynamodb_init.backfill_start_month(db) == 2
+
+    assert [events.items[(i,)].get("start_month") for i in (1, 2, 3, 4)] == ["2025-07", "2025-08", "2025-09", None]
+    assert await dynamodb_init.backfill_start_month(db) == 0
+
+
+@pytest.mark.asyncio
+async def test_backfill_created_bucket_indexes_older_email_logs():
+    logs = FakeTable("email_logs")
+    logs.put(
+        {"id": "a", "created_at": "2025-07-22T08:15:00"},
+        {"id": "b", "created_at": "2025-07-22T09:00:00", "created_bucket": "2025-07-22T09"},
+    )
+    db = FakeDynamoDB(logs)
+
+    assert await dynamodb_init.backfill_created_bucket(db) == 1
+
+    assert logs.items[("a",)]["created_bucket"] == "2025-07-22T08"
+
+
+@pytest.mark.asyncio
+async def test_backfill_registered_count_counts_each_events_registrations():
+    events = events_table(events=[{"id": 1}, {"id": 2, "registered_count": 5}, {"id": 3, "registered_count": 0}])
+    links = event_registrations_table()
+    links.put(*[{"id": 10 + u, "event_id": 1, "user_id": u} for u in range(3)], {"id": 20, "event_id": 2, "user_id": 1})
+    db = FakeDynamoDB(events, links)
+
+    assert await dynamodb_init.backfill_registered_count(db) == 2
+
+    assert [events.items[(i,)]["registered_count"] for i in (1, 2, 3)] == [3, 1, 0]
+    assert await dynamodb_init.backfill_registered_count(db) == 0
@@ -0,0 +1,95 @@
+import pytest
+
+from app.services import email_job_service, email_log_service, user_service
+from app.tests import fake_dynamodb
+from app.tests.fake_dynamodb import FakeDynamoDB, FakeTable
+from app.utils import dynamodb_schema, email_utils
+from app.utils.dynamodb_schema import TABLES, Index, Table
+
+
+def test_registry_declares_every_index_the_services_query():
+    users = TABLES["users"]
+    for name, hash_attr, range_attr in user_service.USER_QUERY_INDEXES:
+        assert users.index(name).key_attrs == (hash_attr, range_attr)
+    assert TABLES["email_logs"].index(email_log_service.EMAIL_LOGS_RECIPIENT_INDEX).key_attrs == ("recipient", "status")
+    assert TABLES["email_logs"].index(email_utils.EMAIL_LOGS_TIME_INDEX).key_attrs == ("created_bucket", "created_at")
+    assert TABLES["email_jobs"].index(email_job_service.EMAIL_JOBS_STATUS_INDEX).key_attrs == ("status", "created_at")
+
+
+@pytest.mark.parametrize("factory", [
+    fake_dynamodb.users_table,
+    fake_dynamodb.email_logs_table,
+    fake_dynamodb.email_jobs_table,
+    fake_dynamodb.events_table,
+    fake_dynamodb.event_registrations_table,
+    fake_dynamodb.event_hosts_table,
+    fake_dynamodb.event_waitlist_table,
+])
+def test_test_fakes_match_the_registry(factory):
+    fake = factory()
+    table = TABLES[fake.name]
+    assert fake.indexes == {index.index_name: (index.hash_key, index.range_key) for index in table.indexes}
+
+
+def test_create_table_kwargs_declares_key_attributes_once():
+    kwargs = dynamodb_schema.create_table_kwargs(TABLES["users"])
+
+    names = [a["AttributeName"] for a in kwargs["AttributeDefinitions"]]
+    assert sorted(names) == sorted(set(names))
+    assert {"id", "state", "events_attended"} <= set(names)
+    assert kwargs["KeySchema"] == [{"AttributeName": "id", "KeyType": "HASH"}]
+    assert len(kwargs["GlobalSecondaryIndexes"]) == 5
+    assert all("ProvisionedThroughput" in index for index in kwargs["GlobalSecondaryIndexes"])
+
+    on_demand = Table("t", {"id": "S", "a": "S"}, indexes=(Index("a"),), billing_mode="PAY_PER_REQUEST")
+    kwargs = dynamodb_schema.create_table_kwargs(on_demand)
+    assert "ProvisionedThroughput" not in kwargs
+    assert kwargs["GlobalSecondaryIndexes"][0]["IndexName"] == "a-index"
+
+
+@pytest.mark.asyncio
+async def test_migrations_add_missing_indexes_and_keep_unknown_ones_by_default():
+    live = FakeTable("users", indexes={
+        "state-city-index": ("state", "city"),
+        # Declared as (company, job_title); rebuilt only when drops are allowed
+        "company-job_title-index": ("company", "city"),
+        "legacy-index": ("email", None),
+    })
+    db = FakeDynamoDB(live)
+    client = db.meta.client
+
+    plan = await dynamodb_schema.plan_migrations(client, {"users": TABLES["users"]})
+    actions = [(m["action"], m["index"]) for m in plan]
+    assert ("delete_index", "legacy-index") in actions
+    assert actions.index(("delete_index", "company-job_title-index")) < actions.index(("create_index", "company-job_title-index"))
+    assert ("create_index", "state-events_hosted-index") in actions
+    assert ("create_index", "state-city-index") not in actions
+
+    applied = await dynamodb_schema.apply_migrations(client, plan)
+    assert {m["index"] for m in applied} == {
+        "job_title-company-index", "state-events_attended-index", "state-events_hosted-index"
+    }
+    assert live.indexes["legacy-index"] == ("email", None)
+    assert live.indexes["company-job_title-index"] == ("company", "city")
+    create = client.update_calls[0]
+    assert create["AttributeDefinitions"] and len(create["GlobalSecondaryIndexUpdates"]) == 1
+
+    plan = await dynamodb_schema.plan_migrations(client, {"users": TABLES["users"]})
+    await dynamodb_schema.apply_migrations(client, plan, drop_indexes=True)
+    assert live.indexes == {index.index_name: (index.hash_key, index.range_key) for index in TABLES["users"].indexes}
+    assert await dynamodb_schema.plan_migrations(client, {"users": TABLES["users"]}) == []
+
+
+def test_diff_rejects_a_different_table_key_and_plans_billing_changes():
+    table = TABLES["email_stats"]
+    with pytest.raises(ValueError):
+        dynamodb_schema.diff_table(table, {"KeySchema": [{"AttributeName": "event_id", "KeyType": "HASH"}]})
+
+    description = {
+        "KeySchema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "BillingModeSummary": {"BillingMode": "PAY_PER_REQUEST"},
+    }
+    (migration,) = dynamodb_schema.diff_table(table, description)
+    assert migration["action"] == "update_billing"
+    assert migration["update"]["BillingMode"] == "PROVISIONED"
+    assert migration["update"]["ProvisionedThroughput"] == {"ReadCapacityUnits": 5, "WriteCapacityUnits": 5}
@@ -1,91 +1,313 @@
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+from datetime import datetime, timedelta
 
 import pytest
-import pytest_asyncio
-from fastapi import BackgroundTasks
+from fastapi import HTTPException
 
 from app.routers import email as email_router
+from app.services import email_log_service
+from app.tests.fake_dynamodb import FakeDynamoDB, email_jobs_table, email_logs_table, email_stats_table
 from app.utils import email_utils
+from app.utils.cursor import encode_cursor
+from app.utils.rate_limit import TokenBucket
 
 
-@pytest_asyncio.fixture
-def mock_db():
-    table = AsyncMock()
-    db = MagicMock()
-    db.Table = AsyncMock(return_value=table)
-    return db, table
+@pytest.fixture
+def fast_dispatch(monkeypatch):
+    monkeypatch.setattr(email_utils, "send_rate_limiter", TokenBucket(0))
+    monkeypatch.setattr(email_utils, "EMAIL_SEND_RETRY_BASE_DELAY", 0)
+
 
 @pytest.mark.asyncio
-async def test_send_email_to_filtered_users_success(monkeypatch, mock_db):
-    db, table = mock_db
-    # Patch user_service.filter_users to return users with emails
-    monkeypatch.setattr(email_router.user_service, "filter_users", AsyncMock(return_value={
-        "results": [
-            {"email": "a@example.com"},
-            {"email": "b@example.com"}
-        ]
-    }))
-    # Patch send_email to just record the call
-    called = {}
-    def fake_send_email(background_tasks, subject, body, emails, db):
-        called["emails"] = emails
-        called["subject"] = subject
-        called["body"] = body
-    monkeypatch.setattr(email_router, "send_email", fake_send_email)
-    background_tasks = BackgroundTasks()
+async def test_send_email_to_filtered_users_queues_job():
+    db = FakeDynamoDB(email_jobs_table())
     response = await email_router.send_email_to_filtered_users(
-        background_tasks,
         subject="Test Subject",
         body="Test Body",
-        company=None,
+        company="Acme",
         job_title=None,
         city=None,
         state=None,
         events_hosted_min=None,
         events_hosted_max=None,
-        events_attended_min=None,
+        events_attended_min=2,
         events_attended_max=None,
         limit=10,
         cursor=None,
         sort_by=None,
         sort_order="asc",
+        all_users=False,
         db=db
     )
-    assert response["message"] == "Emails sent to 2 users."
-    assert called["emails"] == ["a@example.com", "b@example.com"]
-    assert called["subject"] == "Test Subject"
-    assert called["body"] == "Test Body"
+    assert response["message"] == "Email job queued."
+    assert response["status"] == "queued"
+    job = (await db.tables["email_jobs"].get_item(Key={"id": response["job_id"]}))["Item"]
+    assert job["subject"] == "Test Subject"
+    assert job["body"] == "Test Body"
+    assert job["filters"] == {"company": "Acme", "events_attended_min": 2}
+    assert job["limit"] == 10
+    assert "all_users" not in job
+
+    progress = await email_router.get_email_job(response["job_id"], db=db)
+    assert progress["status"] == "queued"
+    assert progress["processed"] == 0
 
 @pytest.mark.asyncio
-async def test_send_email_to_filtered_users_no_users(monkeypatch, mock_db):
-    db, table = mock_db
-    monkeypatch.setattr(email_router.user_service, "filter_users", AsyncMock(return_value={"results": []}))
-    background_tasks = BackgroundTasks()
-    response = await email_router.send_email_to_filtered_users(
-        background_tasks,
-        subject="Test Subject",
-        body="Test Body",
-        company=None,
-        job_title=None,
-        city=None,
-        state=None,
-        events_hosted_min=None,
-        events_hosted_max=None,
-        events_attended_min=None,
-        events_attended_max=None,
-        limit=10,
-        cursor=None,
-        sort_by=None,
-        sort_order="asc",
-        db=db
+async def test_send_email_to_filtered_users_rejects_invalid_filters():
+    db = FakeDynamoDB(email_jobs_table())
+    with pytest.raises(HTTPException) as exc:
+        await email_router.send_email_to_filtered_users(
+            subject="Test Subject",
+            body="Test Body",
+            company=None,
+            job_title=None,
+            city=None,
+            state=None,
+            events_hosted_min=None,
+            events_hosted_max=None,
+            events_attended_min=None,
+            events_attended_max=None,
+            limit=10,
+            cursor=None,
+            sort_by="notafield",
+            sort_order="asc",
+            all_users=False,
+            db=db
+        )
+    assert exc.value.status_code == 400
+    assert not db.tables["email_jobs"].items
+
+def _seed_logs(table, count=30):
+    # One log every 10 minutes, spread over five hour buckets
+    for i in range(count):
+        created_at = (datetime(2024, 1, 1) + timedelta(minutes=10 * i)).isoformat()
+        table.put({
+            "id": f"log-{i:03d}",
+            "recipient": f"user{i % 3}@example.com",
+            "status": "sent" if i % 2 else "failed",
+            "subject": "Subject",
+            "body": "Body",
+            "created_at": created_at,
+            "created_bucket": email_utils.created_bucket(created_at),
+        })
+
+
+def _log_time(i):
+    return (datetime(2024, 1, 1) + timedelta(minutes=10 * i)).isoformat()
+
+
+async def _all_log_pages(db, **kwargs):
+    kwargs.setdefault("sort_order", "asc")
+    logs, cursor = [], None
+    while True:
+        response = await email_router.get_email_logs(db=db, cursor=cursor, **kwargs)
+        logs.extend(response["logs"])
+        cursor = response["next_cursor"]
+        if not cursor:
+            return logs
+
+
+@pytest.mark.asyncio
+async def test_get_email_logs_by_recipient_uses_index_and_pages():
+    db = FakeDynamoDB(email_logs_table())
+    _seed_logs(db.tables["email_logs"])
+    response = await email_router.get_email_logs(
+        recipient="user1@example.com", status="sent", created_from=None, created_to=None,
+        limit=2, cursor=None, fields=None, sort_order="asc", db=db,
+    )
+    assert response["count"] == 2
+    assert response["next_cursor"]
+    logs = await _all_log_pages(
+        db, recipient="user1@example.com", status="sent", created_from=None, created_to=None, limit=2, fields=None
+    )
+    expected = {f"log-{i:03d}" for i in range(30) if i % 3 == 1 and i % 2}
+    assert [log["id"] for log in logs] == sorted(expected)
+    assert all(call[0] == "query" for call in db.tables["email_logs"].calls)
+    assert db.tables["email_logs"].calls[0][1]["IndexName"] == "recipient-status-index"
+
+
+@pytest.mark.asyncio
+async def test_get_email_logs_time_range_queries_buckets_in_order_with_projection():
+    db = FakeDynamoDB(email_logs_table())
+    _seed_logs(db.tables["email_logs"])
+    logs = await _all_log_pages(
+        db, recipient=None, status="failed", created_from=_log_time(3), created_to=_log_time(20),
+        limit=3, fields="recipient,created_at",
+    )
+    assert [log["created_at"] for log in logs] == [_log_time(i) for i in range(4, 21, 2)]
+    assert all(set(log) == {"recipient", "created_at"} for log in logs)
+    calls = db.tables["email_logs"].calls
+    assert all(call[0] == "query" and call[1]["IndexName"] == "created_bucket-created_at-index" for call in calls)
+
+
+@pytest.mark.asyncio
+async def test_get_email_logs_time_range_descending_across_fanout_windows(monkeypatch):
+    monkeypatch.setattr(email_log_service, "EMAIL_LOG_BUCKET_FANOUT", 2)
+    db = FakeDynamoDB(email_logs_table())
+    _seed_logs(db.tables["email_logs"])
+    logs = await _all_log_pages(
+        db, recipient=None, status=None, created_from="2024-01-01T00:30:00", created_to="2024-01-01T04:00:00",
+        limit=4, fields=None, sort_order="desc",
     )
-    assert response["message"] == "No users found for the given criteria."
+    assert [log["id"] for log in logs] == [f"log-{i:03d}" for i in range(24, 2, -1)]
+
+
+@pytest.mark.asyncio
+async def test_get_email_logs_rejects_invalid_input():
+    db = FakeDynamoDB(email_logs_table())
+    with pytest.raises(HTTPException) as exc:
+        await email_router.get_email_logs(
+            recipient=None, status=None, created_from=None, created_to=None,
+            limit=10, cursor=None, fields="password", sort_order="asc", db=db,
+        )
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException) as exc:
+        await email_router.get_email_logs(
+            recipient="a@example.com", status=None, created_from=None, created_to=None,
+            limit=10, cursor="not-a-cursor", fields=None, sort_order="asc", db=db,
+        )
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_email_logs_rejects_time_ranges_over_the_cap(monkeypatch):
+    monkeypatch.setattr(email_log_service, "EMAIL_LOG_MAX_RANGE_HOURS", 48)
+    db = FakeDynamoDB(email_logs_table())
+    for created_from, created_to in [("2020-01-01T00:00:00", None), ("2024-01-01T00:00:00", "2024-01-03T00:00:00")]:
+        with pytest.raises(HTTPException) as exc:
+            await email_router.get_email_logs(
+                recipient=None, status=None, created_from=created_from, created_to=created_to,
+                limit=10, cursor=None, fields=None, sort_order="asc", db=db,
+            )
+        assert exc.value.status_code == 400
+    assert db.tables["email_logs"].calls == []
+
+    response = await email_router.get_email_logs(
+        recipient=None, status=None, created_from="2024-01-01T00:00:00", created_to="2024-01-02T23:59:59",
+        limit=10, cursor=None, fields=None, sort_order="asc", db=db,
+    )
+    assert response["count"] == 0
+
 
 @pytest.mark.asyncio
-async def test_get_email_logs(monkeypatch, mock_db):
-    db, table = mock_db
-    table.scan.return_value = {"Items": [{"id": 1, "recipient": "a@example.com"}]}
-    monkeypatch.setattr(db, "Table", AsyncMock(return_value=table))
-    response = await email_router.get_email_logs(db=db)
-    assert "logs" in response
-    assert response["logs"] == [{"id": 1, "recipient": "a@example.com"}]
+@pytest.mark.parametrize("positions", [["start"] * 5000, ["start"], ["start", "done", 7, "start"]])
+async def test_get_email_logs_rejects_crafted_scan_cursors(positions):
+    db = FakeDynamoDB(email_logs_table())
+    with pytest.raises(HTTPException) as exc:
+        await email_router.get_email_logs(
+            recipient=None, status=None, created_from=None, created_to=None,
+            limit=10, cursor=encode_cursor({"m": "scan", "s": positions}), fields=None, sort_order="asc", db=db,
+        )
+    assert exc.value.status_code == 400
+    assert db.tables["email_logs"].calls == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "recipient, created_from, state",
+    [
+        ("a@example.com", None, {"m": "query", "k": {"id": "x"}}),
+        ("a@example.com", None, {"m": "query", "k": {"recipient": "b@example.com", "status": "sent", "id": "x"}}),
+        ("a@example.com", None, {"m": "query", "k": {"recipient": "a@example.com", "status": 1, "id": "x"}}),
+        (None, "2025-07-22T08:00:00", {"m": "time", "b": "2025-07-22T08", "k": {"created_bucket": "2025-07-22T09", "created_at": "2025-07-22T09:00:00", "id": "x"}}),
+        (None, "2025-07-22T08:00:00", {"m": "time", "b": "2025-07-22T08", "k": {"created_at": "2025-07-22T08:00:00"}}),
+    ],
+)
+async def test_get_email_logs_rejects_crafted_start_keys(recipient, created_from, state):
+    db = FakeDynamoDB(email_logs_table())
+    with pytest.raises(HTTPException) as exc:
+        await email_router.get_email_logs(
+            recipient=recipient, status=None, created_from=created_from, created_to="2025-07-22T10:00:00",
+            limit=10, cursor=encode_cursor(state), fields=None, sort_order="asc", db=db,
+        )
+    assert exc.value.status_code == 400
+    assert db.tables["email_logs"].calls == []
+
+
+@pytest.mark.asyncio
+async def test_dispatch_writes_one_final_log_per_recipient_in_batches(monkeypatch, fast_dispatch):
+    monkeypatch.setattr(email_utils, "EMAIL_SEND_MAX_ATTEMPTS", 1)
+    db = FakeDynamoDB(email_logs_table(), email_stats_table())
+    outcomes = iter([0.9, 0.1] * 20)
+    monkeypatch.setattr(email_utils.random, "random", lambda: next(outcomes))
+    recipients = [f"user{i}@example.com" for i in range(40)]
+    await email_utils.EmailDispatcher(db, "Subject", "Body").dispatch(recipients)
+
+    logs = list(db.tables["email_logs"].items.values())
+    assert len(logs) == 40
+    assert sum(log["status"] == "sent" for log in logs) == 20
+    assert all("failed_at" in log and log["error_message"] for log in logs if log["status"] == "failed")
+    assert all(log["created_bucket"] == log["created_at"][:13] for log in logs)
+    assert [len(call["email_logs"]) for call in db.batch_write_calls] == [25, 15]
+    assert not db.tables["email_logs"].calls
+    daily = next(iter(db.tables["email_stats"].items.values()))
+    assert (daily["sent"], daily["failed"]) == (20, 20)
+    assert len(db.tables["email_stats"].calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_sends_concurrently_up_to_the_limit(monkeypatch, fast_dispatch):
+    in_flight = {"now": 0, "max": 0}
+
+    async def slow_deliver(recipient, subject, body):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+
+    monkeypatch.setattr(email_utils, "deliver_email", slow_deliver)
+    db = FakeDynamoDB(email_logs_table())
+    dispatcher = email_utils.EmailDispatcher(db, "Subject", "Body", concurrency=5)
+    result = await dispatcher.dispatch(f"user{i}@example.com" for i in range(30))
+    assert result == {"sent": 30, "failed": 0}
+    assert in_flight["max"] == 5
+    assert len(db.tables["email_logs"].items) == 30
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_retries_failed_sends(monkeypatch, fast_dispatch):
+    attempts = {}
+
+    async def flaky_deliver(recipient, subject, body):
+        attempts[recipient] = attempts.get(recipient, 0) + 1
+        if recipient.startswith("flaky") and attempts[recipient] < 3:
+            raise Exception("temporary failure")
+        if recipient.startswith("broken"):
+            raise Exception("permanent failure")
+
+    monkeypatch.setattr(email_utils, "deliver_email", flaky_deliver)
+    db = FakeDynamoDB(email_logs_table())
+    dispatcher = email_utils.EmailDispatcher(db, "Subject", "Body", max_attempts=3)
+    result = await dispatcher.dispatch(["flaky@example.com", "broken@example.com", "ok@example.com"])
+    assert result == {"sent": 2, "failed": 1}
+    logs = {log["recipient"]: log for log in db.tables["email_logs"].items.values()}
+    assert logs["flaky@example.com"]["status"] == "sent"
+    assert logs["flaky@example.com"]["attempts"] == 3
+    assert logs["broken@example.com"]["status"] == "failed"
+    assert logs["broken@example.com"]["error_message"] == "permanent failure"
+    assert attempts["broken@example.com"] == 3
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate(monkeypatch):
+    now = [0.0]
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr("app.utils.rate_limit.time.monotonic", lambda: now[0])
+    monkeypatch.setattr("app.utils.rate_limit.asyncio.sleep", fake_sleep)
+    bucket = TokenBucket(rate=10, capacity=2)
+    for _ in range(6):
+        await bucket.acquire()
+    # Two tokens come from the burst, the remaining four at 10 per second
+    assert now[0] == pytest.approx(0.4)
+
+
+def test_email_error_codes_are_bounded():
+    assert email_utils.email_error_code(email_utils.EmailDeliveryError("550 bob@example.com", code="bounced")) == "bounced"
+    assert email_utils.email_error_code(email_utils.EmailDeliveryError("x", code="550 bob@example.com")) == "provider_error"
+    assert email_utils.email_error_code(asyncio.TimeoutError()) == "timeout"
+    assert email_utils.email_error_code(ValueError("request id 8c1f")) == "ValueError"
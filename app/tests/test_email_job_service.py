@@ -0,0 +1,231 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import email_job_service, email_stats_service
+from app.tests.fake_dynamodb import (
+    FakeDynamoDB,
+    email_jobs_table,
+    email_logs_table,
+    email_stats_table,
+    users_table,
+)
+from app.utils import email_utils
+from app.utils.rate_limit import TokenBucket
+
+
+def _users(count):
+    return [
+        {
+            'id': i, 'email': f'user{i}@example.com', 'first_name': f'F{i}', 'last_name': f'L{i}',
+            'role': 'attendee', 'company': 'Acme', 'job_title': 'Engineer', 'state': 'TX',
+            'events_hosted': 0, 'events_attended': i % 5,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(email_utils, "send_rate_limiter", TokenBucket(0))
+
+    async def deliver(recipient, subject, body):
+        if recipient.startswith("user1@"):
+            raise email_utils.EmailDeliveryError(f"550 mailbox {recipient} unavailable (id 8c1f)", code="bounced")
+
+    monkeypatch.setattr(email_utils, "deliver_email", deliver)
+    monkeypatch.setattr(email_utils, "EMAIL_SEND_MAX_ATTEMPTS", 1)
+    monkeypatch.setattr(email_job_service, "EMAIL_JOB_CHUNK_SIZE", 4)
+    return FakeDynamoDB(email_jobs_table(), email_logs_table(), email_stats_table(), users_table(_users(10)))
+
+
+@pytest.mark.asyncio
+async def test_job_is_claimed_processed_in_chunks_and_completed(db):
+    job = await email_job_service.create_job(db, "Subject", "Body", {"state": "TX"}, limit=10)
+    claimed = await email_job_service.claim_job(db, job["id"], "worker-1")
+    assert claimed["status"] == "running"
+    assert await email_job_service.claim_job(db, job["id"], "worker-2") is None
+
+    await email_job_service.process_job(db, claimed, "worker-1")
+
+    final = await email_job_service.get_job(db, job["id"])
+    assert final["status"] == "completed"
+    assert (final["processed"], final["sent"], final["failed"]) == (10, 9, 1)
+    assert len(db.tables["email_logs"].items) == 10
+    assert len(db.batch_write_calls) == 3
+    assert all(
+        set(call[1]["ExpressionAttributeNames"].values()) >= {"id", "email"} and "ProjectionExpression" in call[1]
+        for call in db.tables["users"].calls
+    )
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_names_the_counters_through_attribute_names(db, monkeypatch):
+    job = await email_job_service.create_job(db, "Subject", "Body", {"state": "TX"}, limit=10)
+    await email_job_service.claim_job(db, job["id"], "worker-1")
+    table = db.tables["email_jobs"]
+    update_item, updates = table.update_item, []
+
+    async def record(**kwargs):
+        updates.append(kwargs)
+        return await update_item(**kwargs)
+
+    monkeypatch.setattr(table, "update_item", record)
+    await email_job_service._checkpoint(db, job["id"], "worker-1", "next", 4, 3, 1)
+
+    expression = updates[0]["UpdateExpression"]
+    # PROCESSED is a DynamoDB reserved word, so the counters must go through #names
+    assert "#processed = #processed + :processed" in expression
+    assert "#sent = #sent + :sent" in expression and "#failed = #failed + :failed" in expression
+    assert updates[0]["ExpressionAttributeNames"]["#processed"] == "processed"
+    assert " processed" not in expression.replace("#processed", "")
+
+
+@pytest.mark.asyncio
+async def test_job_maintains_campaign_and_daily_counters(db):
+    job = await email_job_service.create_job(db, "Subject", "Body", {"state": "TX"}, limit=10)
+    claimed = await email_job_service.claim_job(db, job["id"], "worker-1")
+    await email_job_service.process_job(db, claimed, "worker-1")
+
+    stats = await email_stats_service.get_campaign_stats(db, job["id"])
+    assert (stats["pending"], stats["sent"], stats["failed"]) == (0, 9, 1)
+    assert stats["errors"] == {"bounced": 1}
+    assert not any("mailbox" in attr for item in db.tables["email_stats"].items.values() for attr in item)
+    daily = await email_stats_service.get_daily_stats(db, datetime.now().date().isoformat())
+    assert (daily["sent"], daily["failed"]) == (9, 1)
+    # Counters are updated with ADD, never read back by the sender
+    assert {call[0] for call in db.tables["email_stats"].calls} == {"update_item", "get_item"}
+
+
+@pytest.mark.asyncio
+async def test_stats_for_unknown_campaign_read_as_zero(db):
+    stats = await email_stats_service.get_campaign_stats(db, "missing")
+    assert (stats["pending"], stats["sent"], stats["failed"], stats["errors"]) == (0, 0, 0, {})
+    with pytest.raises(HTTPException) as exc:
+        await email_stats_service.get_daily_stats(db, "yesterday")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_job_resumes_from_checkpoint_after_crash(db, monkeypatch):
+    job = await email_job_service.create_job(db, "Subject", "Body", {"state": "TX"}, limit=10)
+    claimed = await email_job_service.claim_job(db, job["id"], "worker-1")
+
+    original = email_job_service._checkpoint
+
+    async def crash_after_first_checkpoint(*args, **kwargs):
+        await original(*args, **kwargs)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(email_job_service, "_checkpoint", crash_after_first_checkpoint)
+    with pytest.raises(KeyboardInterrupt):
+        await email_job_service.process_job(db, claimed, "worker-1")
+    monkeypatch.setattr(email_job_service, "_checkpoint", original)
+
+    # The crashed worker's lease expires and another consumer resumes the job
+    assert await email_job_service.claim_job(db, job["id"], "worker-2") is None
+    table = db.tables["email_jobs"]
+    table.items[(job["id"],)]["lease_expires_at"] = (datetime.now() - timedelta(seconds=1)).isoformat()
+    reclaimed = await email_job_service.claim_job(db, job["id"], "worker-2")
+    assert reclaimed["processed"] == 4
+    await email_job_service.process_job(db, reclaimed, "worker-2")
+
+    final = await email_job_service.get_job(db, job["id"])
+    assert final["status"] == "completed"
+    assert final["processed"] == 10
+    recipients = sorted(log["recipient"] for log in db.tables["email_logs"].items.values())
+    assert recipients == sorted(f"user{i}@example.com" for i in range(1, 11))
+
+
+@pytest.mark.asyncio
+async def test_create_job_applies_back_pressure(db, monkeypatch):
+    monkeypatch.setattr(email_job_service, "EMAIL_JOB_MAX_QUEUED", 2)
+    await email_job_service.create_job(db, "Subject", "Body", {}, limit=10)
+    await email_job_service.create_job(db, "Subject", "Body", {}, limit=10)
+    with pytest.raises(HTTPException) as exc:
+        await email_job_service.create_job(db, "Subject", "Body", {}, limit=10)
+    assert exc.value.status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_get_job_not_found(db):
+    with pytest.raises(HTTPException) as exc:
+        await email_job_service.get_job(db, "missing")
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_only_expired_leases_are_claimable_and_the_read_is_bounded(db):
+    table = db.tables["email_jobs"]
+    now = datetime.now()
+    for i, offset in enumerate([-30, -20, -10, 30]):
+        job = await email_job_service.create_job(db, "Subject", "Body", {"state": "TX"}, limit=10)
+        await email_job_service.claim_job(db, job["id"], f"worker-{i}")
+        table.items[(job["id"],)]["lease_expires_at"] = (now + timedelta(seconds=offset)).isoformat()
+    expired = [job_id for (job_id,), job in table.items.items() if job["lease_expires_at"] < now.isoformat()]
+
+    assert sorted(await email_job_service._claimable_job_ids(db, 5)) == sorted(expired)
+    assert len(await email_job_service._claimable_job_ids(db, 2)) == 2
+    query = table.calls[-1][1]
+    assert (query["IndexName"], query["Limit"]) == (email_job_service.EMAIL_JOBS_LEASE_INDEX, 2)
+    assert "FilterExpression" not in query
+
+
+@pytest.mark.asyncio
+async def test_stale_worker_stops_after_losing_its_lease(db):
+    job = await email_job_service.create_job(db, "Subject", "Body", {"state": "TX"}, limit=10)
+    claimed = await email_job_service.claim_job(db, job["id"], "worker-1")
+    db.tables["email_jobs"].items[(job["id"],)]["lease_owner"] = "worker-2"
+
+    await email_job_service.process_job(db, claimed, "worker-1")
+
+    final = await email_job_service.get_job(db, job["id"])
+    assert final["status"] == "running"
+    assert final["processed"] == 0
+    assert len(db.tables["email_logs"].items) == 4
+
+
+@pytest.mark.asyncio
+async def test_all_users_job_streams_every_page(db, monkeypatch):
+    monkeypatch.setattr(email_job_service, "EMAIL_JOB_CHUNK_SIZE", 3)
+    job = await email_job_service.create_job(db, "Subject", "Body", {"state": "TX"}, limit=1, all_users=True)
+    claimed = await email_job_service.claim_job(db, job["id"], "worker-1")
+    await email_job_service.process_job(db, claimed, "worker-1")
+
+    final = await email_job_service.get_job(db, job["id"])
+    assert final["status"] == "completed"
+    assert final["processed"] == 10
+    assert len(db.tables["email_logs"].items) == 10
+
+
+@pytest.mark.asyncio
+async def test_consumer_waits_for_cancelled_jobs_before_returning(db, monkeypatch):
+    await email_job_service.create_job(db, "Subject", "Body", {"state": "TX"}, limit=10)
+    started, unwound = asyncio.Event(), []
+
+    async def slow_job(db, job, worker_id):
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        finally:
+            # Like a send or checkpoint still in flight when the job is cancelled
+            await asyncio.sleep(0.05)
+            unwound.append(job["id"])
+
+    monkeypatch.setattr(email_job_service, "process_job", slow_job)
+    stop = asyncio.Event()
+    consumer = asyncio.create_task(email_job_service.run_consumer(db, stop, "worker-1"))
+    await asyncio.wait_for(started.wait(), 1)
+    stop.set()
+    await asyncio.wait_for(consumer, 1)
+
+    assert len(unwound) == 1
+
+
+def test_consumer_stops_before_the_db_closes():
+    from app.main import app
+
+    shutdown = [hook.__name__ for hook in app.router.on_shutdown]
+    assert shutdown.index("stop_consumer") < shutdown.index("shutdown_db")
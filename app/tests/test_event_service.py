@@ -0,0 +1,167 @@
+import pytest
+from fastapi import HTTPException
+
+from app.services import event_service, registration_service
+from app.tests.fake_dynamodb import (
+    FakeDynamoDB,
+    event_hosts_table,
+    event_registrations_table,
+    events_table,
+    users_table,
+)
+from app.utils import event_utils
+from app.utils.cursor import encode_cursor
+
+
+def _event(event_id, start_at):
+    return {
+        "id": event_id,
+        "slug": f"event-{event_id}",
+        "title": f"Event {event_id}",
+        "owner_id": 1,
+        "start_at": start_at,
+        "end_at": start_at,
+        "start_month": event_utils.start_month(start_at),
+    }
+
+
+@pytest.fixture
+def db():
+    events = [
+        _event(1, "2025-06-30T18:00:00"),
+        _event(2, "2025-07-01T09:00:00"),
+        _event(3, "2025-07-15T09:00:00"),
+        _event(4, "2025-09-02T10:00:00"),
+        _event(5, "2025-11-20T10:00:00"),
+    ]
+    users = [{"id": i, "email": f"user{i}@example.com", "events_attended": 0, "events_hosted": 0} for i in range(1, 301)]
+    return FakeDynamoDB(
+        users_table(users), events_table(events=events), event_registrations_table(), event_hosts_table()
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+async def test_list_events_pages_through_month_buckets_in_order(db, sort_order):
+    ids, cursor = [], None
+    while True:
+        page = await event_service.list_events(
+            db, "2025-07-01", "2025-10-31", limit=1, cursor=cursor, sort_order=sort_order
+        )
+        ids += [event["id"] for event in page["events"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert ids == ([2, 3, 4] if sort_order == "asc" else [4, 3, 2])
+    assert all(call[0] == "query" for call in db.tables["events"].calls)
+
+
+@pytest.mark.asyncio
+async def test_list_events_validates_the_range(db):
+    with pytest.raises(HTTPException) as exc:
+        await event_service.list_events(db, "2025-08-01", "2025-07-01")
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException) as exc:
+        await event_service.list_events(db, "2020-01-01", "2025-01-01")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "start_from, start_to",
+    [("2025-13-01", "2025-12-31"), ("2025-02-30", None), ("2025-07-01", "2025-07-xx"), ("0001-01-01", "9999-12-31")],
+)
+async def test_list_events_rejects_invalid_bounds_before_querying(db, start_from, start_to):
+    with pytest.raises(HTTPException) as exc:
+        await event_service.list_events(db, start_from, start_to)
+    assert exc.value.status_code == 400
+    assert db.tables["events"].calls == []
+
+
+@pytest.mark.asyncio
+async def test_get_event_by_slug(db):
+    event = await event_service.get_event_by_slug(db, "event-4")
+    assert event["id"] == 4
+    with pytest.raises(HTTPException) as exc:
+        await event_service.get_event_by_slug(db, "missing")
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_attendees_are_paged_from_one_event_partition(db):
+    await registration_service.bulk_create_links(db, "registration", [(3, u) for u in range(1, 251)])
+    await registration_service.bulk_create_links(db, "registration", [(4, u) for u in range(1, 30)])
+    db.tables["event_registrations"].calls.clear()
+
+    user_ids, cursor = [], None
+    while True:
+        page = await event_service.list_event_links(db, "registration", 3, limit=100, cursor=cursor)
+        user_ids += [link["user_id"] for link in page["links"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert user_ids == list(range(1, 251))
+    calls = db.tables["event_registrations"].calls
+    assert {call[0] for call in calls} == {"query"}
+    assert {call[1]["IndexName"] for call in calls} == {event_service.EVENT_LINKS_BY_EVENT_INDEX}
+
+    # A cursor only continues the listing it came from
+    first = await event_service.list_event_links(db, "registration", 3, limit=10)
+    with pytest.raises(HTTPException) as exc:
+        await event_service.list_event_links(db, "registration", 4, cursor=first["next_cursor"])
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_events_of_a_user(db):
+    await registration_service.create_link(db, "registration", 4, 7)
+    await registration_service.create_link(db, "registration", 2, 7)
+    await registration_service.create_link(db, "host", 5, 7)
+
+    registrations = await event_service.list_user_links(db, "registration", 7)
+    hosts = await event_service.list_user_links(db, "host", 7)
+
+    assert [link["event_id"] for link in registrations["links"]] == [2, 4]
+    assert [link["event_id"] for link in hosts["links"]] == [5]
+    assert registrations["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_attendees_can_be_hydrated_with_batched_user_reads(db):
+    from app.services.user_service import UserLoader
+
+    await registration_service.bulk_create_links(db, "registration", [(3, u) for u in range(1, 251)])
+    db.tables["users"].items.pop(db.tables["users"]._key({"id": 5}))
+    db.batch_get_calls.clear()
+    loader = UserLoader(db)
+
+    page = await event_service.list_event_links(db, "registration", 3, limit=250, loader=loader)
+
+    assert [link["user"]["email"] for link in page["links"][:4]] == [f"user{i}@example.com" for i in range(1, 5)]
+    assert page["links"][4]["user"] is None
+    assert loader.batches == 1
+    assert len(db.batch_get_calls) == 3
+    assert "user" not in (await event_service.list_event_links(db, "registration", 3, limit=1))["links"][0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "call",
+    [
+        lambda db, c: event_service.list_event_links(db, "registration", 1, cursor=c({"event_id": 1, "user_id": 2})),
+        lambda db, c: event_service.list_event_links(db, "registration", 1, cursor=c({"event_id": 1, "user_id": "2", "id": 3})),
+        lambda db, c: event_service.list_user_links(db, "host", 2, cursor=c({"user_id": 3, "event_id": 1, "id": 3})),
+        lambda db, c: event_service.list_waitlist(db, 1, cursor=c({"event_id": 1, "created_at": 5, "id": 3})),
+        lambda db, c: event_service.list_events(
+            db, "2025-07-01", "2025-10-31", cursor=c({"b": "2025-07", "k": {"start_month": "2025-08", "start_at": "x", "id": 1}})
+        ),
+        lambda db, c: event_service.list_events(db, "2025-07-01", "2025-10-31", cursor=c({"b": "2025-07", "k": {"id": 1}})),
+    ],
+)
+async def test_crafted_cursor_keys_are_rejected_before_querying(db, call):
+    with pytest.raises(HTTPException) as exc:
+        await call(db, encode_cursor)
+    assert exc.value.status_code == 400
+    assert all(not table.calls for table in db.tables.values())
@@ -0,0 +1,112 @@
+import boto3
+import pytest
+from botocore.stub import Stubber
+from fastapi import FastAPI
+
+from app.services import user_service
+from app.tests.fake_dynamodb import FakeDynamoDB, users_table
+from app.utils import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset_metrics()
+    yield
+    metrics.reset_metrics()
+
+
+def test_render_counter_and_histogram():
+    metrics.HTTP_REQUESTS.inc("GET", "/users/{user_id}", "200")
+    metrics.HTTP_REQUESTS.inc("GET", "/users/{user_id}", "200")
+    metrics.HTTP_LATENCY.observe(0.02, "GET", "/users/{user_id}")
+    metrics.HTTP_LATENCY.observe(3, "GET", "/users/{user_id}")
+
+    text = metrics.render()
+
+    assert '# TYPE http_requests_total counter' in text
+    assert 'http_requests_total{method="GET",route="/users/{user_id}",status="200"} 2' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/users/{user_id}",le="0.01"} 0' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/users/{user_id}",le="0.025"} 1' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/users/{user_id}",le="+Inf"} 2' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/users/{user_id}"} 2' in text
+    assert 'http_request_duration_seconds_sum{method="GET",route="/users/{user_id}"} 3.02' in text
+
+
+def test_dynamodb_hooks_record_capacity_and_scanned_items():
+    client = boto3.client(
+        "dynamodb", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test"
+    )
+    metrics.instrument_dynamodb_client(client)
+    with Stubber(client) as stubber:
+        stubber.add_response(
+            "query",
+            {"Items": [], "Count": 2, "ScannedCount": 10, "ConsumedCapacity": {"TableName": "users", "CapacityUnits": 1.5}},
+            {
+                "TableName": "users",
+                "IndexName": "state-city-index",
+                "KeyConditionExpression": "#s = :s",
+                "ReturnConsumedCapacity": "TOTAL",
+            },
+        )
+        client.query(TableName="users", IndexName="state-city-index", KeyConditionExpression="#s = :s")
+
+    assert metrics.DYNAMODB_REQUESTS.value("Query", "users", "ok") == 1
+    assert metrics.DYNAMODB_LATENCY.count("Query", "users") == 1
+    assert metrics.DYNAMODB_CAPACITY.value("Query", "users") == 1.5
+    assert metrics.DYNAMODB_ITEMS_SCANNED.value("Query", "users", "state-city-index") == 10
+    assert metrics.DYNAMODB_ITEMS_RETURNED.value("Query", "users", "state-city-index") == 2
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_requests_by_route_template():
+    app = FastAPI()
+
+    @app.get("/users/{user_id}")
+    async def get_user(user_id: int):
+        return {"id": user_id}
+
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    async def call(path):
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+            "query_string": b"", "headers": [], "client": ("test", 1), "server": ("test", 80),
+        }
+        await app(scope, receive, send)
+        return messages[0]["status"]
+
+    assert await call("/users/1") == 200
+    assert await call("/users/2") == 200
+    assert await call("/missing") == 404
+
+    assert metrics.HTTP_REQUESTS.value("GET", "/users/{user_id}", "200") == 2
+    assert metrics.HTTP_REQUESTS.value("GET", "unmatched", "404") == 1
+    assert metrics.HTTP_LATENCY.count("GET", "/users/{user_id}") == 2
+
+
+@pytest.mark.asyncio
+async def test_filter_users_counts_query_plans():
+    db = FakeDynamoDB(users_table([
+        {"id": 1, "email": "a@example.com", "state": "TX", "city": "Austin", "company": "Acme"},
+        {"id": 2, "email": "b@example.com", "state": "CA", "city": "Fresno", "company": "Beta"},
+    ]))
+
+    await user_service.filter_users(db, state="TX", city="Austin")
+    await user_service.filter_users(db, state="TX", city="Austin")
+    await user_service.filter_users(db, events_attended_min=0)
+    await user_service.filter_users(db, events_attended_min=0, sort_by="last_name")
+
+    assert metrics.render().count("user_filter_plans_total{") == 3
+    # The repeated request is a cache hit and never reaches DynamoDB
+    assert user_service.USER_FILTER_PLANS.value("gsi", "state-city-index") == 1
+    assert user_service.USER_FILTER_PLANS.value("parallel_scan", "-") == 1
+    assert user_service.USER_FILTER_PLANS.value("parallel_scan_sort", "-") == 1
@@ -0,0 +1,256 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import registration_service
+from app.tests.fake_dynamodb import (
+    FakeDynamoDB,
+    event_hosts_table,
+    event_registrations_table,
+    event_waitlist_table,
+    events_table,
+    users_table,
+)
+
+
+@pytest.fixture
+def db():
+    users = [{"id": i, "email": f"user{i}@example.com", "events_attended": 0, "events_hosted": 0} for i in range(1, 301)]
+    return FakeDynamoDB(
+        users_table(users),
+        events_table(range(1, 6)),
+        event_registrations_table(),
+        event_hosts_table(),
+        event_waitlist_table(),
+    )
+
+
+def _user(db, user_id):
+    return db.tables["users"].items[(user_id,)]
+
+
+@pytest.mark.asyncio
+async def test_registration_writes_link_and_counter_in_one_transaction(db):
+    link = await registration_service.create_link(db, "registration", 1, 7)
+    assert link["id"] == registration_service.link_id(1, 7)
+    assert _user(db, 7)["events_attended"] == 1
+    assert len(db.meta.client.transact_calls) == 1
+
+    with pytest.raises(HTTPException) as exc:
+        await registration_service.create_link(db, "registration", 1, 7)
+    assert exc.value.status_code == 409
+    assert _user(db, 7)["events_attended"] == 1
+
+    await registration_service.delete_link(db, "registration", 1, 7)
+    assert _user(db, 7)["events_attended"] == 0
+    assert not db.tables["event_registrations"].items
+    with pytest.raises(HTTPException) as exc:
+        await registration_service.delete_link(db, "registration", 1, 7)
+    assert exc.value.status_code == 404
+    assert _user(db, 7)["events_attended"] == 0
+
+
+@pytest.mark.asyncio
+async def test_link_to_unknown_user_or_event_changes_nothing(db):
+    with pytest.raises(HTTPException) as exc:
+        await registration_service.create_link(db, "host", 1, 999)
+    assert (exc.value.status_code, exc.value.detail) == (404, "User not found.")
+    with pytest.raises(HTTPException) as exc:
+        await registration_service.create_link(db, "host", 99, 1)
+    assert (exc.value.status_code, exc.value.detail) == (404, "Event not found.")
+    assert not db.tables["event_hosts"].items
+    assert _user(db, 1)["events_hosted"] == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_registrations_pack_transactions_and_report_skips(db):
+    await registration_service.create_link(db, "registration", 2, 5)
+    links = [(event_id, user_id) for event_id in range(1, 4) for user_id in range(1, 301)]
+    links += [(2, 5), (1, 1), (4, 999), (42, 3)]
+    db.meta.client.conflicting_transactions = 1
+
+    result = await registration_service.bulk_create_links(db, "registration", links)
+
+    assert result["created"] == 899
+    assert result["skipped"] == [{"event_id": 2, "user_id": 5}]
+    assert sorted((f["event_id"], f["user_id"], f["error"]) for f in result["failed"]) == [
+        (4, 999, "User not found."),
+        (42, 3, "Event not found."),
+    ]
+    assert len(db.tables["event_registrations"].items) == 900
+    assert all(_user(db, user_id)["events_attended"] == 3 for user_id in range(1, 301))
+    assert all(len(call) <= 100 for call in db.meta.client.transact_calls)
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(registration_service, "REGISTRATION_BULK_BASE_DELAY", 0)
+
+
+def _capped_event(db, event_id, max_capacity):
+    db.tables["events"].put({"id": event_id, "title": f"Event {event_id}", "max_capacity": max_capacity})
+
+
+def _event(db, event_id):
+    return db.tables["events"].items[(event_id,)]
+
+
+@pytest.mark.asyncio
+async def test_full_event_waitlists_and_cancellation_promotes_the_first_in_line(db):
+    _capped_event(db, 10, 2)
+    assert (await registration_service.register(db, 10, 1))["status"] == "registered"
+    assert (await registration_service.register(db, 10, 2))["status"] == "registered"
+    assert (await registration_service.register(db, 10, 3))["status"] == "waitlisted"
+    assert (await registration_service.register(db, 10, 4))["status"] == "waitlisted"
+
+    for call, status in [
+        (registration_service.create_link(db, "registration", 10, 5), 409),
+        (registration_service.register(db, 10, 5, waitlist=False), 409),
+        (registration_service.register(db, 10, 3), 409),
+        (registration_service.register(db, 10, 1), 409),
+    ]:
+        with pytest.raises(HTTPException) as exc:
+            await call
+        assert exc.value.status_code == status
+    assert _event(db, 10)["registered_count"] == 2
+    assert _user(db, 3)["events_attended"] == 0
+
+    await registration_service.delete_link(db, "registration", 10, 1)
+
+    assert _event(db, 10)["registered_count"] == 2
+    assert (registration_service.link_id(10, 3),) in db.tables["event_registrations"].items
+    assert _user(db, 3)["events_attended"] == 1
+    assert [entry["user_id"] for entry in db.tables["event_waitlist"].items.values()] == [4]
+
+
+@pytest.mark.asyncio
+async def test_cancellation_hands_its_seat_over_in_the_same_transaction(db):
+    _capped_event(db, 10, 1)
+    await registration_service.register(db, 10, 1)
+    for user_id in (2, 3, 4):
+        await registration_service.register(db, 10, user_id)
+    # A stale head: registered outside the waitlist since joining it
+    _event(db, 10)["max_capacity"] = 2
+    await registration_service.create_link(db, "registration", 10, 2)
+    calls = len(db.meta.client.transact_calls)
+
+    await registration_service.delete_link(db, "registration", 10, 1)
+
+    assert (registration_service.link_id(10, 3),) in db.tables["event_registrations"].items
+    assert _event(db, 10)["registered_count"] == 2
+    assert _user(db, 1)["events_attended"] == 0
+    assert _user(db, 3)["events_attended"] == 1
+    assert [entry["user_id"] for entry in db.tables["event_waitlist"].items.values()] == [4]
+    assert len(db.meta.client.transact_calls) - calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancellation_skips_waitlist_entries_the_index_still_lists(db, monkeypatch):
+    _capped_event(db, 10, 1)
+    for user_id in (1, 2, 3):
+        await registration_service.register(db, 10, user_id)
+    waitlist = db.tables["event_waitlist"]
+    query = waitlist.query
+
+    async def lagging_query(**kwargs):
+        # The index has not caught up with the removal of user 9's entry yet
+        response = await query(**kwargs)
+        stale = {"id": registration_service.link_id(10, 9), "event_id": 10, "user_id": 9, "created_at": "2000-01-01"}
+        return dict(response, Items=[stale] + response["Items"])
+
+    monkeypatch.setattr(waitlist, "query", lagging_query)
+    calls = len(db.meta.client.transact_calls)
+
+    await registration_service.delete_link(db, "registration", 10, 1)
+
+    assert (registration_service.link_id(10, 2),) in db.tables["event_registrations"].items
+    assert len(db.meta.client.transact_calls) - calls == 1
+
+
+@pytest.mark.asyncio
+async def test_newcomers_queue_behind_the_waitlist_when_seats_free_up(db):
+    _capped_event(db, 10, 1)
+    await registration_service.register(db, 10, 1)
+    assert (await registration_service.register(db, 10, 2))["status"] == "waitlisted"
+    _event(db, 10)["max_capacity"] = 2
+
+    with pytest.raises(HTTPException) as exc:
+        await registration_service.register(db, 10, 3, waitlist=False)
+    assert exc.value.status_code == 409
+    assert (await registration_service.register(db, 10, 3))["status"] == "waitlisted"
+
+    assert (registration_service.link_id(10, 2),) in db.tables["event_registrations"].items
+    assert [entry["user_id"] for entry in db.tables["event_waitlist"].items.values()] == [3]
+    assert _event(db, 10)["registered_count"] == 2
+
+    await registration_service.delete_link(db, "registration", 10, 1)
+    assert (registration_service.link_id(10, 3),) in db.tables["event_registrations"].items
+    assert db.tables["event_waitlist"].items == {}
+    assert _event(db, 10)["registered_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_simultaneous_registrations_never_oversell(db, no_backoff):
+    db.tables["users"].put(*[{"id": i, "events_attended": 0} for i in range(301, 3001)])
+    _capped_event(db, 10, 250)
+    db.meta.client.conflicting_transactions = 200
+
+    results = await asyncio.gather(*[registration_service.register(db, 10, u) for u in range(1, 3001)])
+
+    statuses = [result["status"] for result in results]
+    assert statuses.count("registered") == 250
+    assert statuses.count("waitlisted") == 2750
+    assert _event(db, 10)["registered_count"] == 250
+    assert len(db.tables["event_registrations"].items) == 250
+    assert sum(user.get("events_attended", 0) for user in db.tables["users"].items.values()) == 250
+
+    # Concurrent cancellations each hand their seat to a distinct waitlisted user
+    cancelled = [result["user_id"] for result in results if result["status"] == "registered"][:50]
+    await asyncio.gather(*[registration_service.delete_link(db, "registration", 10, u) for u in cancelled])
+
+    assert _event(db, 10)["registered_count"] == 250
+    assert len(db.tables["event_registrations"].items) == 250
+    assert len(db.tables["event_waitlist"].items) == 2700
+
+
+@pytest.mark.asyncio
+async def test_bulk_registrations_stop_at_capacity(db, no_backoff):
+    _capped_event(db, 10, 100)
+    await registration_service.create_link(db, "registration", 10, 300)
+
+    result = await registration_service.bulk_create_links(db, "registration", [(10, u) for u in range(1, 151)])
+
+    assert result["created"] == 99
+    assert len(result["failed"]) == 51
+    assert {f["error"] for f in result["failed"]} == {"Event is full."}
+    assert _event(db, 10)["registered_count"] == 100
+    assert len(db.tables["event_registrations"].items) == 100
+
+
+@pytest.mark.asyncio
+async def test_bulk_capacity_state_does_not_count_seats_twice(db, no_backoff):
+    _capped_event(db, 10, 10)
+    events = await registration_service._event_capacities(db, [10])
+    # Taken after the capacity read, so the first claims are planned against stale state
+    _event(db, 10)["registered_count"] = 4
+    transact = db.meta.client.transact_write_items
+
+    async def slow_response(**kwargs):
+        response = await transact(**kwargs)
+        # The other batch's rejected claim refreshes the state before this success is applied
+        for _ in range(5):
+            await asyncio.sleep(0)
+        return response
+
+    db.meta.client.transact_write_items = slow_response
+    spec = registration_service.LINK_KINDS["registration"]
+    first, second = await asyncio.gather(
+        registration_service._write_link_batch(db, spec, [(10, u) for u in range(1, 5)], events),
+        registration_service._write_link_batch(db, spec, [(10, u) for u in range(5, 9)], events),
+    )
+
+    assert (first["created"], second["created"]) == (4, 2)
+    assert [f["user_id"] for f in second["failed"]] == [7, 8]
+    assert _event(db, 10)["registered_count"] == 10
+    assert events[10]["registered"] == 10
@@ -0,0 +1,35 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app.services import user_export_service
+from app.tests.fake_dynamodb import FakeDynamoDB, users_table
+from app.tests.test_user_service import _seed_users
+
+
+async def _read(stream):
+    return b"".join([chunk async for chunk in stream]).decode()
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_streams_filtered_users():
+    db = FakeDynamoDB(users_table(_seed_users(30)))
+    body = await _read(user_export_service.export_users(db, format="ndjson", state="TX", company="Acme"))
+    users = [json.loads(line) for line in body.splitlines()]
+    assert sorted(user["id"] for user in users) == list(range(1, 31, 2))
+    assert all(isinstance(user["events_attended"], int) for user in users)
+    assert all(call[0] == "query" for call in db.tables["users"].calls)
+
+
+@pytest.mark.asyncio
+async def test_export_csv_sends_header_first_and_one_row_per_user():
+    db = FakeDynamoDB(users_table(_seed_users(30)))
+    stream = user_export_service.export_users(db, format="csv", events_hosted_min=2, segments=3)
+    header = await stream.__anext__()
+    assert not db.tables["users"].calls
+    assert header.decode().strip() == ",".join(user_export_service.EXPORT_CSV_FIELDS)
+    rows = list(csv.DictReader(io.StringIO(header.decode() + await _read(stream))))
+    assert sorted(int(row["id"]) for row in rows) == [i for i in range(1, 31) if i % 3 == 2]
+    assert rows[0]["phone_number"] == ""
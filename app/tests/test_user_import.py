@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import registration_service, user_import_service
+from app.tests.fake_dynamodb import (
+    FakeDynamoDB,
+    event_hosts_table,
+    event_registrations_table,
+    event_waitlist_table,
+    events_table,
+    users_table,
+)
+
+
+async def _chunks(data: bytes, size: int = 7):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+@pytest.mark.asyncio
+async def test_csv_import_streams_rows_into_batches_and_reports_errors():
+    lines = ["id,email,first_name,last_name,role,city,events_attended"]
+    lines += [f"{i},user{i}@example.com,Zoë,User {i},attendee,Austin,{i % 3}" for i in range(1, 61)]
+    lines += [
+        '61,user61@example.com,"Multi\nLine",Name,host,,',
+        "62,not-an-email,Bad,Email,attendee,,",
+        "63,user63@example.com,Too,Few",
+        "64,user64@example.com,Bad,Role,admin,,",
+    ]
+    db = FakeDynamoDB(users_table())
+    result = await user_import_service.import_users(db, _chunks("\n".join(lines).encode()), "csv", concurrency=2)
+
+    assert result["imported"] == 61
+    assert result["failed"] == 3
+    assert [error["row"] for error in result["errors"]] == [62, 63, 64]
+    assert "email" in result["errors"][0]["error"]
+    users = db.tables["users"].items
+    assert users[(1,)]["first_name"] == "Zoë"
+    assert users[(1,)]["events_hosted"] == 0
+    assert users[(2,)]["events_attended"] == 2
+    assert users[(61,)]["first_name"] == "Multi\nLine"
+    assert "city" not in users[(61,)]
+    assert [len(call["users"]) for call in db.batch_write_calls] == [25, 25, 11]
+
+
+@pytest.mark.asyncio
+async def test_reimport_updates_profiles_without_resetting_event_counters():
+    db = FakeDynamoDB(
+        users_table([{"id": 1, "email": "old@example.com", "city": "Austin", "events_attended": 0, "events_hosted": 0}]),
+        events_table(range(1, 3)),
+        event_registrations_table(),
+        event_hosts_table(),
+        event_waitlist_table(),
+    )
+    await registration_service.create_link(db, "registration", 1, 1)
+    await registration_service.create_link(db, "registration", 2, 1)
+    await registration_service.create_link(db, "host", 2, 1)
+
+    lines = [
+        "id,email,first_name,last_name,role,events_attended",
+        "1,new@example.com,Ann,Lee,host,",
+        "2,two@example.com,Bo,Kim,attendee,5",
+    ]
+    result = await user_import_service.import_users(db, _chunks("\n".join(lines).encode()), "csv")
+
+    assert result["imported"] == 2
+    users = db.tables["users"].items
+    assert users[(1,)]["email"] == "new@example.com"
+    assert "city" not in users[(1,)]
+    assert (users[(1,)]["events_attended"], users[(1,)]["events_hosted"]) == (2, 1)
+    assert (users[(2,)]["events_attended"], users[(2,)]["events_hosted"]) == (5, 0)
+    assert [len(call["users"]) for call in db.batch_write_calls] == [1]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_import_splits_duplicate_ids_and_retries_unprocessed():
+    rows = [{"id": i % 30, "email": f"u{i}@example.com", "first_name": "A", "last_name": "B", "role": "host"} for i in range(40)]
+    body = "\n".join(json.dumps(row) for row in rows) + "\n[1, 2]\n{broken\n"
+    db = FakeDynamoDB(users_table())
+    db.throttled_batch_writes = 1
+    result = await user_import_service.import_users(db, _chunks(body.encode(), 64), "ndjson")
+
+    assert result["imported"] == 40
+    assert [error["row"] for error in result["errors"]] == [41, 42]
+    assert len(db.tables["users"].items) == 30
+    assert db.tables["users"].items[(5,)]["email"] == "u35@example.com"
+
+
+def test_import_format_from_content_type():
+    assert user_import_service.import_format("text/csv; charset=utf-8") == "csv"
+    assert user_import_service.import_format("application/x-ndjson") == "ndjson"
+    assert user_import_service.import_format("application/json", "csv") == "csv"
+    with pytest.raises(HTTPException) as exc:
+        user_import_service.import_format("application/json")
+    assert exc.value.status_code == 415
@@ -1,8 +1,14 @@
+import asyncio
+import json
+
 import pytest
 import pytest_asyncio
 from unittest.mock import AsyncMock, MagicMock
 from fastapi import HTTPException
+from app.routers import users as users_router
 from app.services import user_service
+from app.tests.fake_dynamodb import FakeDynamoDB, users_table
+from app.utils.cursor import encode_cursor
 
 @pytest_asyncio.fixture
 def mock_db():
@@ -65,4 +71,327 @@ async def test_filter_users_invalid_sort_by(mock_db):
     with pytest.raises(HTTPException) as exc:
         await user_service.filter_users(db, sort_by='notafield')
     assert exc.value.status_code == 400
-    assert 'Invalid sort_by field' in exc.value.detail 
\ No newline at end of file
+    assert 'Invalid sort_by field' in exc.value.detail 
+
+def _seed_users(count):
+    return [
+        {
+            'id': i, 'email': f'user{i}@example.com', 'first_name': f'F{i}', 'last_name': f'L{i}', 'role': 'attendee',
+            'company': 'Acme' if i % 2 else 'Beta', 'job_title': 'Engineer', 'city': 'Austin', 'state': 'TX',
+            'events_hosted': i % 3, 'events_attended': i % 10,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+async def _collect_all_pages(db, **kwargs):
+    ids, cursor, pages = [], None, 0
+    while True:
+        result = await user_service.filter_users(db, cursor=cursor, **kwargs)
+        ids.extend(int(u['id']) for u in result['results'])
+        pages += 1
+        cursor = result['next_cursor']
+        if cursor is None:
+            return ids, pages
+
+
+@pytest.mark.asyncio
+async def test_parallel_scan_paginates_every_user_exactly_once():
+    db = FakeDynamoDB(users_table(_seed_users(53)))
+    ids, pages = await _collect_all_pages(db, limit=10)
+    assert sorted(ids) == list(range(1, 54))
+    assert pages == 6
+
+
+@pytest.mark.asyncio
+async def test_parallel_scan_fills_pages_through_sparse_filters(monkeypatch):
+    monkeypatch.setattr(user_service, 'USER_SCAN_PAGE_SIZE', 7)
+    db = FakeDynamoDB(users_table(_seed_users(100)))
+    result = await user_service.filter_users(db, events_attended_min=8, limit=5)
+    assert result['count'] == 5
+    ids, _ = await _collect_all_pages(db, events_attended_min=8, limit=5)
+    assert sorted(ids) == [i for i in range(1, 101) if i % 10 >= 8]
+
+
+@pytest.mark.asyncio
+async def test_filter_users_invalid_cursor(mock_db):
+    db, _ = mock_db
+    with pytest.raises(HTTPException) as exc:
+        await user_service.filter_users(db, cursor='not-a-cursor!')
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('positions', [
+    ['start'] * 10000,
+    ['start', 'done'],
+    ['start', 'done', 'bogus', 'start'],
+    ['start', 'done', {'id': 3, 'email': 'x'}, 'start'],
+    ['start', 'done', {'id': [1]}, 'start'],
+])
+async def test_filter_users_rejects_crafted_scan_positions(positions):
+    db = FakeDynamoDB(users_table(_seed_users(5)))
+    with pytest.raises(HTTPException) as exc:
+        await user_service.filter_users(db, cursor=encode_cursor({'m': 'scan', 's': positions}))
+    assert exc.value.status_code == 400
+    assert db.tables['users'].calls == []
+
+
+@pytest.mark.asyncio
+async def test_filter_users_cursor_from_other_path_is_rejected():
+    db = FakeDynamoDB(users_table(_seed_users(5)))
+    result = await user_service.filter_users(db, company='Acme', sort_by='job_title', limit=1)
+    with pytest.raises(HTTPException) as exc:
+        await user_service.filter_users(db, limit=1, cursor=result['next_cursor'])
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_filtered_scan_returns_full_page_in_one_call(monkeypatch):
+    monkeypatch.setattr(user_service, 'USER_SCAN_PAGE_SIZE', 10)
+    users = _seed_users(200)
+    for user in users:
+        user['city'] = 'Boston' if user['id'] % 20 == 0 else 'Austin'
+    table = users_table(users)
+    result = await user_service.filter_users(FakeDynamoDB(table), city='Boston', limit=5)
+    assert [int(u['id']) for u in result['results']] == [20, 40, 60, 80, 100]
+    assert result['next_cursor'] is not None
+    assert all(call[1]['Limit'] == 10 for call in table.calls)
+
+    ids, pages = await _collect_all_pages(FakeDynamoDB(table), city='Boston', limit=5)
+    assert ids == list(range(20, 201, 20))
+    assert pages == 2
+
+
+@pytest.mark.asyncio
+async def test_filtered_scan_stops_when_budget_is_spent(monkeypatch):
+    monkeypatch.setattr(user_service, 'USER_SCAN_PAGE_SIZE', 10)
+    monkeypatch.setattr(user_service, 'USER_FILTER_MAX_SECONDS', 0)
+    users = _seed_users(200)
+    for user in users:
+        user['city'] = 'Boston' if user['id'] % 20 == 0 else 'Austin'
+    table = users_table(users)
+    result = await user_service.filter_users(FakeDynamoDB(table), city='Boston', limit=5)
+    assert len(table.calls) == 1
+    assert [int(u['id']) for u in result['results']] == []
+    assert result['next_cursor'] is not None
+
+
+@pytest.mark.asyncio
+async def test_gsi_query_applies_residual_filters_across_pages(monkeypatch):
+    monkeypatch.setattr(user_service, 'USER_SCAN_PAGE_SIZE', 3)
+    db = FakeDynamoDB(users_table(_seed_users(60)))
+    ids, _ = await _collect_all_pages(db, company='Acme', sort_by='job_title', events_attended_min=9, limit=2)
+    assert sorted(ids) == [i for i in range(1, 61) if i % 2 and i % 10 == 9]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('sort_order', ['asc', 'desc'])
+async def test_in_memory_sort_is_global_across_pages(sort_order):
+    users = _seed_users(45)
+    for user in users:
+        if user['id'] % 7 == 0:
+            del user['events_attended']
+    db = FakeDynamoDB(users_table(users))
+    ids, pages = await _collect_all_pages(db, sort_by='events_attended', sort_order=sort_order, limit=10)
+
+    def expected_key(user):
+        value = user.get('events_attended')
+        missing = value is None
+        if sort_order == 'desc':
+            return (missing, -(value or 0), -user['id'])
+        return (missing, value or 0, user['id'])
+
+    assert ids == [u['id'] for u in sorted(users, key=expected_key)]
+    assert pages == 5
+
+
+@pytest.mark.asyncio
+async def test_in_memory_sort_cursor_must_match_sort():
+    db = FakeDynamoDB(users_table(_seed_users(5)))
+    result = await user_service.filter_users(db, sort_by='last_name', limit=2)
+    with pytest.raises(HTTPException) as exc:
+        await user_service.filter_users(db, sort_by='first_name', limit=2, cursor=result['next_cursor'])
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_in_memory_sort_keeps_total_segments_while_segments_finish(monkeypatch):
+    # Small pages make the segments finish in different rounds
+    monkeypatch.setattr(user_service, 'USER_SCAN_PAGE_SIZE', 3)
+    db = FakeDynamoDB(users_table(_seed_users(50)))
+    ids, _ = await _collect_all_pages(db, sort_by='last_name', limit=7)
+
+    assert sorted(ids) == list(range(1, 51))
+    scans = [call[1] for call in db.tables['users'].calls if call[0] == 'scan']
+    assert {call['TotalSegments'] for call in scans} == {user_service.USER_SCAN_SEGMENTS}
+
+
+def _filters(**overrides):
+    filters = {
+        'company': None, 'job_title': None, 'city': None, 'state': None,
+        'events_hosted': (None, None), 'events_attended': (None, None),
+    }
+    filters.update(overrides)
+    return filters
+
+
+@pytest.mark.parametrize('filters,sort_by,expected_index', [
+    (_filters(state='TX'), None, 'state-events_attended-index'),
+    (_filters(state='TX', city='Austin'), None, 'state-city-index'),
+    (_filters(state='TX', city='Austin', events_attended=(3, None)), None, 'state-city-index'),
+    (_filters(state='TX', events_hosted=(1, 2)), None, 'state-events_hosted-index'),
+    (_filters(state='TX'), 'events_hosted', 'state-events_hosted-index'),
+    (_filters(company='Acme'), 'job_title', 'company-job_title-index'),
+    (_filters(company='Acme', job_title='Engineer'), None, 'company-job_title-index'),
+])
+def test_plan_user_query_picks_most_selective_index(filters, sort_by, expected_index):
+    plan = user_service._plan_user_query(filters, sort_by, 'asc')
+    assert plan['index_name'] == expected_index
+    assert not set(plan['index_keys']) & set(plan['residual_filters'])
+
+
+@pytest.mark.parametrize('filters,sort_by', [
+    (_filters(), None),
+    (_filters(city='Austin'), None),
+    (_filters(company='Acme'), None),
+    (_filters(events_attended=(1, 5)), 'events_attended'),
+])
+def test_plan_user_query_falls_back_to_scan(filters, sort_by):
+    assert user_service._plan_user_query(filters, sort_by, 'asc') is None
+
+
+@pytest.mark.asyncio
+async def test_state_filter_is_served_by_query_with_range_condition():
+    users = _seed_users(40)
+    for user in users:
+        user['state'] = 'CA' if user['id'] % 4 == 0 else 'TX'
+    table = users_table(users)
+    ids, _ = await _collect_all_pages(FakeDynamoDB(table), state='CA', events_attended_min=4, events_attended_max=8, limit=3)
+    assert sorted(ids) == [i for i in range(1, 41) if i % 4 == 0 and 4 <= i % 10 <= 8]
+    assert {call[0] for call in table.calls} == {'query'}
+    assert {call[1]['IndexName'] for call in table.calls} == {'state-events_attended-index'}
+
+
+@pytest.mark.asyncio
+async def test_in_memory_sort_reads_from_planned_query():
+    table = users_table(_seed_users(30))
+    result = await user_service.filter_users(FakeDynamoDB(table), state='TX', city='Austin', sort_by='last_name', limit=5)
+    assert [u['last_name'] for u in result['results']] == sorted(f'L{i}' for i in range(1, 31))[:5]
+    assert {call[0] for call in table.calls} == {'query'}
+
+
+@pytest.mark.asyncio
+async def test_filter_users_serves_repeated_queries_from_cache():
+    table = users_table(_seed_users(10))
+    db = FakeDynamoDB(table)
+    first = await user_service.filter_users(db, company='Acme', sort_by='job_title', limit=3)
+    calls = len(table.calls)
+    second = await user_service.filter_users(db, company='Acme', sort_by='job_title', limit=3)
+    assert second == first
+    assert len(table.calls) == calls
+    assert user_service.user_cache_stats()['hits'] >= 1
+
+    user_service.invalidate_user_cache()
+    await user_service.filter_users(db, company='Acme', sort_by='job_title', limit=3)
+    assert len(table.calls) > calls
+
+
+@pytest.mark.asyncio
+async def test_iter_filter_users_streams_pages_until_max_results():
+    db = FakeDynamoDB(users_table(_seed_users(25)))
+    pages = [page async for page in user_service.iter_filter_users(db, page_size=10, state='TX')]
+    assert [page['count'] for page in pages] == [10, 10, 5]
+    assert sorted(int(u['id']) for page in pages for u in page['results']) == list(range(1, 26))
+
+    pages = [page async for page in user_service.iter_filter_users(db, page_size=10, max_results=15, state='TX')]
+    assert [page['count'] for page in pages] == [10, 5]
+
+
+@pytest.mark.asyncio
+async def test_iter_filter_users_bypasses_the_page_cache():
+    db = FakeDynamoDB(users_table(_seed_users(25)))
+    user_service.invalidate_user_cache()
+    before = user_service.user_cache_stats()
+
+    pages = [page async for page in user_service.iter_filter_users(db, page_size=10, sort_by='last_name')]
+
+    assert sum(page['count'] for page in pages) == 25
+    assert user_service.user_cache_stats() == dict(before, size=0)
+
+
+@pytest.mark.asyncio
+async def test_iter_user_pages_streams_every_match_once_across_segments(monkeypatch):
+    monkeypatch.setattr(user_service, "USER_SCAN_PAGE_SIZE", 7)
+    db = FakeDynamoDB(users_table(_seed_users(200)))
+    ids = []
+    async for page in user_service.iter_user_pages(db, events_attended_min=5, segments=4):
+        assert len(page) <= 4 * 7
+        ids.extend(int(u['id']) for u in page)
+    assert sorted(ids) == [i for i in range(1, 201) if i % 10 >= 5]
+    # Every scan request keeps TotalSegments=4, also after some segments finish
+    assert {call[1]["TotalSegments"] for call in db.tables["users"].calls} == {4}
+
+
+@pytest.mark.asyncio
+async def test_fast_filter_response_matches_validated_response():
+    users = _seed_users(5)
+    users[0]['nickname'] = 'not in the schema'
+    del users[1]['company']
+    result = await user_service.filter_users(FakeDynamoDB(users_table(users)), limit=5)
+    assert all(type(u['events_attended']) is int for u in result['results'])
+
+    body = json.loads(users_router.user_filter_response(result).body)
+    expected = users_router.UserFilterResponse.model_validate(result).model_dump(mode="json")
+    assert body == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filters", [
+    {},
+    {"state": "TX", "company": "Acme"},
+    {"company": "Acme", "sort_by": "last_name", "sort_order": "desc"},
+])
+async def test_fields_project_results_and_keep_paging_exact(filters):
+    db = FakeDynamoDB(users_table(_seed_users(40)))
+    expected, _ = await _collect_all_pages(db, limit=7, **filters)
+    user_service.invalidate_user_cache()
+    db.tables["users"].calls.clear()
+
+    ids, cursor = [], None
+    while True:
+        result = await user_service.filter_users(db, limit=7, cursor=cursor, fields=["email", "id"], **filters)
+        assert all(set(user) == {"id", "email"} for user in result["results"])
+        ids.extend(user["id"] for user in result["results"])
+        cursor = result["next_cursor"]
+        if cursor is None:
+            break
+    assert ids == expected
+    assert all("ProjectionExpression" in call[1] for call in db.tables["users"].calls)
+
+
+@pytest.mark.asyncio
+async def test_invalid_fields_are_rejected():
+    with pytest.raises(HTTPException) as exc:
+        await user_service.filter_users(FakeDynamoDB(users_table()), fields=["email", "password"])
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_user_loader_coalesces_concurrent_loads_into_batch_gets():
+    db = FakeDynamoDB(users_table(_seed_users(300)))
+    loader = user_service.UserLoader(db, fields=['email'])
+
+    ids = list(range(1, 251)) + [7, 9999]
+    users = await asyncio.gather(*[loader.load(user_id) for user_id in ids])
+
+    assert loader.batches == 1
+    assert len(db.batch_get_calls) == 3
+    assert users[0] == {'email': 'user1@example.com'}
+    assert users[250] is users[6]
+    assert users[251] is None
+
+    # Memoized: loading known ids again makes no further requests
+    again = await loader.load_many([1, 7, 9999])
+    assert again == [users[0], users[6], None]
+    assert len(db.batch_get_calls) == 3
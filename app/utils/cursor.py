@@ -0,0 +1,35 @@
+# Opaque pagination cursors
+import base64
+import binascii
+import json
+from decimal import Decimal
+from typing import Any, Dict
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not cursor serializable")
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    """
+    Encode a pagination state dict (DynamoDB keys may contain Decimals) as an url-safe token.
+    """
+    raw = json.dumps(state, default=_json_default, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a token produced by encode_cursor. Raises ValueError for malformed cursors.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode("ascii"))
+        state = json.loads(raw, parse_float=Decimal)
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(state, dict):
+        raise ValueError("Malformed cursor")
+    return state
@@ -1,20 +1,100 @@
 # DynamoDB connection setup
+import asyncio
 import os
 
 import aioboto3
+from aiobotocore.config import AioConfig
+from fastapi import FastAPI
+
+from app.utils.logger import logger
+from app.utils.metrics import instrument_dynamodb_client
 
 DYNAMODB_ENDPOINT_URL = os.getenv("DYNAMODB_ENDPOINT_URL", None)
 DYNAMODB_REGION = os.getenv("DYNAMODB_REGION", "us-east-1")
 
+# Connection pool / retry tuning for the shared DynamoDB resource
+DYNAMODB_MAX_POOL_CONNECTIONS = int(os.getenv("DYNAMODB_MAX_POOL_CONNECTIONS", "50"))
+DYNAMODB_KEEPALIVE_TIMEOUT = float(os.getenv("DYNAMODB_KEEPALIVE_TIMEOUT", "12"))
+DYNAMODB_CONNECT_TIMEOUT = float(os.getenv("DYNAMODB_CONNECT_TIMEOUT", "2"))
+DYNAMODB_READ_TIMEOUT = float(os.getenv("DYNAMODB_READ_TIMEOUT", "5"))
+DYNAMODB_RETRY_MODE = os.getenv("DYNAMODB_RETRY_MODE", "adaptive")
+DYNAMODB_MAX_ATTEMPTS = int(os.getenv("DYNAMODB_MAX_ATTEMPTS", "5"))
+
+_session = None
+_resource_context = None
+_resource = None
+_resource_lock = asyncio.Lock()
+
+
+def build_client_config() -> AioConfig:
+    """
+    Build the botocore config shared by every DynamoDB call in this process.
+    """
+    return AioConfig(
+        max_pool_connections=DYNAMODB_MAX_POOL_CONNECTIONS,
+        connect_timeout=DYNAMODB_CONNECT_TIMEOUT,
+        read_timeout=DYNAMODB_READ_TIMEOUT,
+        retries={"mode": DYNAMODB_RETRY_MODE, "max_attempts": DYNAMODB_MAX_ATTEMPTS},
+        tcp_keepalive=True,
+        connector_args={"keepalive_timeout": DYNAMODB_KEEPALIVE_TIMEOUT},
+    )
+
+
+async def init_db():
+    """
+    Open the process-wide aioboto3 DynamoDB resource (idempotent).
+    """
+    global _session, _resource_context, _resource
+    async with _resource_lock:
+        if _resource is not None:
+            return _resource
+        _session = aioboto3.Session()
+        _resource_context = _session.resource(
+            "dynamodb",
+            region_name=DYNAMODB_REGION,
+            endpoint_url=DYNAMODB_ENDPOINT_URL,
+            config=build_client_config(),
+        )
+        _resource = await _resource_context.__aenter__()
+        instrument_dynamodb_client(_resource.meta.client)
+        logger.info(
+            f"DynamoDB resource opened (pool={DYNAMODB_MAX_POOL_CONNECTIONS}, retry_mode={DYNAMODB_RETRY_MODE})"
+        )
+        return _resource
+
+
+async def close_db():
+    """
+    Close the process-wide DynamoDB resource and its connection pool.
+    """
+    global _session, _resource_context, _resource
+    async with _resource_lock:
+        if _resource_context is not None:
+            await _resource_context.__aexit__(None, None, None)
+            logger.info("DynamoDB resource closed.")
+        _session = None
+        _resource_context = None
+        _resource = None
+
 
 async def get_db():
     """
-    Yields an aioboto3 DynamoDB resource for async database operations.
+    Yields the shared aioboto3 DynamoDB resource for async database operations.
+    The resource is opened on startup; it is opened lazily if a request arrives first.
     """
-    session = aioboto3.Session()
-    async with session.resource(
-        "dynamodb",
-        region_name=DYNAMODB_REGION,
-        endpoint_url=DYNAMODB_ENDPOINT_URL
-    ) as dynamodb_resource:
-        yield dynamodb_resource
+    resource = _resource
+    if resource is None:
+        resource = await init_db()
+    yield resource
+
+
+# FastAPI event hook
+
+def register_db(app: FastAPI):
+    @app.on_event("startup")
+    async def open_db():
+        await init_db()
+
+    @app.on_event("shutdown")
+    async def shutdown_db():
+        await close_db()
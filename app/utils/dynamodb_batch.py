@@ -0,0 +1,104 @@
+# Batched DynamoDB writes
+import asyncio
+import os
+import random
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.utils.logger import logger
+
+# DynamoDB accepts at most 25 put/delete requests per BatchWriteItem call
+BATCH_WRITE_MAX_ITEMS = 25
+# ... and at most 100 keys per BatchGetItem call
+BATCH_GET_MAX_KEYS = 100
+BATCH_WRITE_MAX_RETRIES = int(os.getenv("BATCH_WRITE_MAX_RETRIES", "8"))
+BATCH_WRITE_BASE_DELAY = float(os.getenv("BATCH_WRITE_BASE_DELAY", "0.05"))
+BATCH_WRITE_MAX_DELAY = float(os.getenv("BATCH_WRITE_MAX_DELAY", "2"))
+
+
+def _backoff_delay(attempt: int) -> float:
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(BATCH_WRITE_MAX_DELAY, BATCH_WRITE_BASE_DELAY * (2 ** attempt)))
+
+
+async def _write_chunk(db, table_name: str, requests: List[Dict[str, Any]], max_retries: int) -> List[Dict[str, Any]]:
+    """
+    Write one BatchWriteItem chunk, retrying UnprocessedItems with backoff.
+    Returns the requests still unprocessed after `max_retries` retries.
+    """
+    pending = requests
+    for attempt in range(max_retries + 1):
+        response = await db.batch_write_item(RequestItems={table_name: pending})
+        pending = (response.get("UnprocessedItems") or {}).get(table_name, [])
+        if not pending:
+            return []
+        if attempt < max_retries:
+            await asyncio.sleep(_backoff_delay(attempt))
+    logger.error(f"{len(pending)} writes to {table_name} still unprocessed after {max_retries} retries")
+    return pending
+
+
+async def batch_write_items(
+    db,
+    table_name: str,
+    items: Sequence[Dict[str, Any]],
+    concurrency: int = 1,
+    max_retries: int = None,
+) -> List[Dict[str, Any]]:
+    """
+    Put `items` into `table_name` with BatchWriteItem, 25 per request and up to `concurrency`
+    requests in flight. Returns the items that could not be written.
+    """
+    max_retries = BATCH_WRITE_MAX_RETRIES if max_retries is None else max_retries
+    chunks = [
+        [{"PutRequest": {"Item": item}} for item in items[i:i + BATCH_WRITE_MAX_ITEMS]]
+        for i in range(0, len(items), BATCH_WRITE_MAX_ITEMS)
+    ]
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def write(chunk):
+        async with semaphore:
+            return await _write_chunk(db, table_name, chunk, max_retries)
+
+    results = await asyncio.gather(*[write(chunk) for chunk in chunks])
+    return [request["PutRequest"]["Item"] for failed in results for request in failed]
+
+
+async def _get_chunk(db, table_name: str, request: Dict[str, Any], max_retries: int) -> List[Dict[str, Any]]:
+    """
+    Read one BatchGetItem chunk, retrying UnprocessedKeys with backoff.
+    Returns the items found; keys still unprocessed after the retries raise RuntimeError.
+    """
+    items = []
+    pending = request
+    for attempt in range(max_retries + 1):
+        response = await db.batch_get_item(RequestItems={table_name: pending})
+        items.extend((response.get("Responses") or {}).get(table_name, []))
+        pending = (response.get("UnprocessedKeys") or {}).get(table_name)
+        if not pending or not pending.get("Keys"):
+            return items
+        if attempt < max_retries:
+            await asyncio.sleep(_backoff_delay(attempt))
+    raise RuntimeError(f"{len(pending['Keys'])} reads from {table_name} still unprocessed after {max_retries} retries")
+
+
+async def batch_get_items(
+    db,
+    table_name: str,
+    keys: Sequence[Dict[str, Any]],
+    projection: Optional[Dict[str, Any]] = None,
+    max_retries: int = None,
+) -> List[Dict[str, Any]]:
+    """
+    Get the items for `keys` with BatchGetItem, 100 keys per request and all requests in
+    parallel. Duplicate keys are read once (DynamoDB rejects them within a request). Missing
+    items are simply absent from the result, which is in no particular order. `projection`
+    holds ProjectionExpression/ExpressionAttributeNames.
+    """
+    max_retries = BATCH_WRITE_MAX_RETRIES if max_retries is None else max_retries
+    unique = list({tuple(sorted(key.items())): key for key in keys}.values())
+    requests = [
+        dict(projection or {}, Keys=unique[i:i + BATCH_GET_MAX_KEYS])
+        for i in range(0, len(unique), BATCH_GET_MAX_KEYS)
+    ]
+    results = await asyncio.gather(*[_get_chunk(db, table_name, request, max_retries) for request in requests])
+    return [item for items in results for item in items]
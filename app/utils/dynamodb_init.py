@@ -1,276 +1,359 @@
-def create_email_logs_table():
-    try:
-        table = dynamodb.create_table(
-            TableName='email_logs',
-            KeySchema=[
-                {'AttributeName': 'id', 'KeyType': 'HASH'},
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'id', 'AttributeType': 'S'},
-                {'AttributeName': 'recipient', 'AttributeType': 'S'},
-                {'AttributeName': 'status', 'AttributeType': 'S'},
-                {'AttributeName': 'created_at', 'AttributeType': 'S'},
-            ],
-            GlobalSecondaryIndexes=[
-                {
-                    'IndexName': 'recipient-status-index',
-                    'KeySchema': [
-                        {'AttributeName': 'recipient', 'KeyType': 'HASH'},
-                        {'AttributeName': 'status', 'KeyType': 'RANGE'},
-                    ],
-                    'Projection': {'ProjectionType': 'ALL'},
-                    'ProvisionedThroughput': {
-                        'ReadCapacityUnits': 5,
-                        'WriteCapacityUnits': 5
-                    }
-                },
-                {
-                    'IndexName': 'created_at-index',
-                    'KeySchema': [
-                        {'AttributeName': 'created_at', 'KeyType': 'HASH'},
-                    ],
-                    'Projection': {'ProjectionType': 'ALL'},
-                    'ProvisionedThroughput': {
-                        'ReadCapacityUnits': 5,
-                        'WriteCapacityUnits': 5
-                    }
-                }
-            ],
-            ProvisionedThroughput={
-                'ReadCapacityUnits': 5,
-                'WriteCapacityUnits': 5
-            }
-        )
-        table.meta.client.get_waiter('table_exists').wait(TableName='email_logs')
-        logging.info("Table 'email_logs' with GSIs created.")
-    except ClientError as e:
-        if e.response['Error']['Code'] == 'ResourceInUseException':
-            logging.info("Table 'email_logs' already exists.")
-        else:
-            raise
+# DynamoDB table bootstrap: creates the tables of the schema registry (dynamodb_schema) without
+# blocking the event loop, and optionally writes the demo seed data. Run once per deploy with
+# `python -m app.utils.dynamodb_init [--seed] [--migrate] [--backfill-*]` and set DYNAMODB_INIT_TABLES=false on workers.
+import argparse
+import asyncio
 import os
+from typing import Any, Callable, Dict, List, Set
 
-from dotenv import load_dotenv
-
-load_dotenv()
-import logging
-
-import boto3
+from boto3.dynamodb.conditions import Attr, Key
 from botocore.exceptions import ClientError
 from fastapi import FastAPI
 
-DYNAMODB_ENDPOINT_URL = os.getenv("DYNAMODB_ENDPOINT_URL", None)
-DYNAMODB_REGION = os.getenv("DYNAMODB_REGION", "us-east-1")
-
-dynamodb = boto3.resource(
-    'dynamodb',
-    endpoint_url=DYNAMODB_ENDPOINT_URL,
-    region_name=DYNAMODB_REGION,
-    aws_access_key_id='dummy',
-    aws_secret_access_key='dummy'
+from app.utils.database import close_db, init_db
+from app.utils.dynamodb_batch import batch_write_items
+from app.utils.dynamodb_schema import (
+    DYNAMODB_TABLE_WAIT_ATTEMPTS,
+    DYNAMODB_TABLE_WAIT_DELAY,
+    TABLES,
+    Table,
+    apply_migrations,
+    create_table_kwargs,
+    diff_table,
+    plan_migrations,
 )
+from app.utils.email_utils import EMAIL_LOGS_TABLE, created_bucket
+from app.utils.event_utils import EVENTS_TABLE, start_month
+from app.utils.logger import logger
+
+# Check/create tables in the startup hook of every worker
+DYNAMODB_INIT_TABLES = os.getenv("DYNAMODB_INIT_TABLES", "true").lower() in ("1", "true", "yes")
+# Write the seed data below after bootstrapping (never on by default)
+DYNAMODB_SEED = os.getenv("DYNAMODB_SEED", "false").lower() in ("1", "true", "yes")
+# Attempts per event when registrations keep changing it during a registered_count backfill
+BACKFILL_MAX_RETRIES = 5
 
-def create_users_table():
+
+async def _list_tables(client) -> Set[str]:
+    names, kwargs = set(), {}
+    while True:
+        response = await client.list_tables(**kwargs)
+        names.update(response.get('TableNames', []))
+        if not response.get('LastEvaluatedTableName'):
+            return names
+        kwargs['ExclusiveStartTableName'] = response['LastEvaluatedTableName']
+
+
+async def _wait_until_active(client, name: str):
+    waiter = client.get_waiter('table_exists')
+    await waiter.wait(
+        TableName=name,
+        WaiterConfig={'Delay': DYNAMODB_TABLE_WAIT_DELAY, 'MaxAttempts': DYNAMODB_TABLE_WAIT_ATTEMPTS},
+    )
+
+
+async def _create_table(client, table: Table) -> bool:
     try:
-        table = dynamodb.create_table(
-            TableName='users',
-            KeySchema=[
-                {'AttributeName': 'id', 'KeyType': 'HASH'},
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'id', 'AttributeType': 'N'},
-                {'AttributeName': 'company', 'AttributeType': 'S'},
-                {'AttributeName': 'job_title', 'AttributeType': 'S'},
-            ],
-            GlobalSecondaryIndexes=[
-                {
-                    'IndexName': 'company-job_title-index',
-                    'KeySchema': [
-                        {'AttributeName': 'company', 'KeyType': 'HASH'},
-                        {'AttributeName': 'job_title', 'KeyType': 'RANGE'},
-                    ],
-                    'Projection': {'ProjectionType': 'ALL'},
-                    'ProvisionedThroughput': {
-                        'ReadCapacityUnits': 5,
-                        'WriteCapacityUnits': 5
-                    }
-                },
-                {
-                    'IndexName': 'job_title-company-index',
-                    'KeySchema': [
-                        {'AttributeName': 'job_title', 'KeyType': 'HASH'},
-                        {'AttributeName': 'company', 'KeyType': 'RANGE'},
-                    ],
-                    'Projection': {'ProjectionType': 'ALL'},
-                    'ProvisionedThroughput': {
-                        'ReadCapacityUnits': 5,
-                        'WriteCapacityUnits': 5
-                    }
-                }
-            ],
-            ProvisionedThroughput={
-                'ReadCapacityUnits': 5,
-                'WriteCapacityUnits': 5
-            }
-        )
-        table.meta.client.get_waiter('table_exists').wait(TableName='users')
-        logging.info("Table 'users' with GSIs created.")
+        await client.create_table(**create_table_kwargs(table))
+        logger.info(f"Creating table '{table.name}'.")
+        created = True
     except ClientError as e:
-        if e.response['Error']['Code'] == 'ResourceInUseException':
-            logging.info("Table 'users' already exists.")
-        else:
+        # Another worker created it between list_tables and now
+        if e.response['Error']['Code'] != 'ResourceInUseException':
             raise
+        created = False
+    await _wait_until_active(client, table.name)
+    return created
 
-def create_events_table():
-    try:
-        table = dynamodb.create_table(
-            TableName='events',
-            KeySchema=[
-                {'AttributeName': 'id', 'KeyType': 'HASH'},
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'id', 'AttributeType': 'N'},
-            ],
-            ProvisionedThroughput={
-                'ReadCapacityUnits': 5,
-                'WriteCapacityUnits': 5
-            }
+
+async def _check_table(client, table: Table) -> List[Dict[str, Any]]:
+    description = (await client.describe_table(TableName=table.name))['Table']
+    if description['TableStatus'] != 'ACTIVE':
+        await _wait_until_active(client, table.name)
+    return diff_table(table, description)
+
+
+async def init_dynamodb(db, seed: bool = False) -> List[str]:
+    """
+    Make sure every table in the schema registry exists and is ACTIVE: one paginated
+    list_tables, then the missing tables are created and the existing ones described
+    concurrently. Existing tables that differ from the registry are only reported; run
+    `python -m app.utils.dynamodb_init --migrate` to change them. Idempotent and safe to run
+    from several workers at once. Seeds with BatchWriteItem when `seed` is set.
+    Returns the names of the tables created.
+    """
+    client = db.meta.client
+    existing = await _list_tables(client)
+    missing = [table for name, table in TABLES.items() if name not in existing]
+    present = [table for name, table in TABLES.items() if name in existing]
+    results = await asyncio.gather(
+        *[_create_table(client, table) for table in missing],
+        *[_check_table(client, table) for table in present],
+    )
+    created = [table.name for table, was_created in zip(missing, results) if was_created]
+    for migration in (m for pending in results[len(missing):] for m in pending):
+        logger.warning(
+            f"Table '{migration['table']}' differs from the schema registry: {migration['action']} "
+            f"{migration['index'] or ''}. Run python -m app.utils.dynamodb_init --migrate."
         )
-        table.meta.client.get_waiter('table_exists').wait(TableName='events')
-        logging.info("Table 'events' created.")
-    except ClientError as e:
-        if e.response['Error']['Code'] == 'ResourceInUseException':
-            logging.info("Table 'events' already exists.")
-        else:
-            raise
+    logger.info(f"DynamoDB tables ready ({len(created)} created).")
+    if seed:
+        await seed_all_tables(db)
+    return created
+
+
+# --- Seed Data ---
+
+SEED_USERS = [
+    {'id': 1, 'first_name': 'Alice', 'last_name': 'Smith', 'email': 'alice@example.com', 'role': 'attendee', 'company': 'Acme Corp', 'job_title': 'Engineer', 'city': 'New York', 'state': 'NY', 'events_hosted': 2, 'events_attended': 5},
+    {'id': 2, 'first_name': 'Bob', 'last_name': 'Johnson', 'email': 'bob@example.com', 'role': 'host', 'company': 'Beta LLC', 'job_title': 'Manager', 'city': 'San Francisco', 'state': 'CA', 'events_hosted': 3, 'events_attended': 2},
+    {'id': 3, 'first_name': 'Carol', 'last_name': 'Williams', 'email': 'carol@example.com', 'role': 'attendee', 'company': 'Acme Corp', 'job_title': 'Designer', 'city': 'Boston', 'state': 'MA', 'events_hosted': 0, 'events_attended': 7},
+    {'id': 4, 'first_name': 'David', 'last_name': 'Brown', 'email': 'david@example.com', 'role': 'host', 'company': 'Delta Inc', 'job_title': 'Engineer', 'city': 'Austin', 'state': 'TX', 'events_hosted': 1, 'events_attended': 4},
+    {'id': 5, 'first_name': 'Eve', 'last_name': 'Davis', 'email': 'eve@example.com', 'role': 'attendee', 'company': 'Beta LLC', 'job_title': 'Manager', 'city': 'Seattle', 'state': 'WA', 'events_hosted': 0, 'events_attended': 3},
+    {'id': 6, 'first_name': 'Frank', 'last_name': 'Miller', 'email': 'frank@example.com', 'role': 'attendee', 'company': 'Gamma Co', 'job_title': 'Engineer', 'city': 'Denver', 'state': 'CO', 'events_hosted': 0, 'events_attended': 1},
+    {'id': 7, 'first_name': 'Grace', 'last_name': 'Wilson', 'email': 'grace@example.com', 'role': 'host', 'company': 'Acme Corp', 'job_title': 'Manager', 'city': 'Chicago', 'state': 'IL', 'events_hosted': 2, 'events_attended': 6},
+    {'id': 8, 'first_name': 'Hank', 'last_name': 'Moore', 'email': 'hank@example.com', 'role': 'attendee', 'company': 'Delta Inc', 'job_title': 'Designer', 'city': 'Miami', 'state': 'FL', 'events_hosted': 0, 'events_attended': 2},
+    {'id': 9, 'first_name': 'Ivy', 'last_name': 'Taylor', 'email': 'ivy@example.com', 'role': 'attendee', 'company': 'Gamma Co', 'job_title': 'Engineer', 'city': 'Portland', 'state': 'OR', 'events_hosted': 0, 'events_attended': 4},
+    {'id': 10, 'first_name': 'Jack', 'last_name': 'Anderson', 'email': 'jack@example.com', 'role': 'host', 'company': 'Acme Corp', 'job_title': 'Designer', 'city': 'Dallas', 'state': 'TX', 'events_hosted': 1, 'events_attended': 5},
+]
+
+# registered_count matches SEED_EVENT_REGISTRATIONS; event 3 is full
+SEED_EVENTS = [
+    {'id': 1, 'slug': 'event-1', 'title': 'First Event', 'owner_id': 2, 'start_at': '2025-07-21T10:00:00', 'end_at': '2025-07-21T12:00:00', 'start_month': '2025-07', 'registered_count': 2, 'max_capacity': 100},
+    {'id': 2, 'slug': 'event-2', 'title': 'Second Event', 'owner_id': 4, 'start_at': '2025-07-22T14:00:00', 'end_at': '2025-07-22T16:00:00', 'start_month': '2025-07', 'registered_count': 2, 'max_capacity': 50},
+    {'id': 3, 'slug': 'event-3', 'title': 'Design Meetup', 'owner_id': 10, 'start_at': '2025-08-01T09:00:00', 'end_at': '2025-08-01T11:00:00', 'start_month': '2025-08', 'registered_count': 2, 'max_capacity': 2},
+    {'id': 4, 'slug': 'event-4', 'title': 'Tech Talk', 'owner_id': 7, 'start_at': '2025-08-10T15:00:00', 'end_at': '2025-08-10T17:00:00', 'start_month': '2025-08', 'registered_count': 2, 'max_capacity': 200},
+    {'id': 5, 'slug': 'event-5', 'title': 'Manager Roundtable', 'owner_id': 5, 'start_at': '2025-08-15T13:00:00', 'end_at': '2025-08-15T15:00:00', 'start_month': '2025-08', 'registered_count': 2},
+]
+
+SEED_EVENT_REGISTRATIONS = [
+    # Ids follow registration_service.link_id
+    {'id': event_id * 10**12 + user_id, 'event_id': event_id, 'user_id': user_id}
+    for event_id, user_id in [
+        (1, 1),
+        (1, 3),
+        (2, 5),
+        (2, 6),
+        (3, 8),
+        (3, 9),
+        (4, 2),
+        (4, 4),
+        (5, 7),
+        (5, 10),
+    ]
+]
+
+SEED_EVENT_HOSTS = [
+    # Ids follow registration_service.link_id
+    {'id': event_id * 10**12 + user_id, 'event_id': event_id, 'user_id': user_id}
+    for event_id, user_id in [
+        (1, 2),
+        (1, 4),
+        (2, 4),
+        (2, 7),
+        (3, 10),
+        (3, 8),
+        (4, 7),
+        (4, 2),
+        (5, 5),
+        (5, 10),
+    ]
+]
 
-def create_event_registrations_table():
+SEED_DATA = {
+    'users': SEED_USERS,
+    'events': SEED_EVENTS,
+    'event_registrations': SEED_EVENT_REGISTRATIONS,
+    'event_hosts': SEED_EVENT_HOSTS,
+}
+
+
+async def seed_all_tables(db):
+    """
+    Put the seed items, all tables concurrently and 25 items per BatchWriteItem. Re-running
+    overwrites the same ids.
+    """
+    results = await asyncio.gather(
+        *[batch_write_items(db, table_name, items) for table_name, items in SEED_DATA.items()]
+    )
+    for table_name, failed in zip(SEED_DATA, results):
+        if failed:
+            logger.error(f"{len(failed)} seed items not written to '{table_name}'.")
+    logger.info(f"Seeded {', '.join(SEED_DATA)}.")
+
+
+async def _set_derived(table, item: Dict[str, Any], source: str, target: str, value: str) -> bool:
     try:
-        table = dynamodb.create_table(
-            TableName='event_registrations',
-            KeySchema=[
-                {'AttributeName': 'id', 'KeyType': 'HASH'},
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'id', 'AttributeType': 'N'},
-            ],
-            ProvisionedThroughput={
-                'ReadCapacityUnits': 5,
-                'WriteCapacityUnits': 5
-            }
+        await table.update_item(
+            Key={'id': item['id']},
+            UpdateExpression='SET #target = :value',
+            ConditionExpression=Attr(source).eq(item[source]),
+            ExpressionAttributeNames={'#target': target},
+            ExpressionAttributeValues={':value': value},
         )
-        table.meta.client.get_waiter('table_exists').wait(TableName='event_registrations')
-        logging.info("Table 'event_registrations' created.")
     except ClientError as e:
-        if e.response['Error']['Code'] == 'ResourceInUseException':
-            logging.info("Table 'event_registrations' already exists.")
-        else:
+        # The source changed after the scan read it; that write owns the derived value now
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
             raise
+        return False
+    return True
 
-def create_event_hosts_table():
-    try:
-        table = dynamodb.create_table(
-            TableName='event_hosts',
-            KeySchema=[
-                {'AttributeName': 'id', 'KeyType': 'HASH'},
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'id', 'AttributeType': 'N'},
-            ],
-            ProvisionedThroughput={
-                'ReadCapacityUnits': 5,
-                'WriteCapacityUnits': 5
-            }
+
+async def _backfill_derived(db, table_name: str, source: str, target: str, derive: Callable[[str], str]) -> int:
+    """
+    Set `target` = derive(`source`) on every item of `table_name` whose value is missing or
+    stale. Each update is conditional on the source value it was computed from. Returns the
+    number of items updated.
+    """
+    table = await db.Table(table_name)
+    scan_kwargs = {
+        'ProjectionExpression': '#id, #source, #target',
+        'ExpressionAttributeNames': {'#id': 'id', '#source': source, '#target': target},
+        'FilterExpression': Attr(source).exists(),
+    }
+    updated = 0
+    while True:
+        response = await table.scan(**scan_kwargs)
+        stale = [item for item in response.get('Items', []) if item.get(target) != derive(item[source])]
+        results = await asyncio.gather(
+            *[_set_derived(table, item, source, target, derive(item[source])) for item in stale]
         )
-        table.meta.client.get_waiter('table_exists').wait(TableName='event_hosts')
-        logging.info("Table 'event_hosts' created.")
-    except ClientError as e:
-        if e.response['Error']['Code'] == 'ResourceInUseException':
-            logging.info("Table 'event_hosts' already exists.")
-        else:
-            raise
+        updated += sum(results)
+        if not response.get('LastEvaluatedKey'):
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    logger.info(f"Backfilled {target} on {updated} items of '{table_name}'.")
+    return updated
 
-def init_dynamodb():
-    create_users_table()
-    create_events_table()
-    create_event_registrations_table()
-    create_event_hosts_table()
-    create_email_logs_table()
-    logging.info("DynamoDB tables initialized.")
-    seed_all_tables()
 
-# --- Seed Data ---
-def seed_all_tables():
-    # Users
-    users_table = dynamodb.Table('users')
-    users = [
-        {'id': 1, 'first_name': 'Alice', 'last_name': 'Smith', 'email': 'alice@example.com', 'role': 'attendee', 'company': 'Acme Corp', 'job_title': 'Engineer', 'city': 'New York', 'state': 'NY', 'events_hosted': 2, 'events_attended': 5},
-        {'id': 2, 'first_name': 'Bob', 'last_name': 'Johnson', 'email': 'bob@example.com', 'role': 'host', 'company': 'Beta LLC', 'job_title': 'Manager', 'city': 'San Francisco', 'state': 'CA', 'events_hosted': 3, 'events_attended': 2},
-        {'id': 3, 'first_name': 'Carol', 'last_name': 'Williams', 'email': 'carol@example.com', 'role': 'attendee', 'company': 'Acme Corp', 'job_title': 'Designer', 'city': 'Boston', 'state': 'MA', 'events_hosted': 0, 'events_attended': 7},
-        {'id': 4, 'first_name': 'David', 'last_name': 'Brown', 'email': 'david@example.com', 'role': 'host', 'company': 'Delta Inc', 'job_title': 'Engineer', 'city': 'Austin', 'state': 'TX', 'events_hosted': 1, 'events_attended': 4},
-        {'id': 5, 'first_name': 'Eve', 'last_name': 'Davis', 'email': 'eve@example.com', 'role': 'attendee', 'company': 'Beta LLC', 'job_title': 'Manager', 'city': 'Seattle', 'state': 'WA', 'events_hosted': 0, 'events_attended': 3},
-        {'id': 6, 'first_name': 'Frank', 'last_name': 'Miller', 'email': 'frank@example.com', 'role': 'attendee', 'company': 'Gamma Co', 'job_title': 'Engineer', 'city': 'Denver', 'state': 'CO', 'events_hosted': 0, 'events_attended': 1},
-        {'id': 7, 'first_name': 'Grace', 'last_name': 'Wilson', 'email': 'grace@example.com', 'role': 'host', 'company': 'Acme Corp', 'job_title': 'Manager', 'city': 'Chicago', 'state': 'IL', 'events_hosted': 2, 'events_attended': 6},
-        {'id': 8, 'first_name': 'Hank', 'last_name': 'Moore', 'email': 'hank@example.com', 'role': 'attendee', 'company': 'Delta Inc', 'job_title': 'Designer', 'city': 'Miami', 'state': 'FL', 'events_hosted': 0, 'events_attended': 2},
-        {'id': 9, 'first_name': 'Ivy', 'last_name': 'Taylor', 'email': 'ivy@example.com', 'role': 'attendee', 'company': 'Gamma Co', 'job_title': 'Engineer', 'city': 'Portland', 'state': 'OR', 'events_hosted': 0, 'events_attended': 4},
-        {'id': 10, 'first_name': 'Jack', 'last_name': 'Anderson', 'email': 'jack@example.com', 'role': 'host', 'company': 'Acme Corp', 'job_title': 'Designer', 'city': 'Dallas', 'state': 'TX', 'events_hosted': 1, 'events_attended': 5},
-    ]
-    for user in users:
-        users_table.put_item(Item=user)
-    logging.info("Seeded users table.")
-
-    # Events
-    events_table = dynamodb.Table('events')
-    events = [
-        {'id': 1, 'slug': 'event-1', 'title': 'First Event', 'owner_id': 2, 'start_at': '2025-07-21T10:00:00', 'end_at': '2025-07-21T12:00:00'},
-        {'id': 2, 'slug': 'event-2', 'title': 'Second Event', 'owner_id': 4, 'start_at': '2025-07-22T14:00:00', 'end_at': '2025-07-22T16:00:00'},
-        {'id': 3, 'slug': 'event-3', 'title': 'Design Meetup', 'owner_id': 10, 'start_at': '2025-08-01T09:00:00', 'end_at': '2025-08-01T11:00:00'},
-        {'id': 4, 'slug': 'event-4', 'title': 'Tech Talk', 'owner_id': 7, 'start_at': '2025-08-10T15:00:00', 'end_at': '2025-08-10T17:00:00'},
-        {'id': 5, 'slug': 'event-5', 'title': 'Manager Roundtable', 'owner_id': 5, 'start_at': '2025-08-15T13:00:00', 'end_at': '2025-08-15T15:00:00'},
-    ]
-    for event in events:
-        events_table.put_item(Item=event)
-    logging.info("Seeded events table.")
-
-    # Event Registrations
-    registrations_table = dynamodb.Table('event_registrations')
-    registrations = [
-        {'id': 1, 'user_id': 1, 'event_id': 1},
-        {'id': 2, 'user_id': 3, 'event_id': 1},
-        {'id': 3, 'user_id': 5, 'event_id': 2},
-        {'id': 4, 'user_id': 6, 'event_id': 2},
-        {'id': 5, 'user_id': 8, 'event_id': 3},
-        {'id': 6, 'user_id': 9, 'event_id': 3},
-        {'id': 7, 'user_id': 2, 'event_id': 4},
-        {'id': 8, 'user_id': 4, 'event_id': 4},
-        {'id': 9, 'user_id': 7, 'event_id': 5},
-        {'id': 10, 'user_id': 10, 'event_id': 5},
-    ]
-    for reg in registrations:
-        registrations_table.put_item(Item=reg)
-    logging.info("Seeded event_registrations table.")
-
-    # Event Hosts
-    hosts_table = dynamodb.Table('event_hosts')
-    hosts = [
-        {'id': 1, 'event_id': 1, 'user_id': 2},
-        {'id': 2, 'event_id': 1, 'user_id': 4},
-        {'id': 3, 'event_id': 2, 'user_id': 4},
-        {'id': 4, 'event_id': 2, 'user_id': 7},
-        {'id': 5, 'event_id': 3, 'user_id': 10},
-        {'id': 6, 'event_id': 3, 'user_id': 8},
-        {'id': 7, 'event_id': 4, 'user_id': 7},
-        {'id': 8, 'event_id': 4, 'user_id': 2},
-        {'id': 9, 'event_id': 5, 'user_id': 5},
-        {'id': 10, 'event_id': 5, 'user_id': 10},
-    ]
-    for host in hosts:
-        hosts_table.put_item(Item=host)
-    logging.info("Seeded event_hosts table.")
+async def backfill_start_month(db) -> int:
+    """
+    Set `start_month` on events written before the start_month-start_at-index existed (or
+    whose value does not match start_at), so they show up in /events listings.
+    """
+    return await _backfill_derived(db, EVENTS_TABLE, 'start_at', 'start_month', start_month)
+
+
+async def backfill_created_bucket(db) -> int:
+    """
+    Set `created_bucket` on email logs written before the created_bucket-created_at-index
+    existed, so /email/logs time ranges include them.
+    """
+    return await _backfill_derived(db, EMAIL_LOGS_TABLE, 'created_at', 'created_bucket', created_bucket)
+
+
+async def _count_registrations(links, event_id: int) -> int:
+    query_kwargs = {
+        'IndexName': 'event_id-user_id-index',
+        'KeyConditionExpression': Key('event_id').eq(event_id),
+        'Select': 'COUNT',
+    }
+    count = 0
+    while True:
+        response = await links.query(**query_kwargs)
+        count += int(response.get('Count', 0))
+        if not response.get('LastEvaluatedKey'):
+            return count
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+async def _set_registered_count(events, links, event: Dict[str, Any]) -> bool:
+    """
+    Set one event's registered_count to its number of registrations. The update is conditional
+    on the count read before counting, so a registration or cancellation in between (which
+    changes both) makes it count again.
+    """
+    for _ in range(BACKFILL_MAX_RETRIES):
+        count = await _count_registrations(links, event['id'])
+        current = event.get('registered_count')
+        if current is not None and int(current) == count:
+            return False
+        try:
+            await events.update_item(
+                Key={'id': event['id']},
+                UpdateExpression='SET registered_count = :count',
+                ConditionExpression=(
+                    Attr('registered_count').not_exists() if current is None else Attr('registered_count').eq(current)
+                ),
+                ExpressionAttributeValues={':count': count},
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+        response = await events.get_item(Key={'id': event['id']}, ConsistentRead=True)
+        event = response.get('Item', event)
+    logger.warning(f"registered_count of event {event['id']} kept changing; re-run the backfill.")
+    return False
+
+
+async def backfill_registered_count(db) -> int:
+    """
+    Set every event's registered_count to the number of its event_registrations, so events
+    registered for before capacity tracking can be given a max_capacity without overselling.
+    Returns the number of events updated.
+    """
+    events = await db.Table(EVENTS_TABLE)
+    links = await db.Table('event_registrations')
+    scan_kwargs = {'ProjectionExpression': '#id, registered_count', 'ExpressionAttributeNames': {'#id': 'id'}}
+    updated = 0
+    while True:
+        response = await events.scan(**scan_kwargs)
+        results = await asyncio.gather(
+            *[_set_registered_count(events, links, event) for event in response.get('Items', [])]
+        )
+        updated += sum(results)
+        if not response.get('LastEvaluatedKey'):
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    logger.info(f"Backfilled registered_count on {updated} events.")
+    return updated
+
 
 # FastAPI event hook
 
 def register_dynamodb_init(app: FastAPI):
     @app.on_event("startup")
     async def startup_event():
-        init_dynamodb()
+        if DYNAMODB_INIT_TABLES:
+            await init_dynamodb(await init_db(), seed=DYNAMODB_SEED)
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create missing DynamoDB tables and migrate existing ones.")
+    parser.add_argument("--seed", action="store_true", help="write the seed data")
+    parser.add_argument("--migrate", action="store_true", help="add missing GSIs and apply billing changes")
+    parser.add_argument("--drop-indexes", action="store_true", help="with --migrate, also delete or rebuild changed GSIs")
+    parser.add_argument("--plan", action="store_true", help="print the pending migrations and exit")
+    parser.add_argument("--no-wait", action="store_true", help="do not wait for GSI backfills to finish")
+    parser.add_argument("--backfill-start-month", action="store_true", help="set start_month on events that lack it")
+    parser.add_argument("--backfill-created-bucket", action="store_true", help="set created_bucket on email logs that lack it")
+    parser.add_argument("--backfill-registered-count", action="store_true", help="count each event's registrations into registered_count")
+    args = parser.parse_args(argv)
+    try:
+        db = await init_db()
+        if args.plan:
+            for migration in await plan_migrations(db.meta.client):
+                print(f"{migration['table']}: {migration['action']} {migration['index'] or ''}".rstrip())
+            return
+        await init_dynamodb(db, seed=args.seed)
+        if args.migrate:
+            applied = await apply_migrations(
+                db.meta.client,
+                await plan_migrations(db.meta.client),
+                drop_indexes=args.drop_indexes,
+                wait=not args.no_wait,
+            )
+            logger.info(f"Applied {len(applied)} migrations.")
+        if args.backfill_start_month:
+            await backfill_start_month(db)
+        if args.backfill_created_bucket:
+            await backfill_created_bucket(db)
+        if args.backfill_registered_count:
+            await backfill_registered_count(db)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,227 @@
+# Paging helpers shared by the DynamoDB-backed services
+import asyncio
+import time
+from decimal import Decimal
+from typing import Any, Dict, Sequence
+
+# Per-segment resume markers stored in scan cursors (any other value is a LastEvaluatedKey)
+SEGMENT_START = "start"
+SEGMENT_DONE = "done"
+
+
+def valid_scan_positions(positions: Any, total_segments: int, key_attrs: Sequence[str]) -> bool:
+    """
+    Check scan cursor positions from a client: exactly one resume marker per segment, each
+    SEGMENT_START, SEGMENT_DONE or a key made of `key_attrs`. The list length becomes
+    TotalSegments, so it must never be taken from the client as is.
+    """
+    if not isinstance(positions, list) or len(positions) != total_segments:
+        return False
+    for position in positions:
+        if position in (SEGMENT_START, SEGMENT_DONE):
+            continue
+        if not isinstance(position, dict) or set(position) != set(key_attrs):
+            return False
+        if any(isinstance(value, bool) or not isinstance(value, (str, int, float)) for value in position.values()):
+            return False
+    return True
+
+
+def valid_start_key(key: Any, key_attrs: Sequence[str], numeric: Sequence[str] = (), fixed: Dict[str, Any] = None) -> bool:
+    """
+    Check a key from a client cursor before it becomes an ExclusiveStartKey: exactly
+    `key_attrs`, numbers for the `numeric` ones and strings for the rest, and the `fixed`
+    values (the partition being queried) unchanged. DynamoDB rejects any other start key with
+    a ValidationException.
+    """
+    if not isinstance(key, dict) or set(key) != set(key_attrs):
+        return False
+    for attr, value in key.items():
+        if attr in numeric:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return False
+        elif not isinstance(value, str):
+            return False
+    return all(key[attr] == value for attr, value in (fixed or {}).items())
+
+
+class ReadBudget:
+    """
+    Tracks the read capacity and wall time spent while filling one page.
+    """
+
+    def __init__(self, max_capacity_units: float, max_seconds: float):
+        self.max_capacity_units = max_capacity_units
+        self.deadline = time.monotonic() + max_seconds
+        self.capacity_units = 0.0
+
+    def charge(self, response: Dict[str, Any]):
+        consumed = response.get("ConsumedCapacity") or {}
+        self.capacity_units += float(consumed.get("CapacityUnits", 0))
+
+    @property
+    def exhausted(self) -> bool:
+        return self.capacity_units >= self.max_capacity_units or time.monotonic() >= self.deadline
+
+
+def plain_numbers(value):
+    """
+    Convert the Decimals DynamoDB returns to int (or float for fractions), recursively.
+    """
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, dict):
+        return {k: plain_numbers(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [plain_numbers(v) for v in value]
+    return value
+
+
+def projection_kwargs(fields: Sequence[str], required: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    ProjectionExpression reading `fields` plus the `required` attributes (keys the caller needs
+    for cursors or sorting), with every name escaped through ExpressionAttributeNames.
+    """
+    attrs = list(dict.fromkeys(list(fields) + list(required)))
+    return {
+        "ProjectionExpression": ", ".join(f"#p{i}" for i in range(len(attrs))),
+        "ExpressionAttributeNames": {f"#p{i}": attr for i, attr in enumerate(attrs)},
+    }
+
+
+def item_key(item: Dict[str, Any], key_attrs: Sequence[str]) -> Dict[str, Any]:
+    return {attr: item[attr] for attr in key_attrs}
+
+
+async def segmented_scan(table, scan_kwargs, limit, positions, key_attrs=("id",), page_size=None, budget: ReadBudget = None):
+    """
+    Scan every segment in `positions` in parallel, continuing page by page until `limit`
+    items are collected, all segments are exhausted or the read budget runs out.
+
+    `positions` holds one resume marker per segment: SEGMENT_START, SEGMENT_DONE or the key to
+    resume after. When a page is only partly consumed, the segment resumes after the last item
+    taken, so the returned positions continue every segment exactly where this page stopped.
+    Returns (items, positions).
+    """
+    total_segments = len(positions)
+    positions = list(positions)
+    items = []
+
+    async def scan_segment(segment, position, page_limit):
+        segment_kwargs = dict(scan_kwargs)
+        segment_kwargs["Limit"] = page_limit
+        segment_kwargs["ReturnConsumedCapacity"] = "TOTAL"
+        if total_segments > 1:
+            segment_kwargs["Segment"] = segment
+            segment_kwargs["TotalSegments"] = total_segments
+        if position != SEGMENT_START:
+            segment_kwargs["ExclusiveStartKey"] = position
+        return await table.scan(**segment_kwargs)
+
+    while len(items) < limit:
+        active = [seg for seg, pos in enumerate(positions) if pos != SEGMENT_DONE]
+        if not active:
+            break
+        # Unfiltered pages return exactly what they evaluate, so split the remainder evenly.
+        page_limit = page_size or -(-(limit - len(items)) // len(active))
+        responses = await asyncio.gather(
+            *[scan_segment(seg, positions[seg], page_limit) for seg in active]
+        )
+        for segment, response in zip(active, responses):
+            if budget:
+                budget.charge(response)
+            room = limit - len(items)
+            if room <= 0:
+                # Page is discarded; the segment keeps its old position and is re-read next time.
+                break
+            page = response.get("Items", [])
+            if len(page) > room:
+                items.extend(page[:room])
+                positions[segment] = item_key(page[room - 1], key_attrs)
+            else:
+                items.extend(page)
+                positions[segment] = response.get("LastEvaluatedKey") or SEGMENT_DONE
+        if budget and budget.exhausted:
+            break
+    return items, positions
+
+
+async def query_until_full(table, query_kwargs, limit, key_attrs, start_key=None, page_size=None, budget: ReadBudget = None):
+    """
+    Query page by page until `limit` items match, the partition is exhausted or the read budget
+    runs out. Returns (items, resume key or None); a partly consumed page resumes after the last
+    item taken, which requires `key_attrs` to hold the index and table key attributes.
+    """
+    items = []
+    while len(items) < limit:
+        kwargs = dict(query_kwargs)
+        kwargs["Limit"] = page_size or (limit - len(items))
+        kwargs["ReturnConsumedCapacity"] = "TOTAL"
+        if start_key:
+            kwargs["ExclusiveStartKey"] = start_key
+        response = await table.query(**kwargs)
+        if budget:
+            budget.charge(response)
+        page = response.get("Items", [])
+        room = limit - len(items)
+        if len(page) > room:
+            items.extend(page[:room])
+            return items, item_key(page[room - 1], key_attrs)
+        items.extend(page)
+        start_key = response.get("LastEvaluatedKey")
+        if not start_key or (budget and budget.exhausted):
+            break
+    return items, start_key
+
+
+async def query_buckets(
+    table,
+    buckets: Sequence[str],
+    bucket_kwargs,
+    limit,
+    key_attrs,
+    position=0,
+    start_key=None,
+    fanout=8,
+    page_size=None,
+    budget: ReadBudget = None,
+):
+    """
+    Read an ordered stream spread over disjoint, ordered partitions (time buckets): Query
+    `fanout` buckets at a time in parallel and append each bucket's items in bucket order.
+    `bucket_kwargs(bucket)` returns the Query arguments for one bucket; reading starts at
+    `buckets[position]` after `start_key`. Returns (items, None) when every bucket is read, or
+    (items, (bucket, resume key or None)) to continue from.
+    """
+    items = []
+    while position < len(buckets):
+        window = buckets[position:position + fanout]
+        results = await asyncio.gather(*[
+            query_until_full(
+                table,
+                bucket_kwargs(bucket),
+                limit - len(items),
+                key_attrs,
+                start_key=start_key if i == 0 else None,
+                page_size=page_size,
+                budget=budget,
+            )
+            for i, bucket in enumerate(window)
+        ])
+        for i, (bucket, (page, last_key)) in enumerate(zip(window, results)):
+            room = limit - len(items)
+            if room <= 0:
+                # Page is full; this bucket is re-read from where it started next time
+                return items, (bucket, start_key if i == 0 else None)
+            if len(page) > room:
+                items.extend(page[:room])
+                return items, (bucket, item_key(page[room - 1], key_attrs))
+            items.extend(page)
+            if last_key:
+                # The bucket stopped early (page full or read budget spent)
+                return items, (bucket, last_key)
+        position += len(window)
+        start_key = None
+        if budget and budget.exhausted and position < len(buckets):
+            return items, (buckets[position], None)
+    return items, None
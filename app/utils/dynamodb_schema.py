@@ -0,0 +1,325 @@
+# Declarative registry of the DynamoDB tables and GSIs, and the migrations that bring live
+# tables in line with it. Table creation (dynamodb_init) and index migrations are both
+# generated from TABLES; add or change an index here, never by hand.
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from app.utils.logger import logger
+
+# Polling of tables and indexes while they are created or backfilled
+DYNAMODB_TABLE_WAIT_DELAY = float(os.getenv("DYNAMODB_TABLE_WAIT_DELAY", "1"))
+DYNAMODB_TABLE_WAIT_ATTEMPTS = int(os.getenv("DYNAMODB_TABLE_WAIT_ATTEMPTS", "60"))
+# GSI backfills scan the whole table, so they get a much longer wait
+DYNAMODB_INDEX_WAIT_SECONDS = float(os.getenv("DYNAMODB_INDEX_WAIT_SECONDS", "3600"))
+
+DEFAULT_THROUGHPUT = (5, 5)
+
+
+@dataclass(frozen=True)
+class Index:
+    """
+    A global secondary index. The name defaults to "<hash>-<range>-index".
+    `projection` is ALL, KEYS_ONLY or INCLUDE (with `non_key_attributes`).
+    """
+    hash_key: str
+    range_key: Optional[str] = None
+    name: Optional[str] = None
+    projection: str = "ALL"
+    non_key_attributes: Tuple[str, ...] = ()
+
+    @property
+    def index_name(self) -> str:
+        return self.name or "-".join(k for k in (self.hash_key, self.range_key) if k) + "-index"
+
+    @property
+    def key_attrs(self) -> Tuple[str, ...]:
+        return (self.hash_key,) + ((self.range_key,) if self.range_key else ())
+
+
+@dataclass(frozen=True)
+class Table:
+    """
+    A table definition. `attributes` maps every key attribute of the table and its indexes to
+    its DynamoDB type (S, N or B). `billing_mode` is PROVISIONED (with `throughput`, applied to
+    the indexes too) or PAY_PER_REQUEST.
+    """
+    name: str
+    attributes: Dict[str, str]
+    hash_key: str = "id"
+    range_key: Optional[str] = None
+    indexes: Tuple[Index, ...] = ()
+    billing_mode: str = "PROVISIONED"
+    throughput: Tuple[int, int] = DEFAULT_THROUGHPUT
+
+    def index(self, name: str) -> Index:
+        for index in self.indexes:
+            if index.index_name == name:
+                return index
+        raise KeyError(f"{self.name} has no index {name}")
+
+
+TABLES: Dict[str, Table] = {
+    table.name: table
+    for table in [
+        Table(
+            "users",
+            {
+                "id": "N", "company": "S", "job_title": "S", "state": "S", "city": "S",
+                "events_attended": "N", "events_hosted": "N",
+            },
+            indexes=(
+                Index("company", "job_title"),
+                Index("job_title", "company"),
+                Index("state", "city"),
+                Index("state", "events_attended"),
+                Index("state", "events_hosted"),
+            ),
+        ),
+        Table(
+            "events",
+            {"id": "N", "slug": "S", "start_month": "S", "start_at": "S"},
+            indexes=(
+                Index("slug"),
+                # Month buckets: a date range is a few single-partition Queries
+                Index("start_month", "start_at"),
+            ),
+        ),
+        # Link tables: attendees/hosts of an event, and events of a user, are single-partition Queries
+        Table(
+            "event_registrations",
+            {"id": "N", "event_id": "N", "user_id": "N"},
+            indexes=(Index("event_id", "user_id"), Index("user_id", "event_id")),
+        ),
+        Table(
+            "event_hosts",
+            {"id": "N", "event_id": "N", "user_id": "N"},
+            indexes=(Index("event_id", "user_id"), Index("user_id", "event_id")),
+        ),
+        # Users waiting for a seat at a full event, promoted in arrival order
+        Table(
+            "event_waitlist",
+            {"id": "N", "event_id": "N", "created_at": "S"},
+            indexes=(Index("event_id", "created_at"),),
+        ),
+        Table(
+            "email_logs",
+            {"id": "S", "recipient": "S", "status": "S", "created_at": "S", "created_bucket": "S"},
+            indexes=(
+                Index("recipient", "status"),
+                # Hour buckets keep time ranges to a handful of Queries
+                Index("created_bucket", "created_at"),
+            ),
+        ),
+        Table(
+            "email_jobs",
+            {"id": "S", "status": "S", "created_at": "S", "lease_expires_at": "S"},
+            indexes=(
+                Index("status", "created_at"),
+                # Running jobs by lease expiry: abandoned jobs are a bounded key-condition Query
+                Index("status", "lease_expires_at", projection="KEYS_ONLY"),
+            ),
+        ),
+        Table("email_stats", {"id": "S"}),
+    ]
+}
+
+
+# --- Request generation ---
+
+def _key_schema(hash_key: str, range_key: Optional[str]) -> List[Dict[str, str]]:
+    schema = [{"AttributeName": hash_key, "KeyType": "HASH"}]
+    if range_key:
+        schema.append({"AttributeName": range_key, "KeyType": "RANGE"})
+    return schema
+
+
+def _throughput(table: Table) -> Dict[str, int]:
+    read, write = table.throughput
+    return {"ReadCapacityUnits": read, "WriteCapacityUnits": write}
+
+
+def _projection(index: Index) -> Dict[str, Any]:
+    projection = {"ProjectionType": index.projection}
+    if index.projection == "INCLUDE":
+        projection["NonKeyAttributes"] = list(index.non_key_attributes)
+    return projection
+
+
+def _index_definition(table: Table, index: Index) -> Dict[str, Any]:
+    definition = {
+        "IndexName": index.index_name,
+        "KeySchema": _key_schema(index.hash_key, index.range_key),
+        "Projection": _projection(index),
+    }
+    if table.billing_mode == "PROVISIONED":
+        definition["ProvisionedThroughput"] = _throughput(table)
+    return definition
+
+
+def _attribute_definitions(table: Table, attrs) -> List[Dict[str, str]]:
+    return [{"AttributeName": attr, "AttributeType": table.attributes[attr]} for attr in dict.fromkeys(attrs)]
+
+
+def create_table_kwargs(table: Table) -> Dict[str, Any]:
+    """
+    CreateTable arguments for `table`, declaring only the attributes used by its keys.
+    """
+    key_attrs = [table.hash_key] + ([table.range_key] if table.range_key else [])
+    kwargs = {
+        "TableName": table.name,
+        "KeySchema": _key_schema(table.hash_key, table.range_key),
+        "AttributeDefinitions": _attribute_definitions(
+            table, key_attrs + [attr for index in table.indexes for attr in index.key_attrs]
+        ),
+        "BillingMode": table.billing_mode,
+    }
+    if table.billing_mode == "PROVISIONED":
+        kwargs["ProvisionedThroughput"] = _throughput(table)
+    if table.indexes:
+        kwargs["GlobalSecondaryIndexes"] = [_index_definition(table, index) for index in table.indexes]
+    return kwargs
+
+
+# --- Diffing against describe_table ---
+
+def _described_keys(key_schema) -> Tuple[Optional[str], Optional[str]]:
+    by_type = {k["KeyType"]: k["AttributeName"] for k in key_schema or []}
+    return by_type.get("HASH"), by_type.get("RANGE")
+
+
+def _described_projection(index: Dict[str, Any]) -> Tuple[str, Tuple[str, ...]]:
+    projection = index.get("Projection") or {"ProjectionType": "ALL"}
+    return projection.get("ProjectionType", "ALL"), tuple(sorted(projection.get("NonKeyAttributes", [])))
+
+
+def diff_table(table: Table, description: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Migrations that bring a live table (the "Table" of a describe_table response) in line with
+    `table`, in the order they must run. Each one is {"action", "table", "index", "update"},
+    where "update" holds the UpdateTable arguments. Index changes are a delete followed by a
+    create, since DynamoDB cannot alter a GSI. A table whose own key differs cannot be migrated
+    online and raises ValueError.
+    """
+    if _described_keys(description.get("KeySchema")) != (table.hash_key, table.range_key):
+        raise ValueError(f"Table {table.name} has a different key schema; it must be recreated.")
+    live = {index["IndexName"]: index for index in description.get("GlobalSecondaryIndexes", [])}
+    wanted = {index.index_name: index for index in table.indexes}
+    migrations = []
+
+    def migration(action, index_name, update):
+        migrations.append({"action": action, "table": table.name, "index": index_name, "update": update})
+
+    for name, index in live.items():
+        target = wanted.get(name)
+        if target is not None and (
+            _described_keys(index.get("KeySchema")) == (target.hash_key, target.range_key)
+            and _described_projection(index) == (target.projection, tuple(sorted(target.non_key_attributes)))
+        ):
+            continue
+        migration("delete_index", name, {
+            "TableName": table.name,
+            "GlobalSecondaryIndexUpdates": [{"Delete": {"IndexName": name}}],
+        })
+    for name, index in wanted.items():
+        if name in live and not any(m["index"] == name for m in migrations):
+            continue
+        migration("create_index", name, {
+            "TableName": table.name,
+            "AttributeDefinitions": _attribute_definitions(table, index.key_attrs),
+            "GlobalSecondaryIndexUpdates": [{"Create": _index_definition(table, index)}],
+        })
+    live_billing = (description.get("BillingModeSummary") or {}).get("BillingMode", "PROVISIONED")
+    if live_billing != table.billing_mode:
+        update = {"TableName": table.name, "BillingMode": table.billing_mode}
+        if table.billing_mode == "PROVISIONED":
+            update["ProvisionedThroughput"] = _throughput(table)
+            index_updates = [
+                {"Update": {"IndexName": index.index_name, "ProvisionedThroughput": _throughput(table)}}
+                for index in table.indexes if index.index_name in live
+            ]
+            if index_updates:
+                update["GlobalSecondaryIndexUpdates"] = index_updates
+        migration("update_billing", None, update)
+    return migrations
+
+
+async def plan_migrations(client, tables: Dict[str, Table] = None) -> List[Dict[str, Any]]:
+    """
+    Describe every registered table that exists and return the migrations it needs.
+    Tables that do not exist yet are left to dynamodb_init, which creates them whole.
+    """
+    tables = TABLES if tables is None else tables
+
+    async def describe(name):
+        try:
+            return (await client.describe_table(TableName=name))["Table"]
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ResourceNotFoundException":
+                return None
+            raise
+
+    descriptions = await asyncio.gather(*[describe(name) for name in tables])
+    return [
+        migration
+        for table, description in zip(tables.values(), descriptions)
+        if description is not None
+        for migration in diff_table(table, description)
+    ]
+
+
+# --- Applying migrations ---
+
+async def wait_until_ready(client, table_name: str, timeout: float = None):
+    """
+    Poll describe_table until the table and all of its indexes are ACTIVE
+    (a new GSI stays CREATING while DynamoDB backfills it from the table).
+    """
+    timeout = DYNAMODB_INDEX_WAIT_SECONDS if timeout is None else timeout
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        description = (await client.describe_table(TableName=table_name))["Table"]
+        statuses = [description.get("TableStatus")] + [
+            index.get("IndexStatus") for index in description.get("GlobalSecondaryIndexes", [])
+        ]
+        if all(status == "ACTIVE" for status in statuses):
+            return
+        if asyncio.get_running_loop().time() >= deadline:
+            raise TimeoutError(f"Table {table_name} not ready after {timeout}s: {statuses}")
+        await asyncio.sleep(DYNAMODB_TABLE_WAIT_DELAY)
+
+
+async def apply_migrations(client, migrations: List[Dict[str, Any]], drop_indexes: bool = False, wait: bool = True) -> List[Dict[str, Any]]:
+    """
+    Run migrations online: each table's migrations one UpdateTable at a time (DynamoDB allows
+    one GSI create or delete per call), different tables in parallel. Index deletions are
+    skipped unless `drop_indexes` is set, since a running older release may still query them;
+    changing an index therefore needs `drop_indexes` too. Returns the migrations applied.
+    """
+    by_table: Dict[str, List[Dict[str, Any]]] = {}
+    for migration in migrations:
+        by_table.setdefault(migration["table"], []).append(migration)
+
+    async def migrate(table_name, pending):
+        applied = []
+        for migration in pending:
+            if migration["action"] == "delete_index" and not drop_indexes:
+                logger.warning(f"Keeping index {migration['index']} on {table_name}; pass drop_indexes to remove it.")
+                continue
+            if migration["action"] == "create_index" and any(
+                m["action"] == "delete_index" and m["index"] == migration["index"] for m in pending
+            ) and not drop_indexes:
+                continue
+            await wait_until_ready(client, table_name)
+            logger.info(f"Migrating {table_name}: {migration['action']} {migration['index'] or ''}".rstrip())
+            await client.update_table(**migration["update"])
+            applied.append(migration)
+        if applied and wait:
+            await wait_until_ready(client, table_name)
+        return applied
+
+    results = await asyncio.gather(*[migrate(name, pending) for name, pending in by_table.items()])
+    return [migration for applied in results for migration in applied]
@@ -1,60 +1,288 @@
 # Email sending utility
+import asyncio
+import os
 import random
 import smtplib
 import uuid
+from collections import Counter, defaultdict
 from datetime import datetime
 from email.mime.text import MIMEText
-from typing import List
-
-from fastapi import BackgroundTasks
+from typing import Any, AsyncIterable, Dict, Iterable, List, Union
 
+from app.utils.dynamodb_batch import BATCH_WRITE_MAX_ITEMS, batch_write_items
 from app.utils.logger import logger
+from app.utils.rate_limit import TokenBucket
+
+EMAIL_LOGS_TABLE = "email_logs"
+# Logs are indexed by the hour they were created in (created_bucket-created_at-index)
+EMAIL_LOGS_TIME_INDEX = "created_bucket-created_at-index"
+EMAIL_STATS_TABLE = "email_stats"
+# Delivery counters are applied to email_stats after this many finished sends
+EMAIL_STATS_FLUSH_SIZE = int(os.getenv("EMAIL_STATS_FLUSH_SIZE", "25"))
+# Prefix of the per-error counters on a stats item; the suffix is an error code, never a
+# provider message, so the number of attributes on a stats item stays bounded
+EMAIL_STATS_ERROR_PREFIX = "error:"
+EMAIL_ERROR_CODES = ("bounced", "rejected", "throttled", "timeout", "provider_error")
+
+# Dispatch tuning: concurrent sends, provider quota (sends/second) and retries per recipient
+EMAIL_SEND_CONCURRENCY = int(os.getenv("EMAIL_SEND_CONCURRENCY", "10"))
+EMAIL_SEND_RATE = float(os.getenv("EMAIL_SEND_RATE", "14"))
+EMAIL_SEND_BURST = float(os.getenv("EMAIL_SEND_BURST", str(max(EMAIL_SEND_RATE, 1))))
+EMAIL_SEND_MAX_ATTEMPTS = int(os.getenv("EMAIL_SEND_MAX_ATTEMPTS", "3"))
+EMAIL_SEND_RETRY_BASE_DELAY = float(os.getenv("EMAIL_SEND_RETRY_BASE_DELAY", "0.5"))
+
+# The provider quota is per account, so every dispatcher in the process shares one bucket.
+# The bucket is per process: with N consumer processes (every API worker runs one unless
+# EMAIL_JOB_CONSUMER_ENABLED=false) the account sees up to N x EMAIL_SEND_RATE, so set it
+# to the quota divided by the number of consumer processes.
+send_rate_limiter = TokenBucket(EMAIL_SEND_RATE, EMAIL_SEND_BURST)
+
+
+class EmailLogBuffer:
+    """
+    Buffers email log records and flushes them to DynamoDB with BatchWriteItem.
+    """
+
+    def __init__(self, db, table_name: str = EMAIL_LOGS_TABLE, flush_size: int = BATCH_WRITE_MAX_ITEMS):
+        self.db = db
+        self.table_name = table_name
+        self.flush_size = flush_size
+        self.records: List[Dict[str, Any]] = []
+
+    async def add(self, record: Dict[str, Any]):
+        self.records.append(record)
+        if len(self.records) >= self.flush_size:
+            await self.flush()
+
+    async def flush(self):
+        if not self.records:
+            return
+        records, self.records = self.records, []
+        failed = await batch_write_items(self.db, self.table_name, records)
+        if failed:
+            logger.error(f"Failed to write {len(failed)} email logs")
+
+
+def campaign_stats_id(campaign_id: str) -> str:
+    return f"campaign#{campaign_id}"
+
+
+def daily_stats_id(day: str) -> str:
+    return f"day#{day}"
+
+
+class EmailStatsRecorder:
+    """
+    Accumulates delivery counter deltas in memory and applies them to the email_stats table
+    with atomic ADD updates, so readers get totals from a single GetItem.
+
+    The campaign item counts pending/sent/failed; the daily item (keyed by the day a send
+    finished) counts sent/failed. Failures are also counted per error code (one of
+    EMAIL_ERROR_CODES, see email_error_code), so the number of counter attributes stays bounded.
+    """
+
+    def __init__(self, db, campaign_id: str = None, table_name: str = EMAIL_STATS_TABLE, flush_size: int = None):
+        self.db = db
+        self.campaign_id = campaign_id
+        self.table_name = table_name
+        self.flush_size = flush_size or EMAIL_STATS_FLUSH_SIZE
+        self.deltas: Dict[str, Counter] = defaultdict(Counter)
+        self.unflushed = 0
+
+    def queued(self):
+        if self.campaign_id:
+            self.deltas[campaign_stats_id(self.campaign_id)]["pending"] += 1
+
+    async def finished(self, email_log: Dict[str, Any]):
+        status = email_log['status']
+        finished_at = email_log.get('sent_at') or email_log.get('failed_at') or email_log['created_at']
+        stats_ids = [daily_stats_id(finished_at[:10])]
+        if self.campaign_id:
+            stats_ids.append(campaign_stats_id(self.campaign_id))
+            self.deltas[stats_ids[-1]]["pending"] -= 1
+        for stats_id in stats_ids:
+            self.deltas[stats_id][status] += 1
+            if status == 'failed':
+                self.deltas[stats_id][EMAIL_STATS_ERROR_PREFIX + email_log.get('error_code', 'unknown')] += 1
+        self.unflushed += 1
+        if self.unflushed >= self.flush_size:
+            await self.flush()
 
+    async def _apply(self, table, stats_id: str, counts: Counter):
+        counts = {attr: n for attr, n in counts.items() if n}
+        if not counts:
+            return
+        names = {f"#c{i}": attr for i, attr in enumerate(counts)}
+        values = {f":c{i}": n for i, n in enumerate(counts.values())}
+        values[":now"] = datetime.now().isoformat()
+        await table.update_item(
+            Key={'id': stats_id},
+            UpdateExpression="ADD " + ", ".join(f"#c{i} :c{i}" for i in range(len(counts))) + " SET updated_at = :now",
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+        )
 
-def send_email(
-    background_tasks: BackgroundTasks,
-    subject: str,
-    body: str,
-    recipients: List[str],
-    db,  # DynamoDB resource
-):
-    async def send():
-        table = await db.Table("email_logs")
-        for recipient in recipients:
-            email_id = str(uuid.uuid4())
-            email_log = {
-                'id': email_id,
-                'recipient': recipient,
-                'subject': subject,
-                'body': body,
-                'status': 'pending',
-                'created_at': datetime.now().isoformat(),
-            }
-            await table.put_item(Item=email_log)
+    async def flush(self):
+        if not self.deltas:
+            return
+        deltas, self.deltas = self.deltas, defaultdict(Counter)
+        self.unflushed = 0
+        try:
+            table = await self.db.Table(self.table_name)
+            await asyncio.gather(*[self._apply(table, stats_id, counts) for stats_id, counts in deltas.items()])
+        except Exception as e:
+            # Counters are best effort; a failed update must not fail the send
+            logger.error(f"Failed to update email stats: {str(e)}")
+
+
+def created_bucket(created_at: str) -> str:
+    """
+    Hour bucket of an ISO timestamp, e.g. "2025-07-22T08".
+    """
+    return created_at[:13]
+
+
+def build_email_log(recipient: str, subject: str, body: str, created_at: str = None) -> Dict[str, Any]:
+    created_at = created_at or datetime.now().isoformat()
+    return {
+        'id': str(uuid.uuid4()),
+        'recipient': recipient,
+        'subject': subject,
+        'body': body,
+        'status': 'pending',
+        'created_at': created_at,
+        'created_bucket': created_bucket(created_at),
+    }
+
+
+class EmailDeliveryError(Exception):
+    """
+    A failed send, classified with one of EMAIL_ERROR_CODES.
+    """
+
+    def __init__(self, message: str, code: str = "provider_error"):
+        super().__init__(message)
+        self.code = code if code in EMAIL_ERROR_CODES else "provider_error"
+
+
+def email_error_code(error: Exception) -> str:
+    """
+    Bounded classification of a send failure: the EmailDeliveryError code, "timeout", or the
+    exception class name for anything else.
+    """
+    if isinstance(error, EmailDeliveryError):
+        return error.code
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    return type(error).__name__
+
+
+async def deliver_email(recipient: str, subject: str, body: str):
+    """
+    Send one email. Raises on failure.
+    """
+    logger.info(f"Sending email to {recipient} with {subject} and {body}")
+    # Simulate random failure (30% chance)
+    if random.random() < 0.3:
+        raise EmailDeliveryError("Simulated email sending failure")
+
+
+class EmailDispatcher:
+    """
+    Sends one message to many recipients with a pool of concurrent workers.
+    Every attempt takes a token from the shared rate limiter, failed attempts are retried with
+    exponential backoff, and one log record per recipient is written through an EmailLogBuffer.
+    Delivery counters for `campaign_id` and the day are kept by an EmailStatsRecorder.
+    """
+
+    def __init__(
+        self,
+        db,
+        subject: str,
+        body: str,
+        concurrency: int = None,
+        rate_limiter: TokenBucket = None,
+        max_attempts: int = None,
+        retry_base_delay: float = None,
+        campaign_id: str = None,
+    ):
+        self.subject = subject
+        self.body = body
+        self.concurrency = max(1, concurrency or EMAIL_SEND_CONCURRENCY)
+        self.rate_limiter = rate_limiter or send_rate_limiter
+        self.max_attempts = max(1, max_attempts or EMAIL_SEND_MAX_ATTEMPTS)
+        self.retry_base_delay = EMAIL_SEND_RETRY_BASE_DELAY if retry_base_delay is None else retry_base_delay
+        self.log_buffer = EmailLogBuffer(db)
+        self.stats = EmailStatsRecorder(db, campaign_id)
+        self.sent = 0
+        self.failed = 0
+
+    async def send_one(self, recipient: str):
+        email_log = build_email_log(recipient, self.subject, self.body)
+        for attempt in range(1, self.max_attempts + 1):
+            await self.rate_limiter.acquire()
             try:
-                logger.info(f"Sending email to {recipient} with {subject} and {body}")
-                # Simulate random failure (30% chance)
-                if random.random() < 0.3:
-                    raise Exception("Simulated email sending failure")
-                # Simulate success
-                await table.update_item(
-                    Key={'id': email_id},
-                    UpdateExpression="set #s = :s, sent_at = :t",
-                    ExpressionAttributeNames={'#s': 'status'},
-                    ExpressionAttributeValues={':s': 'sent', ':t': datetime.now().isoformat()}
-                )
-                logger.info(f"Email sent successfully to {recipient}")
+                await deliver_email(recipient, self.subject, self.body)
             except Exception as e:
-                await table.update_item(
-                    Key={'id': email_id},
-                    UpdateExpression="set #s = :s, failed_at = :t, error_message = :e",
-                    ExpressionAttributeNames={'#s': 'status'},
-                    ExpressionAttributeValues={
-                        ':s': 'failed',
-                        ':t': datetime.now().isoformat(),
-                        ':e': str(e)
-                    }
-                )
+                if attempt < self.max_attempts:
+                    delay = self.retry_base_delay * (2 ** (attempt - 1))
+                    logger.warning(f"Attempt {attempt} to {recipient} failed: {str(e)}; retrying in {delay:.2f}s")
+                    await asyncio.sleep(random.uniform(delay / 2, delay))
+                    continue
+                # The log is written once, with its final status
+                email_log.update({
+                    'status': 'failed',
+                    'failed_at': datetime.now().isoformat(),
+                    'error_message': str(e),
+                    'error_code': email_error_code(e),
+                    'attempts': attempt,
+                })
+                self.failed += 1
                 logger.error(f"Failed to send email to {recipient}: {str(e)}")
+            else:
+                email_log.update({'status': 'sent', 'sent_at': datetime.now().isoformat(), 'attempts': attempt})
+                self.sent += 1
+                logger.info(f"Email sent successfully to {recipient}")
+            break
+        await self.log_buffer.add(email_log)
+        await self.stats.finished(email_log)
+
+    async def dispatch(self, recipients: Union[Iterable[str], AsyncIterable[str]]) -> Dict[str, int]:
+        """
+        Send to every recipient and flush the logs. `recipients` may be an async iterable; the
+        bounded queue applies back-pressure so it is consumed only as fast as workers send.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def worker():
+            while True:
+                recipient = await queue.get()
+                try:
+                    if recipient is None:
+                        return
+                    await self.send_one(recipient)
+                except Exception as e:
+                    # Keep the worker alive so the producer never blocks on a full queue
+                    logger.error(f"Email worker error for {recipient}: {str(e)}")
+                finally:
+                    queue.task_done()
 
-    background_tasks.add_task(send)
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            if hasattr(recipients, "__aiter__"):
+                async for recipient in recipients:
+                    self.stats.queued()
+                    await queue.put(recipient)
+            else:
+                for recipient in recipients:
+                    self.stats.queued()
+                    await queue.put(recipient)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await self.log_buffer.flush()
+            await self.stats.flush()
+        return {"sent": self.sent, "failed": self.failed}
@@ -0,0 +1,9 @@
+# Event item helpers shared by the event service and the table bootstrap
+EVENTS_TABLE = "events"
+
+
+def start_month(start_at: str) -> str:
+    """
+    Partition key of the start date index: the month an event starts in.
+    """
+    return start_at[:7]
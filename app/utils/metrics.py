@@ -0,0 +1,262 @@
+# In-process metrics exposed in the Prometheus text format at /metrics
+import bisect
+import os
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from fastapi import FastAPI
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+HTTP_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DYNAMODB_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Operations that accept ReturnConsumedCapacity
+DYNAMODB_CAPACITY_OPERATIONS = {
+    "GetItem", "PutItem", "UpdateItem", "DeleteItem", "Query", "Scan",
+    "BatchGetItem", "BatchWriteItem", "TransactGetItems", "TransactWriteItems",
+}
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+    def reset(self):
+        # Metrics that record nothing themselves (CallbackMetric) have nothing to clear
+        pass
+
+
+class Counter(_Metric):
+    """
+    Monotonic counter per label combination. Label values are passed positionally, in
+    `labelnames` order.
+    """
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1):
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for labelvalues, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}")
+        return lines
+
+    def reset(self):
+        self._values.clear()
+
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram per label combination; observe() is one bisect and three adds.
+    """
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=HTTP_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket (last is +Inf)..., sum]
+        self._series: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, *labelvalues):
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labelvalues) -> int:
+        series = self._series.get(labelvalues)
+        return sum(series[:-1]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for labelvalues, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket_labels = _labels(self.labelnames, labelvalues, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            labels = _labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+    def reset(self):
+        self._series.clear()
+
+
+class CallbackMetric(_Metric):
+    """
+    Metric whose single value is read from `collect()` at scrape time, for state that is
+    already tracked elsewhere (e.g. cache statistics).
+    """
+
+    def __init__(self, name: str, documentation: str, type: str, collect: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.type = type
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        return super().render() + [f"{self.name} {_number(self.collect())}"]
+
+
+def render() -> str:
+    """
+    Every registered metric in the Prometheus text exposition format (version 0.0.4).
+    """
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+
+def reset_metrics():
+    """
+    Clear every recorded value (tests).
+    """
+    for metric in _registry:
+        metric.reset()
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response is sent.", ("method", "route")
+)
+DYNAMODB_REQUESTS = Counter(
+    "dynamodb_requests_total", "DynamoDB API calls by outcome (ok or the error code).", ("operation", "table", "outcome")
+)
+DYNAMODB_LATENCY = Histogram(
+    "dynamodb_request_duration_seconds",
+    "DynamoDB API call latency, including SDK retries.",
+    ("operation", "table"),
+    buckets=DYNAMODB_LATENCY_BUCKETS,
+)
+DYNAMODB_CAPACITY = Counter(
+    "dynamodb_consumed_capacity_units_total", "Capacity units reported by ReturnConsumedCapacity.", ("operation", "table")
+)
+DYNAMODB_ITEMS_SCANNED = Counter(
+    "dynamodb_items_scanned_total", "Items evaluated by Query/Scan (ScannedCount).", ("operation", "table", "index")
+)
+DYNAMODB_ITEMS_RETURNED = Counter(
+    "dynamodb_items_returned_total", "Items returned by Query/Scan after filtering (Count).", ("operation", "table", "index")
+)
+
+
+# Hot-path instrumentation: ASGI middleware and botocore event hooks
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request. Requests are labelled with the route
+    template (e.g. /users/{user_id}), never the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            HTTP_LATENCY.observe(time.perf_counter() - started, scope["method"], route)
+            HTTP_REQUESTS.inc(scope["method"], route, str(status))
+
+
+def _request_table(params) -> str:
+    if "TableName" in params:
+        return params["TableName"]
+    # Batch calls name their tables in RequestItems; transactions span several tables
+    if "RequestItems" in params:
+        return ",".join(sorted(params["RequestItems"]))
+    return "-"
+
+
+def _before_dynamodb_call(params, model, context, **kwargs):
+    if model.name in DYNAMODB_CAPACITY_OPERATIONS:
+        params.setdefault("ReturnConsumedCapacity", "TOTAL")
+    context["metrics"] = (time.perf_counter(), _request_table(params), params.get("IndexName", "-"))
+
+
+def _after_dynamodb_call(parsed, model, context, **kwargs):
+    started, table, index = context.get("metrics") or (None, "-", "-")
+    operation = model.name
+    if started is not None:
+        DYNAMODB_LATENCY.observe(time.perf_counter() - started, operation, table)
+    error = (parsed.get("Error") or {}).get("Code")
+    DYNAMODB_REQUESTS.inc(operation, table, error or "ok")
+    consumed = parsed.get("ConsumedCapacity")
+    for entry in consumed if isinstance(consumed, list) else [consumed] if consumed else []:
+        DYNAMODB_CAPACITY.inc(operation, entry.get("TableName", table), amount=float(entry.get("CapacityUnits", 0)))
+    if "ScannedCount" in parsed:
+        DYNAMODB_ITEMS_SCANNED.inc(operation, table, index, amount=parsed["ScannedCount"])
+        DYNAMODB_ITEMS_RETURNED.inc(operation, table, index, amount=parsed.get("Count", 0))
+
+
+def _dynamodb_call_error(exception, context, **kwargs):
+    started, table, _ = context.get("metrics") or (None, "-", "-")
+    operation = kwargs.get("event_name", "").rsplit(".", 1)[-1] or "-"
+    DYNAMODB_REQUESTS.inc(operation, table, type(exception).__name__)
+
+
+def instrument_dynamodb_client(client):
+    """
+    Register botocore event hooks on a DynamoDB client (the resource's meta.client) that time
+    every call, request consumed capacity and count scanned vs returned items.
+    """
+    if not METRICS_ENABLED:
+        return
+    events = client.meta.events
+    events.register("provide-client-params.dynamodb", _before_dynamodb_call, unique_id="metrics-before")
+    events.register("after-call.dynamodb", _after_dynamodb_call, unique_id="metrics-after")
+    events.register("after-call-error.dynamodb", _dynamodb_call_error, unique_id="metrics-error")
+
+
+# FastAPI hook
+
+def register_metrics(app: FastAPI):
+    if METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
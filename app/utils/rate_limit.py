@@ -0,0 +1,33 @@
+# Async rate limiting
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` acquisitions per second with bursts of up to `capacity`.
+    A rate of 0 disables limiting. State is in memory, so the limit applies per process.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, tokens: float = 1):
+        if self.rate <= 0:
+            return
+        # The lock queues waiters so tokens are handed out in FIFO order
+        async with self._lock:
+            self._refill()
+            while self.tokens < tokens:
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
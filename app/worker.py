@@ -0,0 +1,28 @@
+# Standalone email job consumer, scaled independently of the API:
+#   EMAIL_JOB_CONSUMER_ENABLED=false uvicorn app.main:app   (API only)
+#   python -m app.worker                                    (consumer only)
+import asyncio
+import signal
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.email_job_service import run_consumer
+from app.utils.database import close_db, init_db
+
+
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    db = await init_db()
+    try:
+        await run_consumer(db, stop)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
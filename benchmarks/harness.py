@@ -0,0 +1,97 @@
+"""
+Timing helpers shared by the benchmarks.
+"""
+import asyncio
+import platform
+import subprocess
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of `samples` (0 < pct <= 100).
+    """
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+async def run_case(
+    name: str,
+    operation: Callable[[], Awaitable[Any]],
+    iterations: int,
+    concurrency: int = 1,
+    items_per_call: Callable[[Any], int] = None,
+    warmup: int = 1,
+    **params,
+) -> Dict[str, Any]:
+    """
+    Await `operation` `iterations` times with up to `concurrency` calls in flight and return
+    latency percentiles (ms), calls/second and, if `items_per_call` is given, items/second.
+    """
+    for _ in range(warmup):
+        await operation()
+    latencies: List[float] = []
+    items = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed():
+        nonlocal items
+        async with semaphore:
+            start = time.perf_counter()
+            result = await operation()
+            latencies.append(time.perf_counter() - start)
+            if items_per_call:
+                items += items_per_call(result)
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    await asyncio.gather(*[timed() for _ in range(iterations)])
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    result = {
+        "name": name,
+        "params": params,
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "throughput_per_s": iterations / wall,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "cpu_ms_per_call": cpu / iterations * 1000,
+    }
+    if items_per_call:
+        result["items_per_s"] = items / wall
+    return result
+
+
+@contextmanager
+def patched(module, **values):
+    """
+    Temporarily override module-level settings (e.g. USER_SCAN_SEGMENTS) for one case.
+    """
+    original = {name: getattr(module, name) for name in values}
+    for name, value in values.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in original.items():
+            setattr(module, name, value)
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
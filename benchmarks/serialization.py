@@ -0,0 +1,66 @@
+"""
+CPU cost of serializing one /users/filter page.
+
+    python -m benchmarks.serialization [rows] [iterations]
+
+"validated" is the previous path: raw DynamoDB items (Decimal numbers) validated item by item
+into UserFilterResponse, then jsonable_encoder + JSONResponse. "fast" is the current path:
+numbers converted once in user_service and the body built by user_filter_response (orjson).
+"""
+import sys
+import time
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.routers.users import UserFilterResponse, user_filter_response
+from app.utils.dynamodb_query import plain_numbers
+
+
+def dynamodb_page(rows: int):
+    return {
+        "limit": rows,
+        "cursor": None,
+        "next_cursor": "eyJtIjoic2NhbiJ9",
+        "count": rows,
+        "results": [
+            {
+                "id": Decimal(i), "email": f"user{i}@example.com", "first_name": f"First{i}", "last_name": f"Last{i}",
+                "role": "attendee", "company": "Acme Corp", "job_title": "Engineer", "city": "Austin", "state": "TX",
+                "events_hosted": Decimal(i % 4), "events_attended": Decimal(i % 11), "phone_number": "555-0100",
+            }
+            for i in range(rows)
+        ],
+    }
+
+
+def validated(page):
+    model = UserFilterResponse.model_validate(page)
+    return JSONResponse(jsonable_encoder(model)).body
+
+
+def fast(page):
+    result = dict(page, results=[plain_numbers(item) for item in page["results"]])
+    return user_filter_response(result).body
+
+
+def measure(serialize, page, iterations: int) -> float:
+    serialize(page)
+    start = time.process_time()
+    for _ in range(iterations):
+        serialize(page)
+    return (time.process_time() - start) / iterations
+
+
+def main(rows: int = 200, iterations: int = 300):
+    page = dynamodb_page(rows)
+    before = measure(validated, page, iterations)
+    after = measure(fast, page, iterations)
+    print(f"{rows} rows, {iterations} iterations, CPU per request")
+    print(f"  validated: {before * 1000:8.3f} ms")
+    print(f"  fast:      {after * 1000:8.3f} ms  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,215 @@
+"""
+Benchmark suite for filter_users and email sending against the in-memory DynamoDB fake.
+
+    python -m benchmarks.suite --users 5000 --iterations 50 --output results.json
+
+Every DynamoDB call is delayed by --latency-ms to stand in for the network round trip, so
+parallel scans and concurrent sends are measured realistically; CPU time per call is reported
+separately. Results are written as JSON (environment, config, one record per case) for
+regression tracking, and summarised as a table on stderr.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+from typing import Any, Dict, List
+
+from app.services import user_service
+from app.tests.fake_dynamodb import FakeDynamoDB, email_logs_table, email_stats_table, users_table
+from app.utils import email_utils
+from app.utils.cache import TTLCache
+from app.utils.logger import logger
+from app.utils.rate_limit import TokenBucket
+from benchmarks.harness import environment, patched, run_case
+
+STATES = ["TX", "CA", "NY", "MA", "WA", "IL", "FL", "CO", "OR", "GA"]
+JOB_TITLES = ["Engineer", "Manager", "Designer", "Analyst", "Director"]
+
+
+class LatencyTable:
+    """
+    Wraps a FakeTable so every request waits `latency` seconds first.
+    """
+
+    def __init__(self, table, latency: float):
+        self._table = table
+        self._latency = latency
+
+    def __getattr__(self, name):
+        attr = getattr(self._table, name)
+        if name not in ("scan", "query", "get_item", "put_item", "update_item", "delete_item"):
+            return attr
+
+        async def call(**kwargs):
+            await asyncio.sleep(self._latency)
+            return await attr(**kwargs)
+
+        return call
+
+
+class LatencyDB:
+    def __init__(self, db: FakeDynamoDB, latency: float):
+        self._db = db
+        self._latency = latency
+        self.meta = db.meta
+
+    async def Table(self, name):
+        return LatencyTable(await self._db.Table(name), self._latency)
+
+    async def batch_write_item(self, **kwargs):
+        await asyncio.sleep(self._latency)
+        return await self._db.batch_write_item(**kwargs)
+
+
+def seed_users(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "email": f"user{i}@example.com",
+            "first_name": f"First{rng.randrange(10_000)}",
+            "last_name": f"Last{rng.randrange(10_000)}",
+            "role": rng.choice(["attendee", "host"]),
+            "company": f"Company {rng.randrange(50)}",
+            "job_title": rng.choice(JOB_TITLES),
+            "city": f"City {rng.randrange(100)}",
+            "state": rng.choice(STATES),
+            "events_hosted": rng.randrange(5),
+            "events_attended": rng.randrange(20),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+async def filter_cases(args) -> List[Dict[str, Any]]:
+    db = LatencyDB(FakeDynamoDB(users_table(seed_users(args.users))), args.latency_ms / 1000)
+    results = []
+
+    def case(name, filters, **settings):
+        async def operation():
+            return await user_service.filter_users(db, limit=args.limit, **filters)
+
+        async def run():
+            with patched(user_service, **settings):
+                return await run_case(
+                    name,
+                    operation,
+                    args.iterations,
+                    args.concurrency,
+                    items_per_call=lambda page: page["count"],
+                    users=args.users,
+                    limit=args.limit,
+                    filters=filters,
+                    **{k.lower(): v for k, v in settings.items() if k != "_filter_cache"},
+                )
+
+        return run()
+
+    uncached = TTLCache(0, 0)
+    results.append(await case("filter_users.gsi", {"state": "TX", "events_attended_min": 10}, _filter_cache=uncached))
+    results.append(await case("filter_users.scan", {"company": "Company 7"}, _filter_cache=uncached))
+    for segments in args.segments:
+        results.append(await case(
+            "filter_users.parallel_scan",
+            {"events_attended_min": 10},
+            _filter_cache=uncached,
+            USER_SCAN_SEGMENTS=segments,
+        ))
+    results.append(await case(
+        "filter_users.in_memory_sort",
+        {"state": "CA", "sort_by": "last_name"},
+        _filter_cache=uncached,
+    ))
+    results.append(await case(
+        "filter_users.cached",
+        {"state": "TX", "events_attended_min": 10},
+        _filter_cache=TTLCache(1024, 300),
+    ))
+    return results
+
+
+async def send_cases(args) -> List[Dict[str, Any]]:
+    results = []
+
+    async def deliver(recipient, subject, body):
+        await asyncio.sleep(args.send_latency_ms / 1000)
+
+    with patched(email_utils, deliver_email=deliver, send_rate_limiter=TokenBucket(0)):
+        for count in args.recipients:
+            recipients = [f"user{i}@example.com" for i in range(count)]
+
+            async def operation():
+                db = LatencyDB(FakeDynamoDB(email_logs_table(), email_stats_table()), args.latency_ms / 1000)
+                dispatcher = email_utils.EmailDispatcher(db, "Subject", "Body", campaign_id="benchmark")
+                return await dispatcher.dispatch(recipients)
+
+            results.append(await run_case(
+                "send_email.dispatch",
+                operation,
+                args.send_iterations,
+                items_per_call=lambda result: result["sent"] + result["failed"],
+                recipients=count,
+                send_concurrency=email_utils.EMAIL_SEND_CONCURRENCY,
+            ))
+    return results
+
+
+def print_table(results: List[Dict[str, Any]]):
+    print(f"{'case':32} {'params':44} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'calls/s':>9} {'items/s':>10}", file=sys.stderr)
+    for r in results:
+        params = ",".join(f"{k}={v}" for k, v in r["params"].items() if k not in ("users", "limit", "filters"))
+        print(
+            f"{r['name']:32} {params[:44]:44} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['p99_ms']:9.2f} "
+            f"{r['throughput_per_s']:9.1f} {r.get('items_per_s', 0):10.0f}",
+            file=sys.stderr,
+        )
+
+
+def parse_args(argv=None):
+    def int_list(value):
+        return [int(v) for v in value.split(",") if v]
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5000, help="users seeded into the fake table")
+    parser.add_argument("--limit", type=int, default=100, help="filter_users page size")
+    parser.add_argument("--iterations", type=int, default=30, help="calls per filter_users case")
+    parser.add_argument("--concurrency", type=int, default=1, help="filter_users calls in flight")
+    parser.add_argument("--segments", type=int_list, default=[1, 4, 8], help="parallel scan segment counts")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="simulated DynamoDB round trip")
+    parser.add_argument("--recipients", type=int_list, default=[100, 1000], help="recipient counts for send_email")
+    parser.add_argument("--send-iterations", type=int, default=3, help="dispatches per send_email case")
+    parser.add_argument("--send-latency-ms", type=float, default=5.0, help="simulated provider latency per email")
+    parser.add_argument("--only", choices=["filter", "send"], help="run one group of cases")
+    parser.add_argument("--verbose", action="store_true", help="keep the application's INFO logging")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+    if not args.verbose:
+        # One INFO line per email sent would dominate the send_email timings
+        logger.setLevel(logging.WARNING)
+    results = []
+    if args.only in (None, "filter"):
+        results += await filter_cases(args)
+    if args.only in (None, "send"):
+        results += await send_cases(args)
+    report = {
+        "environment": environment(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "verbose")},
+        "results": results,
+    }
+    print_table(results)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())